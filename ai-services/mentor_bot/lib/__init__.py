@@ -6,12 +6,19 @@ from .gemini_advanced import (
     get_gemini_client,
     MODELS_TO_TRY
 )
+from .model_health import ModelHealthTracker
+from .answer_cache import AnswerCache, cache_key, normalize_question
+from .semantic_cache import SemanticCache
 
 __all__ = [
     "GeminiClient",
     "GeminiConfig",
     "GeminiModel",
     "get_gemini_client",
-    "MODELS_TO_TRY"
+    "MODELS_TO_TRY",
+    "ModelHealthTracker",
+    "AnswerCache",
+    "cache_key",
+    "normalize_question",
+    "SemanticCache"
 ]
-
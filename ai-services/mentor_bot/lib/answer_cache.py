@@ -0,0 +1,232 @@
+"""
+Caché de respuestas del mentor
+
+Los participantes repiten las mismas preguntas ("how do I deploy to testnet")
+y cada una cuesta una llamada completa a Gemini. Las respuestas se guardan con
+una clave que combina la pregunta normalizada (minúsculas, sin acentos ni
+puntuación, espacios colapsados), el idioma y el contexto que entra en el
+prompt (hackathon, chains, techStack).
+
+Dos niveles:
+- memoria: LRU con TTL, limitada a ANSWER_CACHE_MAX_ENTRIES
+- disco (opcional, ANSWER_CACHE_DISK=true): SQLite, sobrevive a reinicios;
+  un acierto en disco se vuelve a subir a memoria
+
+Las preguntas con conversationHistory dependen de la conversación, así que por
+defecto no pasan por la caché (ANSWER_CACHE_BYPASS_HISTORY).
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_CACHE_PATH = os.path.join("data", "answer_cache.db")
+
+CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+# Segundos que una respuesta se considera válida
+TTL = float(os.getenv("ANSWER_CACHE_TTL", "86400"))
+DISK_ENABLED = os.getenv("ANSWER_CACHE_DISK", "false").lower() == "true"
+# Saltar la caché en preguntas de seguimiento (con historial de conversación)
+BYPASS_HISTORY = os.getenv("ANSWER_CACHE_BYPASS_HISTORY", "true").lower() == "true"
+
+_NON_WORD = re.compile(r"[^\w+#]+")
+
+
+def normalize_question(question: str) -> str:
+    """Minúsculas, sin acentos ni puntuación ("¿Cómo despliego?" -> "como despliego")"""
+    text = unicodedata.normalize("NFKD", question.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def _normalize_list(values: Optional[List[Any]]) -> List[str]:
+    return sorted({str(v).strip().lower() for v in values or [] if str(v).strip()})
+
+
+def scope_key(language: str, context: Optional[dict]) -> str:
+    """Parte de la clave que no depende de la pregunta: idioma y contexto del prompt"""
+    context = context or {}
+    parts = [
+        language,
+        str(context.get("hackathonName", "")).strip().lower(),
+        _normalize_list(context.get("chains")),
+        _normalize_list(context.get("techStack")),
+    ]
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def cache_key(question: str, language: str, context: Optional[dict]) -> str:
+    """Clave de la caché: pregunta normalizada, idioma y contexto del prompt"""
+    parts = [normalize_question(question), scope_key(language, context)]
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class AnswerStore:
+    """Nivel en disco: SQLite con las respuestas por clave"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("ANSWER_CACHE_DB_PATH", DEFAULT_CACHE_PATH)
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS answers (
+                key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[dict, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, key: str, payload: dict, created_at: float) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO answers (key, payload, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(payload, ensure_ascii=False), created_at)
+                )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+
+    def purge_expired(self, ttl: float) -> int:
+        """Borra las respuestas más viejas que ttl; devuelve cuántas"""
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute(
+                    "DELETE FROM answers WHERE created_at < ?", (time.time() - ttl,)
+                )
+        return cursor.rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+
+class AnswerCache:
+    """Caché LRU/TTL en memoria con nivel opcional en disco"""
+
+    def __init__(
+        self,
+        max_entries: int = MAX_ENTRIES,
+        ttl: float = TTL,
+        store: Optional[AnswerStore] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.store = store
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.stored = 0
+        self.evictions = 0
+        self.expired = 0
+        if self.store is not None:
+            self.store.purge_expired(self.ttl)
+
+    def get(self, key: str, record: bool = True) -> Optional[dict]:
+        """
+        Respuesta guardada para la clave, si existe y no expiró
+
+        Con record=False no cuenta como acierto ni fallo (p. ej. cuando la
+        clave viene de la caché semántica, que lleva sus propias métricas).
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[1] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    if record:
+                        self.hits += 1
+                    return entry[0]
+                del self._entries[key]
+                self.expired += 1
+
+        if self.store is not None:
+            found = self.store.get(key)
+            if found is not None:
+                payload, created_at = found
+                if now - created_at <= self.ttl:
+                    with self._lock:
+                        self._insert(key, payload, created_at)
+                        if record:
+                            self.disk_hits += 1
+                    return payload
+                self.store.delete(key)
+                with self._lock:
+                    self.expired += 1
+
+        if record:
+            with self._lock:
+                self.misses += 1
+        return None
+
+    def put(self, key: str, payload: dict) -> None:
+        created_at = time.time()
+        with self._lock:
+            self._insert(key, payload, created_at)
+            self.stored += 1
+        if self.store is not None:
+            self.store.put(key, payload, created_at)
+
+    def _insert(self, key: str, payload: dict, created_at: float) -> None:
+        self._entries[key] = (payload, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self.bypassed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            stats = {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "hitRate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "bypassed": self.bypassed,
+                "stored": self.stored,
+                "evictions": self.evictions,
+                "expired": self.expired,
+            }
+        stats["diskEntries"] = self.store.count() if self.store is not None else None
+        return stats
+
+
+def create_answer_cache() -> Optional[AnswerCache]:
+    """Caché configurada por variables de entorno (None si está desactivada)"""
+    if not CACHE_ENABLED:
+        return None
+    return AnswerCache(store=AnswerStore() if DISK_ENABLED else None)
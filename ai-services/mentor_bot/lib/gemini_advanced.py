@@ -3,13 +3,17 @@ Helper avanzado para integración con Google Gemini AI
 Implementa fallback multi-modelo, extracción de JSON, y manejo robusto de errores
 """
 import google.generativeai as genai
+import asyncio
 import os
 import re
 import json
 import logging
-from typing import Optional, Dict, Any, List
+import time
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
 from enum import Enum
 
+from .model_health import ModelHealthTracker
+
 # Configurar logging
 logger = logging.getLogger(__name__)
 
@@ -28,6 +32,13 @@ MODELS_TO_TRY = [
     GeminiModel.PRO_1_5,
 ]
 
+# Segundos entre rondas del probe en segundo plano de modelos con el breaker abierto
+PROBE_INTERVAL = float(os.getenv("GEMINI_PROBE_INTERVAL", "10"))
+PROBE_PROMPT = "ping"
+
+# Prompt usado por test_connection
+TEST_PROMPT = "Responde con un JSON simple: {\"status\": \"ok\", \"message\": \"Conexión exitosa\"}"
+
 class GeminiConfig:
     """Configuración para generación de contenido con Gemini"""
     def __init__(
@@ -74,6 +85,13 @@ class GeminiClient:
         except Exception as e:
             logger.error(f"Error configurando Gemini API: {e}")
             raise
+        
+        # Salud de cada modelo, compartida entre todas las peticiones
+        self.health = ModelHealthTracker()
+    
+    def _models_to_try(self) -> List[GeminiModel]:
+        """MODELS_TO_TRY sin los modelos con el breaker abierto"""
+        return [GeminiModel(name) for name in self.health.select([m.value for m in MODELS_TO_TRY])]
     
     def _get_model(self, model_name: str):
         """Obtiene una instancia del modelo especificado"""
@@ -110,10 +128,10 @@ class GeminiClient:
             config = GeminiConfig()
         
         last_error = None
-        model_used = None
         
-        # Intentar cada modelo en orden
-        for model_name in MODELS_TO_TRY:
+        # Intentar cada modelo en orden (saltando los que no están sanos)
+        for model_name in self._models_to_try():
+            started = time.perf_counter()
             try:
                 logger.info(f"Intentando modelo: {model_name}")
                 model = self._get_model(model_name.value)
@@ -130,14 +148,8 @@ class GeminiClient:
                     except Exception as e:
                         # Si falla el chat, usar generate_content con prompt completo
                         logger.warning(f"Error usando chat con historial, usando prompt completo: {e}")
-                        # Construir prompt con historial incluido
-                        history_text = "\n".join([
-                            f"{msg.get('role', 'user')}: {msg.get('parts', [msg.get('content', '')])[0]}"
-                            for msg in conversation_history
-                        ])
-                        full_prompt_with_history = f"{history_text}\n\nuser: {prompt}"
                         response = model.generate_content(
-                            full_prompt_with_history,
+                            self._prompt_with_history(prompt, conversation_history),
                             generation_config=config.to_dict()
                         )
                 else:
@@ -146,37 +158,188 @@ class GeminiClient:
                         generation_config=config.to_dict()
                     )
                 
-                # Extraer texto de la respuesta
-                response_text = self._extract_text(response)
+                result = self._build_result(model_name, response, extract_json)
+                self.health.record_success(model_name.value, time.perf_counter() - started)
+                return result
                 
-                if not response_text:
-                    raise ValueError("Respuesta vacía del modelo")
+            except Exception as e:
+                self.health.record_failure(model_name.value, e)
+                last_error = e
+                logger.warning(f"Modelo {model_name.value} falló: {str(e)}")
+                continue
+        
+        return self._all_models_failed(last_error)
+    
+    async def generate_content_async(
+        self,
+        prompt: str,
+        config: Optional[GeminiConfig] = None,
+        extract_json: bool = False,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Versión asíncrona de generate_content, con el mismo fallback y el mismo resultado
+        
+        Usa las llamadas async del SDK (generate_content_async / send_message_async),
+        así que mientras Gemini responde el event loop sigue atendiendo otras peticiones.
+        """
+        if config is None:
+            config = GeminiConfig()
+        
+        last_error = None
+        
+        # Intentar cada modelo en orden (saltando los que no están sanos)
+        for model_name in self._models_to_try():
+            started = time.perf_counter()
+            try:
+                logger.info(f"Intentando modelo: {model_name}")
+                model = self._get_model(model_name.value)
+                
+                if conversation_history and len(conversation_history) > 0:
+                    try:
+                        # Intentar usar chat con historial
+                        chat = model.start_chat(history=conversation_history)
+                        response = await chat.send_message_async(
+                            prompt,
+                            generation_config=config.to_dict()
+                        )
+                    except Exception as e:
+                        # Si falla el chat, usar generate_content con prompt completo
+                        logger.warning(f"Error usando chat con historial, usando prompt completo: {e}")
+                        response = await model.generate_content_async(
+                            self._prompt_with_history(prompt, conversation_history),
+                            generation_config=config.to_dict()
+                        )
+                else:
+                    response = await model.generate_content_async(
+                        prompt,
+                        generation_config=config.to_dict()
+                    )
                 
-                model_used = model_name.value
-                logger.info(f"Modelo {model_name.value} usado exitosamente")
+                result = self._build_result(model_name, response, extract_json)
+                self.health.record_success(model_name.value, time.perf_counter() - started)
+                return result
                 
-                # Extraer JSON si se solicita
-                if extract_json:
-                    json_data = self._extract_json_from_response(response_text)
-                    return {
-                        "success": True,
-                        "data": json_data,
-                        "model_used": model_used,
-                        "raw_response": response_text
-                    }
+            except Exception as e:
+                self.health.record_failure(model_name.value, e)
+                last_error = e
+                logger.warning(f"Modelo {model_name.value} falló: {str(e)}")
+                continue
+            except BaseException:
+                # Petición cancelada: no cuenta como éxito ni como fallo
+                self.health.release(model_name.value)
+                raise
+        
+        return self._all_models_failed(last_error)
+    
+    async def stream_content_async(
+        self,
+        prompt: str,
+        config: Optional[GeminiConfig] = None
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Genera contenido en streaming, entregando los fragmentos según llegan
+        
+        El fallback de modelos solo aplica hasta el primer fragmento: una vez
+        enviado texto al cliente ya no se puede cambiar de modelo, así que un
+        error a mitad de respuesta se propaga.
+        
+        Yields:
+            Tuplas (modelo usado, fragmento de texto)
+        
+        Raises:
+            RuntimeError: Si todos los modelos fallaron antes del primer fragmento
+        """
+        if config is None:
+            config = GeminiConfig()
+        
+        last_error = None
+        
+        # Intentar cada modelo en orden (saltando los que no están sanos)
+        for model_name in self._models_to_try():
+            started = False
+            call_started = time.perf_counter()
+            try:
+                logger.info(f"Intentando modelo (streaming): {model_name}")
+                model = self._get_model(model_name.value)
+                response = await model.generate_content_async(
+                    prompt,
+                    generation_config=config.to_dict(),
+                    stream=True
+                )
+                async for chunk in response:
+                    text = self._chunk_text(chunk)
+                    if not text:
+                        continue
+                    if not started:
+                        started = True
+                        logger.info(f"Modelo {model_name.value} usado exitosamente (streaming)")
+                    yield model_name.value, text
                 
-                return {
-                    "success": True,
-                    "data": response_text,
-                    "model_used": model_used
-                }
+                if not started:
+                    raise ValueError("Respuesta vacía del modelo")
+                self.health.record_success(model_name.value, time.perf_counter() - call_started)
+                return
                 
             except Exception as e:
+                self.health.record_failure(model_name.value, e)
+                if started:
+                    logger.error(f"Modelo {model_name.value} falló durante el streaming: {str(e)}")
+                    raise
                 last_error = e
                 logger.warning(f"Modelo {model_name.value} falló: {str(e)}")
                 continue
+            except BaseException:
+                # Stream cancelado (cliente desconectado): no cuenta como éxito ni como fallo
+                self.health.release(model_name.value)
+                raise
+        
+        raise RuntimeError(self._all_models_failed(last_error)["error"])
+    
+    def _chunk_text(self, chunk) -> str:
+        """Texto de un fragmento de streaming (vacío si no trae partes, p. ej. el último)"""
+        try:
+            return chunk.text
+        except (ValueError, AttributeError):
+            return ""
+    
+    def _prompt_with_history(self, prompt: str, conversation_history: List[Dict[str, str]]) -> str:
+        """Construye un prompt con el historial incluido (si el chat con historial falla)"""
+        history_text = "\n".join([
+            f"{msg.get('role', 'user')}: {msg.get('parts', [msg.get('content', '')])[0]}"
+            for msg in conversation_history
+        ])
+        return f"{history_text}\n\nuser: {prompt}"
+    
+    def _build_result(self, model_name: GeminiModel, response, extract_json: bool) -> Dict[str, Any]:
+        """Convierte la respuesta de un modelo en el dict de resultado"""
+        # Extraer texto de la respuesta
+        response_text = self._extract_text(response)
+        
+        if not response_text:
+            raise ValueError("Respuesta vacía del modelo")
+        
+        model_used = model_name.value
+        logger.info(f"Modelo {model_name.value} usado exitosamente")
+        
+        # Extraer JSON si se solicita
+        if extract_json:
+            json_data = self._extract_json_from_response(response_text)
+            return {
+                "success": True,
+                "data": json_data,
+                "model_used": model_used,
+                "raw_response": response_text
+            }
         
-        # Si todos los modelos fallaron
+        return {
+            "success": True,
+            "data": response_text,
+            "model_used": model_used
+        }
+    
+    def _all_models_failed(self, last_error: Optional[Exception]) -> Dict[str, Any]:
+        """Resultado cuando todos los modelos fallaron"""
         error_msg = f"Todos los modelos fallaron. Último error: {str(last_error)}"
         logger.error(error_msg)
         return {
@@ -237,6 +400,42 @@ class GeminiClient:
             logger.error(f"Error parseando JSON: {e}")
             raise ValueError(f"JSON inválido: {str(e)}")
     
+    async def probe_models(self) -> None:
+        """Prueba los modelos con el breaker abierto cuyo cooldown ya pasó"""
+        for name in self.health.due_for_probe([m.value for m in MODELS_TO_TRY]):
+            started = time.perf_counter()
+            try:
+                await self._get_model(name).generate_content_async(
+                    PROBE_PROMPT,
+                    generation_config=GeminiConfig(temperature=0.0, max_output_tokens=8).to_dict()
+                )
+                self.health.record_success(name, time.perf_counter() - started)
+                logger.info(f"Modelo {name} recuperado, breaker cerrado")
+            except Exception as e:
+                self.health.record_failure(name, e)
+                logger.warning(f"Probe del modelo {name} falló: {str(e)}")
+            except BaseException:
+                self.health.release(name)
+                raise
+    
+    async def run_health_probes(self, interval: float = PROBE_INTERVAL) -> None:
+        """
+        Bucle de probes en segundo plano (hasta que se cancela)
+        
+        Mientras corre, las peticiones de usuario nunca hacen de prueba half-open.
+        """
+        self.health.background_probes = True
+        try:
+            while True:
+                await self.probe_models()
+                await asyncio.sleep(interval)
+        finally:
+            self.health.background_probes = False
+    
+    def health_snapshot(self) -> List[Dict[str, Any]]:
+        """Estado y métricas (éxitos, fallos, latencia EWMA) de cada modelo"""
+        return self.health.snapshot([m.value for m in MODELS_TO_TRY])
+    
     def test_connection(self) -> Dict[str, Any]:
         """
         Prueba la conexión con Gemini usando un prompt simple
@@ -244,11 +443,26 @@ class GeminiClient:
         Returns:
             Dict con success, model_used, y error si aplica
         """
-        test_prompt = "Responde con un JSON simple: {\"status\": \"ok\", \"message\": \"Conexión exitosa\"}"
-        
         try:
             result = self.generate_content(
-                test_prompt,
+                TEST_PROMPT,
+                config=GeminiConfig(temperature=0.4, max_output_tokens=256),
+                extract_json=True
+            )
+            return result
+        except Exception as e:
+            logger.error(f"Error en test de conexión: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "model_used": None
+            }
+    
+    async def test_connection_async(self) -> Dict[str, Any]:
+        """Versión asíncrona de test_connection"""
+        try:
+            result = await self.generate_content_async(
+                TEST_PROMPT,
                 config=GeminiConfig(temperature=0.4, max_output_tokens=256),
                 extract_json=True
             )
@@ -0,0 +1,182 @@
+"""
+Estado de salud por modelo de Gemini (circuit breaker)
+
+Cada modelo de MODELS_TO_TRY tiene un breaker compartido entre peticiones:
+- closed: el modelo se usa normalmente
+- open: tras varios fallos seguidos (o una tasa de error alta) se salta sin
+  llamarlo, así las peticiones no pagan una llamada fallida antes del fallback
+- half_open: pasado el cooldown se permite una sola prueba; si sale bien el
+  breaker se cierra, si falla se vuelve a abrir con el cooldown duplicado
+
+Con el probe en segundo plano activo (GeminiClient.run_health_probes) las
+pruebas las hace el probe y ninguna petición de usuario se usa como prueba.
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+# Estados del breaker
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Fallos seguidos que abren el breaker
+FAILURE_THRESHOLD = int(os.getenv("GEMINI_BREAKER_FAILURES", "3"))
+# Tasa de error (EWMA) que abre el breaker, con al menos MIN_REQUESTS llamadas
+ERROR_RATE_THRESHOLD = float(os.getenv("GEMINI_BREAKER_ERROR_RATE", "0.5"))
+MIN_REQUESTS = int(os.getenv("GEMINI_BREAKER_MIN_REQUESTS", "10"))
+# Segundos que un breaker abierto espera antes de la siguiente prueba (se duplica hasta MAX)
+COOLDOWN = float(os.getenv("GEMINI_BREAKER_COOLDOWN", "30"))
+MAX_COOLDOWN = float(os.getenv("GEMINI_BREAKER_MAX_COOLDOWN", "300"))
+# Peso de la última observación en las medias móviles (EWMA)
+EWMA_ALPHA = 0.2
+
+
+class ModelHealth:
+    """Contadores, medias móviles y estado del breaker de un modelo"""
+
+    def __init__(self, model: str):
+        self.model = model
+        self.state = CLOSED
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.error_rate = 0.0
+        self.latency_ms: Optional[float] = None
+        self.cooldown = COOLDOWN
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self.last_error: Optional[str] = None
+
+    def retry_at(self) -> Optional[float]:
+        if self.state != OPEN or self.opened_at is None:
+            return None
+        return self.opened_at + self.cooldown
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "state": self.state,
+            "requests": self.requests,
+            "successes": self.successes,
+            "failures": self.failures,
+            "consecutiveFailures": self.consecutive_failures,
+            "errorRate": round(self.error_rate, 4),
+            "latencyMs": round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            "retryAt": self.retry_at(),
+            "lastError": self.last_error,
+        }
+
+
+class ModelHealthTracker:
+    """Breakers de todos los modelos, seguros entre hilos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[str, ModelHealth] = {}
+        # Si True, las pruebas half-open las hace el probe en segundo plano
+        self.background_probes = False
+
+    def _get(self, model: str) -> ModelHealth:
+        health = self._models.get(model)
+        if health is None:
+            health = self._models[model] = ModelHealth(model)
+        return health
+
+    def _due(self, health: ModelHealth, now: float) -> bool:
+        """Breaker abierto cuyo cooldown ya pasó y sin prueba en curso"""
+        retry_at = health.retry_at()
+        return retry_at is not None and now >= retry_at and not health.trial_in_flight
+
+    def select(self, models: Sequence[str]) -> List[str]:
+        """
+        Modelos a intentar para una petición, en orden de preferencia
+
+        Los modelos con el breaker abierto se saltan. Si todos están abiertos
+        se devuelven todos como último recurso, para no fallar sin intentarlo.
+        """
+        now = time.time()
+        selected = []
+        with self._lock:
+            for model in models:
+                health = self._get(model)
+                if health.state == CLOSED:
+                    selected.append(model)
+                elif not selected and not self.background_probes and self._due(health, now):
+                    # Esta petición hace la prueba half-open. Solo si es el primer
+                    # modelo a intentar: si otro respondiera antes, la prueba
+                    # quedaría pendiente para siempre
+                    health.state = HALF_OPEN
+                    health.trial_in_flight = True
+                    selected.append(model)
+        return selected or list(models)
+
+    def due_for_probe(self, models: Sequence[str]) -> List[str]:
+        """Modelos abiertos listos para una prueba; los marca como half-open"""
+        now = time.time()
+        due = []
+        with self._lock:
+            for model in models:
+                health = self._get(model)
+                if self._due(health, now):
+                    health.state = HALF_OPEN
+                    health.trial_in_flight = True
+                    due.append(model)
+        return due
+
+    def record_success(self, model: str, latency: float) -> None:
+        """Registra una llamada correcta (latency en segundos)"""
+        with self._lock:
+            health = self._get(model)
+            health.requests += 1
+            health.successes += 1
+            health.consecutive_failures = 0
+            health.error_rate *= 1 - EWMA_ALPHA
+            latency_ms = latency * 1000
+            if health.latency_ms is None:
+                health.latency_ms = latency_ms
+            else:
+                health.latency_ms += EWMA_ALPHA * (latency_ms - health.latency_ms)
+            if health.state != CLOSED:
+                health.state = CLOSED
+                health.cooldown = COOLDOWN
+                health.opened_at = None
+            health.trial_in_flight = False
+
+    def record_failure(self, model: str, error: Exception) -> None:
+        """Registra una llamada fallida y abre el breaker si corresponde"""
+        now = time.time()
+        with self._lock:
+            health = self._get(model)
+            health.requests += 1
+            health.failures += 1
+            health.consecutive_failures += 1
+            health.error_rate += EWMA_ALPHA * (1 - health.error_rate)
+            health.last_error = str(error)[:200]
+            if health.state == HALF_OPEN:
+                # Falló la prueba: volver a abrir con más espera
+                health.state = OPEN
+                health.opened_at = now
+                health.cooldown = min(health.cooldown * 2, MAX_COOLDOWN)
+            elif health.state == CLOSED and (
+                health.consecutive_failures >= FAILURE_THRESHOLD or
+                (health.requests >= MIN_REQUESTS and health.error_rate >= ERROR_RATE_THRESHOLD)
+            ):
+                health.state = OPEN
+                health.opened_at = now
+            health.trial_in_flight = False
+
+    def release(self, model: str) -> None:
+        """Libera una prueba half-open que terminó sin resultado (p. ej. cancelada)"""
+        with self._lock:
+            health = self._get(model)
+            if health.state == HALF_OPEN and health.trial_in_flight:
+                health.state = OPEN
+                health.opened_at = time.time() - health.cooldown
+            health.trial_in_flight = False
+
+    def snapshot(self, models: Sequence[str]) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self._get(model).to_dict() for model in models]
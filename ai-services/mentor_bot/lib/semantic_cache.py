@@ -0,0 +1,247 @@
+"""
+Caché semántica de preguntas casi duplicadas
+
+La caché exacta (answer_cache) no reconoce paráfrasis: "deploy contract to
+Base" y "how to deploy on Base chain" tienen claves distintas. Este índice
+guarda un vector por cada pregunta ya respondida y, cuando la caché exacta
+falla, busca la pregunta más parecida del mismo idioma y contexto. Si la
+similitud coseno supera SEMANTIC_CACHE_THRESHOLD se sirve esa respuesta sin
+llamar a Gemini.
+
+Los vectores son n-gramas hasheados (palabras sin stopwords y trigramas de
+caracteres de cada palabra), calculados en CPU sin modelos ni dependencias
+extra. Como son léxicos, "deploy to Base" y "deploy to Arbitrum" se parecen
+mucho; por eso además los términos clave (chains, herramientas, redes y
+cualquier palabra con dígitos, p. ej. erc20) tienen que coincidir exactamente,
+igual que la intención de la pregunta ("what is an oracle" y "why do I need an
+oracle" hablan de lo mismo pero no tienen la misma respuesta) y si la pregunta
+lleva una negación ("should I use hardhat" / "should I not use hardhat").
+
+Las respuestas siguen viviendo en la caché exacta: el índice solo guarda la
+clave, así que TTL y evicción son los de answer_cache. El índice está solo en
+memoria y se reconstruye con las preguntas que llegan tras un reinicio.
+"""
+import os
+import threading
+import zlib
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from .answer_cache import AnswerCache, normalize_question
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+# Similitud coseno mínima para servir una respuesta guardada
+SIMILARITY_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.8"))
+# Preguntas indexadas; al llenarse se reemplazan las más antiguas
+MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "5000"))
+EMBEDDING_DIM = int(os.getenv("SEMANTIC_CACHE_DIM", "1024"))
+
+_INITIAL_CAPACITY = 64
+
+# Palabras sin contenido (en, fr, sw). Los interrogativos y verbos como
+# need/use/make no están: llevan la intención de la pregunta
+STOPWORDS = frozenset("""
+a an the to of in on for and or with do does did i my me is are can would could be it this that
+from by at as your you we chain network smart please guide way step steps
+le la les de des du un une et ou pour avec est sur dans je mon ma mes qui
+na ya wa za la cha ni je kwenye katika
+""".split())
+
+# Intención según el interrogativo (en, fr, sw); sin interrogativo la
+# pregunta es una instrucción ("deploy contract to Base"), o sea un "how"
+INTENTS = {
+    "what": "what", "which": "what", "que": "what", "quoi": "what", "quel": "what", "quelle": "what",
+    "nini": "what", "gani": "what",
+    "why": "why", "pourquoi": "why",
+    "how": "how", "comment": "how", "vipi": "how", "jinsi": "how", "ninawezaje": "how",
+    "when": "when", "quand": "when", "lini": "when",
+    "where": "where", "wapi": "where",
+    "should": "should", "dois": "should", "devrais": "should",
+}
+
+# Negaciones (en, fr, sw): "should I use hardhat" y "should I not use hardhat"
+# solo se distinguen por ellas. "don't" y "isn't" se normalizan a "don t"
+NEGATIONS = frozenset("""
+not no never without nor cannot t
+ne n pas jamais sans aucun
+si sio siyo bila hapana
+""".split())
+
+# Términos que cambian la respuesta aunque el resto de la pregunta sea igual
+KEY_TERMS = frozenset("""
+ethereum base arbitrum optimism polygon celo solana starknet zksync scroll linea avalanche bnb gnosis
+mainnet testnet sepolia goerli holesky devnet localhost
+solidity vyper rust cairo javascript typescript python golang
+hardhat foundry remix truffle anvil forge wagmi viem ethers ethersjs web3js web3py thirdweb
+react nextjs vue openzeppelin chainlink uniswap aave ipfs filecoin arweave metamask walletconnect
+""".split())
+
+
+def tokenize(question: str) -> List[str]:
+    """Palabras de la pregunta normalizada, sin stopwords"""
+    return [word for word in normalize_question(question).split() if word not in STOPWORDS]
+
+
+def question_intent(tokens: List[str]) -> str:
+    """Intención de la pregunta según su primer interrogativo ("kwa nini" es why)"""
+    for i, token in enumerate(tokens):
+        if token == "nini" and i > 0 and tokens[i - 1] == "kwa":
+            return "why"
+        if token in INTENTS:
+            return INTENTS[token]
+    return "how"
+
+
+def key_terms(tokens: List[str]) -> FrozenSet[str]:
+    """Lo que tiene que coincidir exactamente: KEY_TERMS, palabras con dígitos, intención y negación"""
+    terms = {t for t in tokens if t in KEY_TERMS or any(c.isdigit() for c in t)}
+    terms.add(f"intent:{question_intent(tokens)}")
+    if any(t in NEGATIONS for t in tokens):
+        terms.add("negated")
+    return frozenset(terms)
+
+
+def _bucket(feature: str, dim: int) -> Tuple[int, float]:
+    """Posición y signo de un feature (crc32: estable entre procesos, a diferencia de hash())"""
+    h = zlib.crc32(feature.encode("utf-8"))
+    return h % dim, 1.0 if h & 0x80000000 else -1.0
+
+
+def embed(tokens: List[str], dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """
+    Vector unitario de n-gramas hasheados (cero si no hay palabras)
+
+    Los interrogativos quedan fuera: la intención ya se compara exactamente
+    en key_terms, y "how" en solo una de dos paráfrasis las separaría.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for token in tokens:
+        if token in INTENTS:
+            continue
+        index, sign = _bucket(f"w:{token}", dim)
+        vector[index] += sign
+        # Trigramas de caracteres: "deploy" y "deploying" comparten casi todos
+        padded = f"<{token}>"
+        grams = [padded[i:i + 3] for i in range(len(padded) - 2)]
+        for gram in grams:
+            index, sign = _bucket(f"c:{gram}", dim)
+            vector[index] += sign / len(grams)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticCache:
+    """Índice de preguntas respondidas para buscar casi duplicados"""
+
+    def __init__(
+        self,
+        answers: AnswerCache,
+        threshold: float = SIMILARITY_THRESHOLD,
+        max_entries: int = MAX_ENTRIES,
+        dim: int = EMBEDDING_DIM
+    ):
+        self.answers = answers
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((min(_INITIAL_CAPACITY, max_entries), dim), dtype=np.float32)
+        self._scopes = np.zeros(len(self._vectors), dtype=np.int32)
+        self._keys: List[str] = []
+        self._terms: List[FrozenSet[str]] = []
+        self._slots: Dict[str, int] = {}
+        self._scope_ids: Dict[str, int] = {}
+        # Próximo slot a reemplazar cuando el índice está lleno
+        self._next = 0
+        self.hits = 0
+        self.misses = 0
+
+    def add(self, question: str, scope: str, key: str) -> None:
+        """Indexa una pregunta respondida (key es su clave en la caché exacta)"""
+        tokens = tokenize(question)
+        vector = embed(tokens, self.dim)
+        if not vector.any():
+            return
+        with self._lock:
+            if key in self._slots:
+                return
+            scope_id = self._scope_ids.setdefault(scope, len(self._scope_ids))
+            if len(self._keys) < self.max_entries:
+                slot = len(self._keys)
+                if slot == len(self._vectors):
+                    self._grow()
+                self._keys.append(key)
+                self._terms.append(key_terms(tokens))
+            else:
+                slot = self._next
+                self._next = (self._next + 1) % self.max_entries
+                del self._slots[self._keys[slot]]
+                self._keys[slot] = key
+                self._terms[slot] = key_terms(tokens)
+            self._vectors[slot] = vector
+            self._scopes[slot] = scope_id
+            self._slots[key] = slot
+
+    def _grow(self) -> None:
+        capacity = min(len(self._vectors) * 2, self.max_entries)
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        vectors[:len(self._vectors)] = self._vectors
+        scopes = np.zeros(capacity, dtype=np.int32)
+        scopes[:len(self._scopes)] = self._scopes
+        self._vectors, self._scopes = vectors, scopes
+
+    def lookup(self, question: str, scope: str) -> Optional[Tuple[dict, float]]:
+        """
+        Respuesta de la pregunta indexada más parecida, con su similitud
+
+        Solo se consideran preguntas del mismo scope (idioma y contexto), con
+        similitud >= threshold y los mismos términos clave.
+        """
+        tokens = tokenize(question)
+        vector = embed(tokens, self.dim)
+        terms = key_terms(tokens)
+        with self._lock:
+            scope_id = self._scope_ids.get(scope)
+            n = len(self._keys)
+            if scope_id is None or not n or not vector.any():
+                candidates = []
+            else:
+                similarities = self._vectors[:n] @ vector
+                rows = np.flatnonzero((self._scopes[:n] == scope_id) & (similarities >= self.threshold))
+                rows = rows[np.argsort(-similarities[rows], kind="stable")]
+                candidates = [
+                    (self._keys[row], float(similarities[row]))
+                    for row in rows.tolist() if self._terms[row] == terms
+                ]
+
+        for key, similarity in candidates:
+            # La respuesta puede haber expirado o salido de la caché exacta
+            payload = self.answers.get(key, record=False)
+            if payload is not None:
+                with self._lock:
+                    self.hits += 1
+                return payload, similarity
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._keys),
+                "maxEntries": self.max_entries,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def create_semantic_cache(answers: Optional[AnswerCache]) -> Optional[SemanticCache]:
+    """Caché semántica sobre la caché exacta (None si alguna está desactivada)"""
+    if answers is None or not SEMANTIC_CACHE_ENABLED:
+        return None
+    return SemanticCache(answers)
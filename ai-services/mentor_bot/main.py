@@ -1,8 +1,11 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator, Tuple
+import json
 import os
+import asyncio
 import logging
 
 # Configurar logging
@@ -26,6 +29,13 @@ except ImportError as e:
     logger.error(f"Error importando helper de Gemini: {e}")
     gemini_client = None
 
+# Caché de respuestas (None si ANSWER_CACHE_ENABLED=false)
+from lib.answer_cache import BYPASS_HISTORY, cache_key, create_answer_cache, scope_key
+from lib.semantic_cache import create_semantic_cache
+answer_cache = create_answer_cache()
+# Casi duplicados de preguntas ya respondidas (None si SEMANTIC_CACHE_ENABLED=false)
+semantic_cache = create_semantic_cache(answer_cache)
+
 app = FastAPI(
     title="SafariLink AI Mentor Bot",
     description="AI Mentor assistant powered by Google Gemini",
@@ -129,6 +139,74 @@ Never:
     lang_name = language_map.get(language, "English")
     return base_prompt.format(language=lang_name)
 
+def build_mentor_prompt(request: MentorRequest) -> Tuple[str, str]:
+    """Prompt completo para Gemini y el idioma de la respuesta"""
+    # Build context string
+    context_str = ""
+    if request.context:
+        context_str = f"\n\nContext:\n"
+        context_str += f"- Hackathon: {request.context.get('hackathonName', 'N/A')}\n"
+        context_str += f"- Chains: {', '.join(request.context.get('chains', []))}\n"
+        context_str += f"- User's tech stack: {', '.join(request.context.get('techStack', []))}\n"
+    
+    # Determine language
+    language = request.language or "en"
+    system_prompt = get_system_prompt(language)
+    
+    # Add language instruction to question if needed
+    question_with_lang = request.question
+    if language != "en":
+        question_with_lang = f"Please respond in {language}. {request.question}"
+    
+    # Build prompt for Gemini
+    full_prompt = f"{system_prompt}\n\n{question_with_lang}{context_str}"
+    
+    # Add conversation history if available
+    if request.conversationHistory:
+        conversation_text = ""
+        for msg in request.conversationHistory[-5:]:  # Last 5 messages
+            role = "User" if msg.get("role") == "user" else "Assistant"
+            conversation_text += f"{role}: {msg.get('content', '')}\n"
+        if conversation_text:
+            full_prompt = f"{system_prompt}\n\nConversation History:\n{conversation_text}\n\nCurrent Question:\n{question_with_lang}{context_str}"
+    
+    return full_prompt, language
+
+def answer_cache_key(request: MentorRequest) -> Optional[str]:
+    """Clave de la caché para la pregunta, o None si no se debe usar la caché"""
+    if answer_cache is None:
+        return None
+    if request.conversationHistory and BYPASS_HISTORY:
+        # Pregunta de seguimiento: la respuesta depende de la conversación
+        answer_cache.record_bypass()
+        return None
+    return cache_key(request.question, request.language or "en", request.context)
+
+def lookup_cached_answer(request: MentorRequest, key: str) -> Optional[dict]:
+    """Respuesta guardada para la pregunta: primero la clave exacta, luego casi duplicados"""
+    cached = answer_cache.get(key)
+    if cached is None and semantic_cache is not None:
+        match = semantic_cache.lookup(request.question, scope_key(request.language or "en", request.context))
+        if match is not None:
+            cached, similarity = match
+            logger.info(f"Pregunta casi duplicada (similitud {similarity:.2f}), respuesta servida desde la caché")
+    return cached
+
+def store_answer(request: MentorRequest, key: str, payload: dict) -> None:
+    """Guarda una respuesta en la caché y la indexa para búsquedas semánticas"""
+    answer_cache.put(key, payload)
+    if semantic_cache is not None:
+        semantic_cache.add(request.question, scope_key(request.language or "en", request.context), key)
+
+def answer_config() -> "GeminiConfig":
+    """Configurar generación con parámetros optimizados"""
+    return GeminiConfig(
+        temperature=0.7,
+        top_p=0.9,
+        top_k=40,
+        max_output_tokens=1500
+    )
+
 @app.post("/ask", response_model=MentorResponse)
 async def ask_mentor(request: MentorRequest):
     """
@@ -137,50 +215,14 @@ async def ask_mentor(request: MentorRequest):
     """
     
     try:
-        # Build context string
-        context_str = ""
-        if request.context:
-            context_str = f"\n\nContext:\n"
-            context_str += f"- Hackathon: {request.context.get('hackathonName', 'N/A')}\n"
-            context_str += f"- Chains: {', '.join(request.context.get('chains', []))}\n"
-            context_str += f"- User's tech stack: {', '.join(request.context.get('techStack', []))}\n"
+        key = answer_cache_key(request)
+        if key is not None:
+            cached = lookup_cached_answer(request, key)
+            if cached is not None:
+                logger.info("Respuesta servida desde la caché")
+                return MentorResponse(**cached)
         
-        # Build messages
-        messages = []
-        
-        # Add conversation history
-        for msg in request.conversationHistory[-5:]:  # Last 5 messages
-            messages.append({
-                "role": msg.get("role", "user"),
-                "content": msg.get("content", "")
-            })
-        
-        # Add current question
-        messages.append({
-            "role": "user",
-            "content": f"{request.question}{context_str}"
-        })
-        
-        # Determine language
-        language = request.language or "en"
-        system_prompt = get_system_prompt(language)
-        
-        # Add language instruction to question if needed
-        question_with_lang = request.question
-        if language != "en":
-            question_with_lang = f"Please respond in {language}. {request.question}"
-        
-        # Build prompt for Gemini
-        full_prompt = f"{system_prompt}\n\n{question_with_lang}{context_str}"
-        
-        # Add conversation history if available
-        if request.conversationHistory:
-            conversation_text = ""
-            for msg in request.conversationHistory[-5:]:
-                role = "User" if msg.get("role") == "user" else "Assistant"
-                conversation_text += f"{role}: {msg.get('content', '')}\n"
-            if conversation_text:
-                full_prompt = f"{system_prompt}\n\nConversation History:\n{conversation_text}\n\nCurrent Question:\n{question_with_lang}{context_str}"
+        full_prompt, language = build_mentor_prompt(request)
         
         # Call Gemini usando el helper avanzado
         if gemini_client is None:
@@ -189,13 +231,7 @@ async def ask_mentor(request: MentorRequest):
                 detail="Gemini client not initialized. Check GEMINI_API_KEY environment variable."
             )
         
-        # Configurar generación con parámetros optimizados
-        config = GeminiConfig(
-            temperature=0.7,
-            top_p=0.9,
-            top_k=40,
-            max_output_tokens=1500
-        )
+        config = answer_config()
         
         # Preparar historial de conversación para Gemini
         # Nota: Por ahora, el historial se incluye en el prompt completo
@@ -204,8 +240,8 @@ async def ask_mentor(request: MentorRequest):
         # El historial ya está incluido en full_prompt, así que no lo pasamos por separado
         # para evitar problemas de formato. Esto se puede mejorar en el futuro.
         
-        # Generar respuesta usando el helper
-        result = gemini_client.generate_content(
+        # Generar respuesta usando el helper (async: no bloquea el event loop mientras Gemini responde)
+        result = await gemini_client.generate_content_async(
             prompt=full_prompt,
             config=config,
             extract_json=False,
@@ -237,17 +273,108 @@ async def ask_mentor(request: MentorRequest):
         # Generate related questions
         related = generate_related_questions(request.question, language)
         
-        return MentorResponse(
+        response = MentorResponse(
             answer=answer,
             suggestedResources=resources,
             relatedQuestions=related,
             language=language,
             modelUsed=model_used
         )
+        if key is not None:
+            store_answer(request, key, response.model_dump())
+        return response
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def sse_event(event: str, data: dict) -> str:
+    """Formatea un evento server-sent events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/ask/stream")
+async def ask_mentor_stream(request: MentorRequest):
+    """
+    Ask the AI mentor a question, streaming the answer as server-sent events
+    
+    Eventos:
+    - chunk: {"text": ...} por cada fragmento de la respuesta
+    - done: {"suggestedResources", "relatedQuestions", "language", "modelUsed"} al final
+    - error: {"detail": ...} si Gemini falla después del primer fragmento
+    """
+    key = answer_cache_key(request)
+    cached = lookup_cached_answer(request, key) if key is not None else None
+    if cached is not None:
+        logger.info("Respuesta servida desde la caché (streaming)")
+        
+        async def cached_events() -> AsyncIterator[str]:
+            yield sse_event("chunk", {"text": cached["answer"]})
+            yield sse_event("done", {
+                "suggestedResources": cached["suggestedResources"],
+                "relatedQuestions": cached["relatedQuestions"],
+                "language": cached["language"],
+                "modelUsed": cached["modelUsed"]
+            })
+        
+        return StreamingResponse(
+            cached_events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    full_prompt, language = build_mentor_prompt(request)
+    
+    if gemini_client is None:
+        raise HTTPException(
+            status_code=500,
+            detail="Gemini client not initialized. Check GEMINI_API_KEY environment variable."
+        )
+    
+    chunks = gemini_client.stream_content_async(full_prompt, config=answer_config())
+    
+    # Esperar el primer fragmento antes de responder: si todos los modelos
+    # fallan, el cliente recibe un 500 como en /ask en vez de un stream vacío
+    try:
+        model_used, first_text = await chunks.__anext__()
+    except StopAsyncIteration:
+        raise HTTPException(status_code=500, detail="Respuesta vacía del modelo Gemini")
+    except Exception as e:
+        logger.error(f"Error generando respuesta: {e}")
+        raise HTTPException(status_code=500, detail=f"Error calling Gemini API: {str(e)}")
+    
+    async def events() -> AsyncIterator[str]:
+        answer_parts = [first_text]
+        yield sse_event("chunk", {"text": first_text})
+        try:
+            async for _, text in chunks:
+                answer_parts.append(text)
+                yield sse_event("chunk", {"text": text})
+        except Exception as e:
+            logger.error(f"Error durante el streaming de la respuesta: {e}")
+            yield sse_event("error", {"detail": f"Error calling Gemini API: {str(e)}"})
+            return
+        finally:
+            # Cierra la petición a Gemini si el cliente se desconecta a mitad
+            await chunks.aclose()
+        
+        logger.info(f"Respuesta en streaming completada usando modelo: {model_used}")
+        final = {
+            "suggestedResources": generate_resources(request.question, request.context),
+            "relatedQuestions": generate_related_questions(request.question, language),
+            "language": language,
+            "modelUsed": model_used
+        }
+        # Solo se guardan respuestas completas (no las cortadas por un error)
+        if key is not None:
+            store_answer(request, key, {"answer": "".join(answer_parts), **final})
+        yield sse_event("done", final)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Sin caché ni buffering en proxies, para que cada fragmento llegue en cuanto se genera
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 def generate_resources(question: str, context: dict) -> List[dict]:
     """Generate relevant resource links based on question"""
     resources = []
@@ -420,6 +547,45 @@ def generate_related_questions(question: str, language: str = "en") -> List[str]
     
     return related[:3]  # Max 3 related questions
 
+# Probe en segundo plano de los modelos con el breaker abierto
+health_probe_task: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def start_health_probes():
+    global health_probe_task
+    if gemini_client is not None:
+        health_probe_task = asyncio.create_task(gemini_client.run_health_probes())
+
+@app.on_event("shutdown")
+async def stop_health_probes():
+    if health_probe_task is not None:
+        health_probe_task.cancel()
+
+@app.get("/models/health")
+async def models_health():
+    """
+    Estado del circuit breaker y métricas de cada modelo de Gemini
+    (llamadas, éxitos, fallos, tasa de error y latencia EWMA)
+    """
+    if gemini_client is None:
+        raise HTTPException(status_code=503, detail="Gemini client not initialized")
+    return {
+        "backgroundProbes": gemini_client.health.background_probes,
+        "models": gemini_client.health_snapshot()
+    }
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Aciertos, fallos y tamaño de la caché de respuestas"""
+    if answer_cache is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "bypassHistory": BYPASS_HISTORY,
+        **answer_cache.stats(),
+        "semantic": semantic_cache.stats() if semantic_cache is not None else None
+    }
+
 @app.get("/health")
 async def health():
     """Health check endpoint"""
@@ -443,7 +609,7 @@ async def test_gemini():
         )
     
     try:
-        result = gemini_client.test_connection()
+        result = await gemini_client.test_connection_async()
         
         if result.get("success"):
             return TestGeminiResponse(
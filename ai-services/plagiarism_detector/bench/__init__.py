@@ -0,0 +1 @@
+"""Offline benchmark suite for the plagiarism detector (see run_benchmark.py)"""
@@ -0,0 +1,219 @@
+"""
+Offline stand-in for the parts of the GitHub REST API the detector uses
+
+Serves deterministic fixtures (generated from a seed) for:
+    GET /repos/{owner}/{repo}            repo metadata, some repos are forks
+    GET /repos/{owner}/{repo}/commits    paginated commit lists, 409 when empty
+    GET /repos/{owner}/{repo}/languages
+    GET /search/repositories             keyword search over fixture descriptions
+    GET /rate_limit
+
+Responses carry ETags (If-None-Match is answered with 304) and generous
+X-RateLimit-* headers, so the client cache and rate-limit scheduler follow
+their normal code paths without ever throttling. An optional artificial
+latency approximates the round trip to api.github.com.
+
+Run standalone:
+    python -m bench.fake_github --port 9000 --repos 500
+and point the detector at it with GITHUB_API_URL=http://127.0.0.1:9000
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+
+from .synthetic import generate_corpus
+
+RATE_LIMIT = 1_000_000
+LANGUAGES = ['TypeScript', 'Solidity', 'Python', 'Rust', 'JavaScript', 'Go', 'CSS', 'Cairo']
+START_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def repo_names(count: int) -> List[str]:
+    """owner/repo names of the fixture repositories"""
+    return [f'team{i}/project-{i}' for i in range(count)]
+
+
+def _commits(full_name: str, count: int, rng: random.Random) -> List[dict]:
+    """Commit list, newest first, as returned by /repos/{owner}/{repo}/commits"""
+    authors = [f'{full_name.split("/")[0]}-dev{k}' for k in range(rng.randint(1, 4))]
+    when = START_DATE + timedelta(days=rng.randrange(300))
+    commits = []
+    for n in range(count):
+        when += timedelta(minutes=rng.randint(5, 600))
+        login = rng.choice(authors)
+        commits.append({
+            'sha': hashlib.sha1(f'{full_name}:{n}'.encode('utf-8')).hexdigest(),
+            'author': {'login': login},
+            'commit': {
+                'author': {
+                    'name': login,
+                    'email': f'{login}@example.com',
+                    'date': when.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                },
+                'message': f'Commit {n}',
+            },
+        })
+    commits.reverse()
+    return commits
+
+
+def build_fixtures(repos: int = 500, seed: int = 0, fork_rate: float = 0.1) -> Dict[str, dict]:
+    """
+    Fixture repositories keyed by lowercase owner/repo
+
+    Each value holds the repo payload, its commits and languages. Repo
+    descriptions come from the synthetic corpus generator, so public-repo
+    matches happen at realistic rates.
+    """
+    rng = random.Random(seed)
+    descriptions = generate_corpus(repos, seed=seed + 1, id_prefix='public')
+    names = repo_names(repos)
+    fixtures = {}
+    for i, full_name in enumerate(names):
+        owner, name = full_name.split('/')
+        is_fork = i > 0 and rng.random() < fork_rate
+        # A few empty and near-empty repos trigger the low-commit flag
+        roll = rng.random()
+        commit_count = 0 if roll < 0.03 else rng.randint(1, 2) if roll < 0.1 else rng.randint(3, 400)
+        commits = _commits(full_name, commit_count, rng)
+        pushed_at = commits[0]['commit']['author']['date'] if commits else START_DATE.strftime('%Y-%m-%dT%H:%M:%SZ')
+        repo = {
+            'id': i + 1,
+            'name': name,
+            'full_name': full_name,
+            'owner': {'login': owner},
+            'html_url': f'https://github.com/{full_name}',
+            'description': descriptions[i]['description'],
+            'fork': is_fork,
+            'stargazers_count': rng.randint(0, 5000),
+            'created_at': START_DATE.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'pushed_at': pushed_at,
+        }
+        if is_fork:
+            repo['parent'] = {'full_name': names[rng.randrange(i)]}
+        languages = {lang: rng.randint(1_000, 500_000) for lang in rng.sample(LANGUAGES, rng.randint(1, 3))}
+        fixtures[full_name.lower()] = {'repo': repo, 'commits': commits, 'languages': languages}
+    return fixtures
+
+
+def create_app(fixtures: Dict[str, dict], latency: float = 0.0) -> FastAPI:
+    """
+    Fake GitHub API over the given fixtures
+
+    Args:
+        fixtures: Output of build_fixtures
+        latency: Seconds added to every response
+    """
+    app = FastAPI()
+    app.state.requests = 0
+
+    # Inverted index word -> repos for /search/repositories
+    search_index: Dict[str, set] = {}
+    for key, fixture in fixtures.items():
+        for word in set((fixture['repo']['description'] or '').lower().split()):
+            search_index.setdefault(word, set()).add(key)
+
+    def respond(request: Request, status: int, data, resource: str = 'core') -> Response:
+        app.state.requests += 1
+        body = json.dumps(data).encode('utf-8')
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        headers = {
+            'ETag': etag,
+            'X-RateLimit-Limit': str(RATE_LIMIT),
+            'X-RateLimit-Remaining': str(RATE_LIMIT - app.state.requests % RATE_LIMIT),
+            'X-RateLimit-Reset': str(int(time.time()) + 3600),
+            'X-RateLimit-Resource': resource,
+        }
+        if status == 200 and request.headers.get('if-none-match') == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, status_code=status, headers=headers, media_type='application/json')
+
+    def not_found(request: Request) -> Response:
+        return respond(request, 404, {'message': 'Not Found'})
+
+    if latency > 0:
+        @app.middleware('http')
+        async def add_latency(request: Request, call_next):
+            await asyncio.sleep(latency)
+            return await call_next(request)
+
+    @app.get('/repos/{owner}/{repo}')
+    async def get_repo(owner: str, repo: str, request: Request):
+        fixture = fixtures.get(f'{owner}/{repo}'.lower())
+        return respond(request, 200, fixture['repo']) if fixture else not_found(request)
+
+    @app.get('/repos/{owner}/{repo}/commits')
+    async def list_commits(owner: str, repo: str, request: Request, per_page: int = 30, page: int = 1):
+        fixture = fixtures.get(f'{owner}/{repo}'.lower())
+        if fixture is None:
+            return not_found(request)
+        if not fixture['commits']:
+            return respond(request, 409, {'message': 'Git Repository is empty.'})
+        per_page = max(1, min(per_page, 100))
+        start = (page - 1) * per_page
+        return respond(request, 200, fixture['commits'][start:start + per_page])
+
+    @app.get('/repos/{owner}/{repo}/languages')
+    async def list_languages(owner: str, repo: str, request: Request):
+        fixture = fixtures.get(f'{owner}/{repo}'.lower())
+        return respond(request, 200, fixture['languages']) if fixture else not_found(request)
+
+    @app.get('/search/repositories')
+    async def search_repositories(request: Request, q: str = '', per_page: int = 30, page: int = 1):
+        # Rank by number of query words found in the description, then stars
+        hits: Dict[str, int] = {}
+        for word in set(q.lower().split()):
+            for key in search_index.get(word, ()):
+                hits[key] = hits.get(key, 0) + 1
+        ranked = sorted(
+            hits,
+            key=lambda key: (hits[key], fixtures[key]['repo']['stargazers_count']),
+            reverse=True
+        )
+        per_page = max(1, min(per_page, 100))
+        start = (page - 1) * per_page
+        items = [fixtures[key]['repo'] for key in ranked[start:start + per_page]]
+        return respond(request, 200, {
+            'total_count': len(ranked),
+            'incomplete_results': False,
+            'items': items,
+        }, resource='search')
+
+    @app.get('/rate_limit')
+    async def rate_limit(request: Request):
+        return respond(request, 200, {
+            'resources': {
+                'core': {'limit': RATE_LIMIT, 'remaining': RATE_LIMIT},
+                'search': {'limit': RATE_LIMIT, 'remaining': RATE_LIMIT},
+            },
+            'requestsServed': app.state.requests,
+        })
+
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='Offline GitHub API stand-in')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--repos', type=int, default=500, help='Number of fixture repositories')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Delay added to every response')
+    args = parser.parse_args(argv)
+
+    app = create_app(build_fixtures(args.repos, args.seed), args.latency_ms / 1000)
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
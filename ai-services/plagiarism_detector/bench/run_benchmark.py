@@ -0,0 +1,304 @@
+"""
+Latency and throughput benchmark for the plagiarism detector
+
+Grows a synthetic corpus through several sizes and, at each size, measures:
+    similarity   calculate_text_similarity on description pairs
+    single       POST /check-plagiarism, --concurrency requests in flight
+    batch        POST /check-plagiarism/batch, whole stream consumed
+
+GitHub is replaced by bench.fake_github (started as a subprocess unless
+--github-url is given), so runs are offline and repeatable. By default the
+detector runs in-process with its corpus, code index and caches in a
+temporary directory; --detector-url benchmarks a running deployment instead
+(point that deployment's GITHUB_API_URL at the fake server).
+
+Usage, from the plagiarism_detector directory:
+    python -m bench.run_benchmark --corpus-sizes 1000,10000 --output results.json
+    python -m bench.run_benchmark --baseline results.json   # exit 1 on regression
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from .fake_github import repo_names
+from .synthetic import generate_corpus, make_description, mutate
+
+INGEST_CHUNK = 1000
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p99 of latencies given in seconds, reported in milliseconds"""
+    if not samples:
+        return {'p50Ms': 0.0, 'p99Ms': 0.0}
+    values = np.asarray(samples) * 1000
+    return {
+        'p50Ms': round(float(np.percentile(values, 50)), 3),
+        'p99Ms': round(float(np.percentile(values, 99)), 3),
+    }
+
+
+def row(scenario: str, corpus_size: int, samples: List[float], elapsed: float,
+        units: int, unit: str, errors: int = 0) -> dict:
+    return {
+        'scenario': scenario,
+        'corpusSize': corpus_size,
+        'count': len(samples),
+        **percentiles(samples),
+        'throughput': round(units / elapsed, 2) if elapsed > 0 else 0.0,
+        'unit': unit,
+        'errors': errors,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_github(repos: int, seed: int, latency_ms: float) -> tuple:
+    """Launch bench.fake_github in a subprocess; returns (process, base URL)"""
+    port = free_port()
+    process = subprocess.Popen([
+        sys.executable, '-m', 'bench.fake_github',
+        '--port', str(port), '--repos', str(repos),
+        '--seed', str(seed), '--latency-ms', str(latency_ms),
+    ])
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('Fake GitHub server exited during startup')
+        try:
+            httpx.get(f'{url}/rate_limit', timeout=1)
+            return process, url
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError('Fake GitHub server did not start in time')
+
+
+class Workload:
+    """Deterministic check requests against the fixture repos and corpus"""
+
+    def __init__(self, corpus: List[dict], repos: int, seed: int, near_duplicate_rate: float = 0.3):
+        self.corpus = corpus
+        self.repos = repo_names(repos)
+        self.rng = random.Random(seed)
+        self.near_duplicate_rate = near_duplicate_rate
+        self.counter = 0
+
+    def check(self, corpus_size: int, label: str) -> dict:
+        rng = self.rng
+        self.counter += 1
+        if rng.random() < self.near_duplicate_rate:
+            description = mutate(self.corpus[rng.randrange(corpus_size)]['description'], rng)
+        else:
+            description = make_description(rng)
+        # A few unknown repos keep the 404 path in the mix
+        if rng.random() < 0.05:
+            github_url = f'https://github.com/ghost/missing-{self.counter}'
+        else:
+            github_url = f'https://github.com/{rng.choice(self.repos)}'
+        return {
+            'projectId': f'bench-{label}-{self.counter}',
+            'description': description,
+            'githubUrl': github_url,
+            'hackathonId': f'hack-{rng.randrange(20)}',
+        }
+
+
+def bench_similarity(corpus: List[dict], corpus_size: int, pairs: int, seed: int) -> dict:
+    """Time calculate_text_similarity on a mix of near-duplicate and unrelated pairs"""
+    from main import calculate_text_similarity
+
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(pairs):
+        first = corpus[rng.randrange(corpus_size)]['description']
+        second = mutate(first, rng) if rng.random() < 0.5 else corpus[rng.randrange(corpus_size)]['description']
+        texts.append((first, second))
+
+    samples = []
+    started = time.perf_counter()
+    for first, second in texts:
+        t0 = time.perf_counter()
+        calculate_text_similarity(first, second)
+        samples.append(time.perf_counter() - t0)
+    return row('similarity', corpus_size, samples, time.perf_counter() - started, pairs, 'pairs/s')
+
+
+async def ingest(client: httpx.AsyncClient, projects: List[dict]) -> float:
+    """Load projects through /corpus/projects; returns elapsed seconds"""
+    started = time.perf_counter()
+    for start in range(0, len(projects), INGEST_CHUNK):
+        response = await client.post('/corpus/projects', json={'projects': projects[start:start + INGEST_CHUNK]})
+        response.raise_for_status()
+    return time.perf_counter() - started
+
+
+async def bench_single(client: httpx.AsyncClient, workload: Workload, corpus_size: int,
+                       count: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[float] = []
+    errors = 0
+
+    async def one(payload: dict) -> None:
+        nonlocal errors
+        async with semaphore:
+            t0 = time.perf_counter()
+            response = await client.post('/check-plagiarism', json=payload)
+            samples.append(time.perf_counter() - t0)
+            if response.status_code != 200:
+                errors += 1
+
+    payloads = [workload.check(corpus_size, 'single') for _ in range(count)]
+    started = time.perf_counter()
+    await asyncio.gather(*(one(payload) for payload in payloads))
+    return row('single', corpus_size, samples, time.perf_counter() - started, count, 'checks/s', errors)
+
+
+async def bench_batch(client: httpx.AsyncClient, workload: Workload, corpus_size: int,
+                      batches: int, batch_size: int) -> dict:
+    samples: List[float] = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(batches):
+        projects = [workload.check(corpus_size, 'batch') for _ in range(batch_size)]
+        t0 = time.perf_counter()
+        async with client.stream('POST', '/check-plagiarism/batch', json={'projects': projects}) as response:
+            async for line in response.aiter_lines():
+                if line and 'error' in json.loads(line):
+                    errors += 1
+        samples.append(time.perf_counter() - t0)
+    return row('batch', corpus_size, samples, time.perf_counter() - started,
+               batches * batch_size, 'checks/s', errors)
+
+
+def compare(results: List[dict], baseline: List[dict], tolerance: float) -> List[str]:
+    """Regressions of p50 latency or throughput beyond tolerance, as messages"""
+    previous = {(r['scenario'], r['corpusSize']): r for r in baseline}
+    regressions = []
+    for result in results:
+        base = previous.get((result['scenario'], result['corpusSize']))
+        if base is None:
+            continue
+        label = f"{result['scenario']} @ {result['corpusSize']}"
+        if base['p50Ms'] and result['p50Ms'] > base['p50Ms'] * (1 + tolerance):
+            regressions.append(f"{label}: p50 {base['p50Ms']}ms -> {result['p50Ms']}ms")
+        if base['throughput'] and result['throughput'] < base['throughput'] * (1 - tolerance):
+            regressions.append(f"{label}: throughput {base['throughput']} -> {result['throughput']} {result['unit']}")
+    return regressions
+
+
+def print_table(results: List[dict]) -> None:
+    header = f"{'scenario':<12}{'corpus':>9}{'count':>8}{'p50 ms':>12}{'p99 ms':>12}{'throughput':>14}  unit       errors"
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(f"{r['scenario']:<12}{r['corpusSize']:>9}{r['count']:>8}{r['p50Ms']:>12.3f}{r['p99Ms']:>12.3f}"
+              f"{r['throughput']:>14.2f}  {r['unit']:<11}{r['errors']}")
+
+
+async def run(args: argparse.Namespace) -> List[dict]:
+    sizes = sorted(int(size) for size in args.corpus_sizes.split(','))
+    corpus = generate_corpus(sizes[-1], seed=args.seed)
+    workload = Workload(corpus, args.repos, args.seed)
+
+    if args.detector_url:
+        client = httpx.AsyncClient(base_url=args.detector_url, timeout=None)
+        close_detector = None
+    else:
+        import main
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url='http://detector', timeout=None)
+        close_detector = main.close_clients
+
+    results = []
+    loaded = 0
+    try:
+        for size in sizes:
+            # The corpus only grows, so each size adds the next slice
+            elapsed = await ingest(client, corpus[loaded:size])
+            print(f"Corpus at {size} projects (+{size - loaded} in {elapsed:.2f}s)", file=sys.stderr)
+            loaded = size
+
+            results.append(bench_similarity(corpus, size, args.similarity_pairs, args.seed))
+            results.append(await bench_single(client, workload, size, args.single_requests, args.concurrency))
+            results.append(await bench_batch(client, workload, size, args.batches, args.batch_size))
+    finally:
+        await client.aclose()
+        if close_detector is not None:
+            await close_detector()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Plagiarism detector benchmark')
+    parser.add_argument('--corpus-sizes', default='1000,10000', help='Comma-separated corpus sizes')
+    parser.add_argument('--single-requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8, help='Single checks in flight at once')
+    parser.add_argument('--batches', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--similarity-pairs', type=int, default=2000)
+    parser.add_argument('--repos', type=int, default=500, help='Fixture repositories on the fake GitHub')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Simulated GitHub round trip')
+    parser.add_argument('--github-cache-ttl', help='Override GITHUB_CACHE_TTL for the in-process detector')
+    parser.add_argument('--github-url', help='Use an already running fake GitHub')
+    parser.add_argument('--detector-url', help='Benchmark a running detector instead of an in-process one')
+    parser.add_argument('--output', help='Write results as JSON')
+    parser.add_argument('--baseline', help='Earlier --output file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative regression')
+    args = parser.parse_args(argv)
+
+    fake_github = None
+    if args.github_url:
+        github_url = args.github_url
+    else:
+        fake_github, github_url = start_fake_github(args.repos, args.seed, args.latency_ms)
+
+    # The detector reads its configuration at import time
+    workdir = tempfile.mkdtemp(prefix='plagiarism-bench-')
+    os.environ['GITHUB_API_URL'] = github_url
+    os.environ.setdefault('GITHUB_TOKEN', 'bench')
+    os.environ['CORPUS_DB_PATH'] = os.path.join(workdir, 'corpus.db')
+    os.environ['CODE_INDEX_DB_PATH'] = os.path.join(workdir, 'code_fingerprints.db')
+    os.environ['COMMIT_HISTORY_DB_PATH'] = os.path.join(workdir, 'commit_history.db')
+    os.environ['GITHUB_CACHE_DIR'] = os.path.join(workdir, 'github-cache')
+    if args.github_cache_ttl is not None:
+        os.environ['GITHUB_CACHE_TTL'] = args.github_cache_ttl
+
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        if fake_github is not None:
+            fake_github.terminate()
+            fake_github.wait()
+
+    print_table(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f)['results'], args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Synthetic hackathon project descriptions
+
+Descriptions are assembled from templates and word lists, so a corpus of
+any size can be generated deterministically from a seed. A share of the
+corpus is derived from earlier entries (light edits or paraphrases) so the
+near-duplicate paths of the detector get exercised, not only the misses.
+"""
+import random
+from typing import Dict, List, Optional
+
+ADJECTIVES = [
+    'decentralized', 'open-source', 'privacy-preserving', 'gas-efficient', 'community-driven',
+    'mobile-first', 'cross-chain', 'permissionless', 'AI-powered', 'lightweight', 'trustless',
+    'real-time', 'modular', 'self-custodial', 'low-cost', 'transparent', 'scalable', 'offline-first',
+]
+PRODUCTS = [
+    'marketplace', 'wallet', 'lending protocol', 'DAO toolkit', 'payment gateway', 'identity layer',
+    'crowdfunding platform', 'supply chain tracker', 'NFT ticketing system', 'remittance app',
+    'carbon credit registry', 'prediction market', 'savings circle', 'micro-insurance pool',
+    'freelancer escrow', 'land registry', 'voting dApp', 'loyalty program', 'oracle network',
+    'learning platform', 'health records vault', 'agritech exchange', 'streaming payments service',
+]
+AUDIENCES = [
+    'smallholder farmers', 'students', 'freelancers', 'local merchants', 'artists', 'NGOs',
+    'unbanked communities', 'developers', 'gamers', 'cooperatives', 'musicians', 'patients',
+    'small businesses', 'event organizers', 'diaspora families', 'content creators',
+]
+ACTIONS = [
+    'send money across borders', 'borrow against their harvest', 'prove their credentials',
+    'sell digital collectibles', 'pool savings with friends', 'track goods from farm to shelf',
+    'vote on community budgets', 'get paid per second', 'insure their crops against drought',
+    'issue verifiable certificates', 'buy tickets without scalpers', 'offset their emissions',
+    'earn rewards for learning', 'share medical records securely', 'raise funds transparently',
+]
+TECHNOLOGIES = [
+    'zero-knowledge proofs', 'smart contracts', 'account abstraction', 'IPFS storage',
+    'Chainlink oracles', 'soulbound tokens', 'stablecoins', 'USSD fallbacks', 'on-chain governance',
+    'layer-2 rollups', 'machine learning', 'QR code payments', 'multisig vaults', 'ERC-4337 paymasters',
+]
+CHAINS = [
+    'Ethereum', 'Polygon', 'Arbitrum', 'Optimism', 'Base', 'Celo', 'Avalanche', 'Solana',
+    'Starknet', 'Scroll', 'Lisk', 'Mantle',
+]
+FEATURES = [
+    'settles payments in seconds', 'works on feature phones', 'hides balances from third parties',
+    'supports fiat on-ramps', 'rewards early adopters', 'lets users recover lost keys',
+    'integrates with mobile money', 'keeps fees under a cent', 'exposes a public API',
+    'ships with a React dashboard', 'uses reputation scores', 'runs audits automatically',
+    'batches transactions to save gas', 'translates the interface into Swahili',
+]
+NAME_PARTS = [
+    'Safari', 'Baobab', 'Kilima', 'Jua', 'Tembo', 'Simba', 'Nuru', 'Pesa', 'Umoja', 'Zawadi',
+    'Mto', 'Nyota', 'Bahari', 'Ardhi', 'Moto', 'Shamba', 'Kazi', 'Rafiki', 'Tumaini', 'Amani',
+]
+
+TEMPLATES = [
+    "{name} is a {adj} {product} that lets {audience} {action} using {tech}. "
+    "Built on {chain}, it {feature} and {feature2}.",
+    "We built {name}, a {adj} {product} on {chain}. {name} helps {audience} {action}; "
+    "under the hood it relies on {tech}, {feature} and {feature2}.",
+    "{name}: {action} with a {adj} {product} for {audience}. The project combines {tech} "
+    "with {chain} so that it {feature}. It also {feature2}.",
+    "Our team created {name} to help {audience} {action}. It is a {adj} {product} powered by "
+    "{tech} and deployed to {chain}. Highlights: it {feature}, and it {feature2}.",
+]
+
+# Word swaps used when paraphrasing an existing description
+SYNONYMS = {
+    'lets': 'allows', 'helps': 'enables', 'built': 'developed', 'created': 'made',
+    'uses': 'leverages', 'relies': 'depends', 'project': 'product', 'team': 'group',
+    'supports': 'offers', 'keeps': 'holds', 'send': 'transfer', 'sell': 'trade',
+    'secure': 'safe', 'securely': 'safely', 'fast': 'quick', 'seconds': 'moments',
+}
+
+
+def make_description(rng: random.Random) -> str:
+    """One original description"""
+    feature, feature2 = rng.sample(FEATURES, 2)
+    return rng.choice(TEMPLATES).format(
+        name=rng.choice(NAME_PARTS) + rng.choice(NAME_PARTS).lower(),
+        adj=rng.choice(ADJECTIVES),
+        product=rng.choice(PRODUCTS),
+        audience=rng.choice(AUDIENCES),
+        action=rng.choice(ACTIONS),
+        tech=rng.choice(TECHNOLOGIES),
+        chain=rng.choice(CHAINS),
+        feature=feature,
+        feature2=feature2,
+    )
+
+
+def mutate(description: str, rng: random.Random, rate: float = 0.1) -> str:
+    """Lightly edited copy: a share of the words dropped or swapped for synonyms"""
+    words = []
+    for word in description.split():
+        roll = rng.random()
+        if roll < rate / 2:
+            continue
+        if roll < rate and word.lower() in SYNONYMS:
+            word = SYNONYMS[word.lower()]
+        words.append(word)
+    return ' '.join(words)
+
+
+def paraphrase(description: str, rng: random.Random) -> str:
+    """Same content with its sentences reordered and synonyms applied throughout"""
+    sentences = [s.strip() for s in description.split('. ') if s.strip()]
+    rng.shuffle(sentences)
+    text = '. '.join(s.rstrip('.') for s in sentences) + '.'
+    return ' '.join(SYNONYMS.get(word.lower(), word) for word in text.split())
+
+
+def generate_corpus(
+    size: int,
+    seed: int = 0,
+    duplicate_rate: float = 0.05,
+    paraphrase_rate: float = 0.05,
+    hackathons: int = 20,
+    id_prefix: str = 'proj'
+) -> List[Dict[str, Optional[str]]]:
+    """
+    Deterministic corpus of project submissions
+
+    Args:
+        size: Number of projects
+        seed: Random seed; the same seed always yields the same corpus
+        duplicate_rate: Share of projects that are light edits of an earlier one
+        paraphrase_rate: Share of projects that are paraphrases of an earlier one
+        hackathons: Number of hackathonIds the projects are spread across
+        id_prefix: Prefix of the generated projectIds
+
+    Returns:
+        List of {projectId, hackathonId, description} dicts
+    """
+    rng = random.Random(seed)
+    projects = []
+    for i in range(size):
+        roll = rng.random()
+        if projects and roll < duplicate_rate:
+            description = mutate(rng.choice(projects)['description'], rng)
+        elif projects and roll < duplicate_rate + paraphrase_rate:
+            description = paraphrase(rng.choice(projects)['description'], rng)
+        else:
+            description = make_description(rng)
+        projects.append({
+            'projectId': f'{id_prefix}-{i}',
+            'hackathonId': f'hack-{rng.randrange(hackathons)}',
+            'description': description,
+        })
+    return projects
@@ -0,0 +1,43 @@
+"""Similarity and indexing helpers for the plagiarism detector"""
+from .minhash import (
+    MinHashLSH,
+    minhash_signature,
+    estimate_jaccard,
+    NUM_PERM,
+)
+from .commit_history import CommitHistory, CommitHistoryStore
+from .corpus import ProjectCorpus, CorpusEntry
+from .github_client import GitHubClient, GitHubError, GitHubResponse, get_github_client
+from .github_scheduler import BATCH, INTERACTIVE, GitHubRateLimited, GitHubScheduler
+from .result_cache import ResultCache
+from .similarity import similarities_above, score_descriptions
+from .tfidf import similar_pairs, tfidf_matrix
+from .winnowing import CodeFingerprintIndex, fingerprint_source, iter_snapshot_sources, resolve_snapshot
+
+__all__ = [
+    "MinHashLSH",
+    "minhash_signature",
+    "estimate_jaccard",
+    "NUM_PERM",
+    "CommitHistory",
+    "CommitHistoryStore",
+    "ProjectCorpus",
+    "CorpusEntry",
+    "GitHubClient",
+    "GitHubError",
+    "GitHubResponse",
+    "get_github_client",
+    "BATCH",
+    "INTERACTIVE",
+    "GitHubRateLimited",
+    "GitHubScheduler",
+    "ResultCache",
+    "similarities_above",
+    "score_descriptions",
+    "similar_pairs",
+    "tfidf_matrix",
+    "CodeFingerprintIndex",
+    "fingerprint_source",
+    "iter_snapshot_sources",
+    "resolve_snapshot",
+]
@@ -0,0 +1,187 @@
+"""
+Incremental commit history statistics per repository
+
+The first check of a repo pages through its whole commit list; later checks
+fetch pages only until they reach the last SHA seen before, and fold just
+the new commits into the stored statistics. During a hackathon, repeated
+checks of the same repo usually cost a single (often 304) request.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .github_client import GitHubClient, GitHubError
+from .github_scheduler import INTERACTIVE
+
+PER_PAGE = 100
+# Upper bound on pages fetched in one sync (10k commits)
+MAX_PAGES = int(os.getenv('COMMIT_HISTORY_MAX_PAGES', '100'))
+
+
+def empty_stats() -> dict:
+    return {
+        'commitCount': 0,
+        'authors': {},
+        'firstCommitAt': None,
+        'lastCommitAt': None,
+        'byHour': [0] * 24,
+        'byWeekday': [0] * 7,
+        'byDay': {},
+        'truncated': False,
+    }
+
+
+def _author_key(commit: dict) -> str:
+    author = commit.get('author') or {}
+    if author.get('login'):
+        return author['login']
+    git_author = (commit.get('commit') or {}).get('author') or {}
+    return git_author.get('email') or git_author.get('name') or 'unknown'
+
+
+def apply_commits(stats: dict, commits: List[dict]) -> dict:
+    """Fold a list of commits into the running statistics"""
+    for commit in commits:
+        stats['commitCount'] += 1
+        author = _author_key(commit)
+        stats['authors'][author] = stats['authors'].get(author, 0) + 1
+
+        date = ((commit.get('commit') or {}).get('author') or {}).get('date')
+        if not date:
+            continue
+        try:
+            when = datetime.fromisoformat(date.replace('Z', '+00:00'))
+        except ValueError:
+            continue
+        stats['byHour'][when.hour] += 1
+        stats['byWeekday'][when.weekday()] += 1
+        day = when.date().isoformat()
+        stats['byDay'][day] = stats['byDay'].get(day, 0) + 1
+        # ISO-8601 UTC timestamps compare correctly as strings
+        if stats['firstCommitAt'] is None or date < stats['firstCommitAt']:
+            stats['firstCommitAt'] = date
+        if stats['lastCommitAt'] is None or date > stats['lastCommitAt']:
+            stats['lastCommitAt'] = date
+    return stats
+
+
+def summarize(stats: dict) -> dict:
+    """Public view of the statistics for PlagiarismResult.report"""
+    return {
+        'commitCount': stats['commitCount'],
+        'authorCount': len(stats['authors']),
+        'topAuthors': sorted(stats['authors'].items(), key=lambda item: item[1], reverse=True)[:5],
+        'firstCommitAt': stats['firstCommitAt'],
+        'lastCommitAt': stats['lastCommitAt'],
+        'activeDays': len(stats['byDay']),
+        'byHour': stats['byHour'],
+        'byWeekday': stats['byWeekday'],
+        'truncated': stats['truncated'],
+    }
+
+
+class CommitHistoryStore:
+    """SQLite store of each repo's last seen SHA and commit statistics"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('COMMIT_HISTORY_DB_PATH', os.path.join('data', 'commit_history.db'))
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS repo_commits (
+                repo TEXT PRIMARY KEY,
+                head_sha TEXT,
+                stats TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, repo: str) -> tuple:
+        """Returns (head SHA or None, stats)"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT head_sha, stats FROM repo_commits WHERE repo = ?', (repo,)
+            ).fetchone()
+        if row is None:
+            return None, empty_stats()
+        return row[0], json.loads(row[1])
+
+    def put(self, repo: str, head_sha: Optional[str], stats: dict) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO repo_commits (repo, head_sha, stats, updated_at) '
+                    'VALUES (?, ?, ?, ?)',
+                    (repo, head_sha, json.dumps(stats), time.time())
+                )
+
+
+class CommitHistory:
+    """Paginated, incremental commit retrieval on top of GitHubClient"""
+
+    def __init__(self, client: GitHubClient, store: Optional[CommitHistoryStore] = None):
+        self.client = client
+        self.store = store or CommitHistoryStore()
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def sync(self, owner: str, repo: str, priority: int = INTERACTIVE) -> dict:
+        """
+        Bring a repo's commit statistics up to date
+
+        Returns:
+            Summary statistics (see summarize)
+
+        Raises:
+            GitHubError: if the commit list cannot be read
+        """
+        full_name = f'{owner}/{repo}'.lower()
+        lock = self._locks.setdefault(full_name, asyncio.Lock())
+        async with lock:
+            head_sha, stats = self.store.get(full_name)
+            new_commits: List[dict] = []
+            found_head = False
+            truncated = False
+
+            for page in range(1, MAX_PAGES + 1):
+                response = await self.client.get(
+                    f'/repos/{owner}/{repo}/commits',
+                    params={'per_page': PER_PAGE, 'page': page},
+                    priority=priority
+                )
+                if response.status == 409:
+                    # Empty repository
+                    break
+                if response.status != 200 or not isinstance(response.data, list):
+                    raise GitHubError(f"Cannot list commits (status {response.status})")
+
+                for commit in response.data:
+                    if head_sha is not None and commit.get('sha') == head_sha:
+                        found_head = True
+                        break
+                    new_commits.append(commit)
+                if found_head or len(response.data) < PER_PAGE:
+                    break
+            else:
+                truncated = True
+
+            if head_sha is not None and not found_head:
+                # Known head is gone (force push / rewritten history): the
+                # pages just fetched are the full history, start over
+                stats = empty_stats()
+
+            if new_commits or not found_head:
+                stats = apply_commits(stats, new_commits)
+                stats['truncated'] = stats['truncated'] or truncated
+                new_head = new_commits[0]['sha'] if new_commits else (head_sha if found_head else None)
+                self.store.put(full_name, new_head, stats)
+
+            return summarize(stats)
@@ -0,0 +1,164 @@
+"""
+File-backed store of past project submissions
+
+Keeps each project's normalized description and MinHash signature keyed by
+projectId, so comparisons never have to re-normalize or re-sign stored text.
+A version number is bumped whenever the stored content actually changes, so
+derived results (e.g. cached checks) can tell when they are stale.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_CORPUS_PATH = os.path.join('data', 'corpus.db')
+
+# SQLite's default limit on bound parameters is 999
+_QUERY_CHUNK = 500
+
+
+class CorpusEntry(NamedTuple):
+    projectId: str
+    hackathonId: Optional[str]
+    normalized: str
+    signature: np.ndarray
+
+
+class ProjectCorpus:
+    """SQLite-backed project corpus"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('CORPUS_DB_PATH', DEFAULT_CORPUS_PATH)
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS projects (
+                project_id TEXT PRIMARY KEY,
+                hackathon_id TEXT,
+                description TEXT NOT NULL,
+                normalized TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_projects_hackathon ON projects (hackathon_id);
+            CREATE TABLE IF NOT EXISTS corpus_meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO corpus_meta (key, value) VALUES ('version', 0);
+        """)
+        self._conn.commit()
+        self.version = self._conn.execute(
+            "SELECT value FROM corpus_meta WHERE key = 'version'"
+        ).fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM projects').fetchone()[0]
+
+    def upsert_many(
+        self,
+        records: Iterable[Tuple[str, Optional[str], str, str, np.ndarray]]
+    ) -> int:
+        """
+        Insert or replace projects in a single transaction
+
+        Re-submitting an unchanged project is a no-op and leaves the corpus
+        version untouched.
+
+        Args:
+            records: (projectId, hackathonId, description, normalized, signature) tuples
+
+        Returns:
+            Number of new or changed rows
+        """
+        now = time.time()
+        rows = [
+            (project_id, hackathon_id, description, normalized,
+             np.ascontiguousarray(signature, dtype=np.uint32).tobytes(), now)
+            for project_id, hackathon_id, description, normalized, signature in records
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            with self._conn:
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    'INSERT INTO projects '
+                    '(project_id, hackathon_id, description, normalized, signature, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (project_id) DO UPDATE SET '
+                    'hackathon_id = excluded.hackathon_id, description = excluded.description, '
+                    'normalized = excluded.normalized, signature = excluded.signature, '
+                    'updated_at = excluded.updated_at '
+                    'WHERE projects.description IS NOT excluded.description '
+                    'OR projects.hackathon_id IS NOT excluded.hackathon_id',
+                    rows
+                )
+                written = self._conn.total_changes - before
+                if written:
+                    self._conn.execute(
+                        "UPDATE corpus_meta SET value = value + 1 WHERE key = 'version'"
+                    )
+                    self.version += 1
+        return written
+
+    def get_many(self, project_ids: Sequence[str]) -> Dict[str, CorpusEntry]:
+        """Fetch stored projects by ID; unknown IDs are simply absent"""
+        found: Dict[str, CorpusEntry] = {}
+        unique_ids = list(dict.fromkeys(project_ids))
+        with self._lock:
+            for start in range(0, len(unique_ids), _QUERY_CHUNK):
+                chunk = unique_ids[start:start + _QUERY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                cursor = self._conn.execute(
+                    'SELECT project_id, hackathon_id, normalized, signature FROM projects '
+                    f'WHERE project_id IN ({placeholders})',
+                    chunk
+                )
+                for row in cursor:
+                    found[row[0]] = _to_entry(row)
+        return found
+
+    def iter_entries(self, hackathon_id: Optional[str] = None) -> Iterator[CorpusEntry]:
+        """Iterate over stored projects, optionally restricted to one hackathon"""
+        with self._lock:
+            if hackathon_id is None:
+                rows = self._conn.execute(
+                    'SELECT project_id, hackathon_id, normalized, signature FROM projects'
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    'SELECT project_id, hackathon_id, normalized, signature FROM projects '
+                    'WHERE hackathon_id = ?',
+                    (hackathon_id,)
+                ).fetchall()
+        for row in rows:
+            yield _to_entry(row)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total, hackathons = self._conn.execute(
+                'SELECT COUNT(*), COUNT(DISTINCT hackathon_id) FROM projects'
+            ).fetchone()
+        return {'projects': total, 'hackathons': hackathons, 'version': self.version, 'path': self.path}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _to_entry(row) -> CorpusEntry:
+    return CorpusEntry(
+        projectId=row[0],
+        hackathonId=row[1],
+        normalized=row[2],
+        signature=np.frombuffer(row[3], dtype=np.uint32),
+    )
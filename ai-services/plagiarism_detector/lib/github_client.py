@@ -0,0 +1,205 @@
+"""
+Shared async GitHub API client
+
+One pooled httpx.AsyncClient per process, with an on-disk cache keyed by
+URL. Cached entries are served directly while fresh and revalidated with
+If-None-Match afterwards; GitHub answers unchanged resources with a 304,
+which does not count against the rate limit.
+
+Every request that does reach GitHub first takes a slot from the
+rate-limit scheduler (see github_scheduler.py).
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+import httpx
+
+from .github_scheduler import INTERACTIVE, MAX_QUEUE_WAIT, GitHubScheduler
+
+logger = logging.getLogger(__name__)
+
+GITHUB_API_URL = os.getenv('GITHUB_API_URL', 'https://api.github.com')
+DEFAULT_CACHE_DIR = os.path.join('data', 'github-cache')
+
+
+class GitHubError(Exception):
+    """Raised when GitHub cannot answer a request that the caller depends on"""
+
+
+class GitHubResponse(NamedTuple):
+    status: int
+    data: Any
+    headers: Dict[str, str]
+    fromCache: bool = False
+
+
+class ETagCache:
+    """JSON-file cache of GitHub responses with their ETags"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, entry: dict) -> None:
+        # Write to a temp file first so readers never see a partial entry
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"Could not write GitHub cache entry: {e}")
+
+    def touch(self, key: str, entry: dict) -> None:
+        entry['fetchedAt'] = time.time()
+        self.set(key, entry)
+
+
+def cache_key(url: str, params: Optional[dict] = None) -> str:
+    query = '&'.join(f'{k}={params[k]}' for k in sorted(params)) if params else ''
+    return hashlib.sha256(f'{url}?{query}'.encode('utf-8')).hexdigest()
+
+
+class GitHubClient:
+    """Pooled async client for api.github.com with conditional-request caching"""
+
+    # Response headers worth keeping alongside cached bodies
+    _KEPT_HEADERS = ('etag', 'link', 'x-ratelimit-remaining', 'x-ratelimit-reset')
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        base_url: str = GITHUB_API_URL,
+        cache_dir: Optional[str] = None,
+        fresh_for: Optional[float] = None,
+        max_connections: int = 20,
+        timeout: float = 10.0
+    ):
+        self.token = token if token is not None else os.getenv('GITHUB_TOKEN')
+        self.base_url = base_url.rstrip('/')
+        self.cache = ETagCache(cache_dir or os.getenv('GITHUB_CACHE_DIR', DEFAULT_CACHE_DIR))
+        # Seconds a cached response is served without asking GitHub at all
+        self.fresh_for = fresh_for if fresh_for is not None else float(os.getenv('GITHUB_CACHE_TTL', '60'))
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self.scheduler = GitHubScheduler(authenticated=bool(self.token))
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {'Accept': 'application/vnd.github+json'}
+        if self.token:
+            headers['Authorization'] = f'token {self.token}'
+        return headers
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self._headers(),
+                limits=self._limits,
+                timeout=self._timeout,
+            )
+        return self._client
+
+    async def get(
+        self,
+        path: str,
+        params: Optional[dict] = None,
+        priority: int = INTERACTIVE
+    ) -> GitHubResponse:
+        """
+        GET an API path, using the cache when possible
+
+        Args:
+            path: API path such as /repos/{owner}/{repo}
+            params: Query parameters
+            priority: Scheduler priority (INTERACTIVE or BATCH)
+
+        Returns:
+            GitHubResponse; network errors propagate as httpx exceptions and
+            GitHubRateLimited is raised when no slot frees up in time
+        """
+        key = cache_key(self.base_url + path, params)
+        cached = self.cache.get(key)
+
+        if cached and time.time() - cached.get('fetchedAt', 0) < self.fresh_for:
+            return GitHubResponse(cached['status'], cached['data'], cached.get('headers', {}), True)
+
+        request_headers = {}
+        if cached and cached.get('etag'):
+            request_headers['If-None-Match'] = cached['etag']
+
+        # A rate-limited response is retried once, after the scheduler has
+        # learned when the quota resets
+        for attempt in range(2):
+            await self.scheduler.acquire(path, priority, MAX_QUEUE_WAIT[priority])
+            response = await self.client.get(path, params=params, headers=request_headers)
+            self.scheduler.observe(path, response.headers)
+            if not self._is_rate_limited(path, response) or attempt == 1:
+                break
+        headers = {k: response.headers[k] for k in self._KEPT_HEADERS if k in response.headers}
+
+        if response.status_code == 304 and cached:
+            self.scheduler.refund(path)
+            self.cache.touch(key, cached)
+            return GitHubResponse(cached['status'], cached['data'], {**cached.get('headers', {}), **headers}, True)
+
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+
+        if response.status_code == 200 and 'etag' in headers:
+            self.cache.set(key, {
+                'status': 200,
+                'data': data,
+                'etag': headers['etag'],
+                'headers': headers,
+                'fetchedAt': time.time(),
+            })
+
+        return GitHubResponse(response.status_code, data, headers, False)
+
+    def _is_rate_limited(self, path: str, response: httpx.Response) -> bool:
+        if response.status_code not in (403, 429):
+            return False
+        retry_after = response.headers.get('retry-after')
+        if retry_after is not None:
+            try:
+                self.scheduler.pause(path, float(retry_after))
+            except ValueError:
+                pass
+            return True
+        return response.headers.get('x-ratelimit-remaining') == '0'
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Shared client instance (singleton)
+_client_instance: Optional[GitHubClient] = None
+
+def get_github_client() -> GitHubClient:
+    """Get or create the process-wide GitHub client"""
+    global _client_instance
+    if _client_instance is None:
+        _client_instance = GitHubClient()
+    return _client_instance
@@ -0,0 +1,221 @@
+"""
+Rate-limit-aware scheduler for GitHub API calls
+
+GitHub enforces separate quotas per resource (core: 5000/h, search: 30/min
+with a token). Each resource gets a token bucket refilled at the quota's
+average rate and reconciled with the X-RateLimit-* headers of every
+response, so the scheduler also accounts for calls made by other services
+sharing the same token.
+
+Requests wait in a priority queue instead of being fired into an exhausted
+quota: interactive requests are always served before batch ones, and batch
+requests may not dip into the last RESERVE_FRACTION of the quota.
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+INTERACTIVE = 0
+BATCH = 1
+
+# Share of each quota kept for interactive requests
+RESERVE_FRACTION = 0.2
+
+
+class GitHubRateLimited(Exception):
+    """Raised when a request cannot get a rate-limit slot in time"""
+
+    def __init__(self, resource: str, retry_after: float):
+        self.resource = resource
+        self.retry_after = retry_after
+        super().__init__(f"GitHub {resource} rate limit exhausted, retry in {retry_after:.0f}s")
+
+
+class RateLimitBucket:
+    """Token bucket for one GitHub rate-limit resource"""
+
+    def __init__(self, name: str, limit: int, window: float):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.tokens = float(limit)
+        self.rate = limit / window
+        # Authoritative values from the latest response headers
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self._updated = time.monotonic()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.granted = 0
+        self.rejected = 0
+
+    @property
+    def reserve(self) -> int:
+        return int(self.limit * RESERVE_FRACTION)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.limit, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self.reset_at is not None and time.time() >= self.reset_at:
+            # Window rolled over; GitHub restored the full quota
+            self.remaining = None
+            self.reset_at = None
+            self.tokens = float(self.limit)
+
+    def delay_for(self, priority: int) -> float:
+        """Seconds until a request of this priority may be sent"""
+        self._refill()
+        floor = self.reserve if priority == BATCH else 0
+        if self.remaining is not None and self.reset_at is not None and self.remaining <= floor:
+            return max(self.reset_at - time.time(), 0.0)
+        if self.tokens - floor >= 1:
+            return 0.0
+        return (floor + 1 - self.tokens) / self.rate
+
+    def observe(self, headers: Dict[str, str]) -> None:
+        """Reconcile the bucket with X-RateLimit-* response headers"""
+        try:
+            limit = int(headers['x-ratelimit-limit'])
+            remaining = int(headers['x-ratelimit-remaining'])
+            reset_at = float(headers['x-ratelimit-reset'])
+        except (KeyError, ValueError):
+            return
+        self._refill()
+        if limit != self.limit:
+            # Quota differs from the assumed default (GitHub App, Enterprise):
+            # the bucket was sized for the old limit, trust the headers
+            self.limit = limit
+            self.rate = limit / self.window
+            self.tokens = float(remaining)
+        self.remaining = remaining
+        self.reset_at = reset_at
+        self.tokens = min(self.tokens, float(remaining))
+        self._wake()
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out slots for a while (secondary rate limit / Retry-After)"""
+        self.remaining = 0
+        self.reset_at = max(self.reset_at or 0.0, time.time() + seconds)
+        self._wake()
+
+    def refund(self) -> None:
+        """Return a slot for a request GitHub did not count (e.g. a 304)"""
+        self.tokens = min(self.limit, self.tokens + 1)
+        if self.remaining is not None:
+            self.remaining += 1
+        self._wake()
+
+    def _wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def acquire(self, priority: int = INTERACTIVE, max_wait: Optional[float] = None) -> None:
+        """
+        Wait for a slot
+
+        Raises:
+            GitHubRateLimited: if the wait would (or did) exceed max_wait
+        """
+        if max_wait is not None:
+            expected = self.delay_for(priority)
+            if expected > max_wait:
+                self.rejected += 1
+                raise GitHubRateLimited(self.name, expected)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = loop.create_task(self._dispatch())
+        self._wake()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=max_wait)
+        except asyncio.TimeoutError:
+            future.cancel()
+            self.rejected += 1
+            raise GitHubRateLimited(self.name, self.delay_for(priority))
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+    async def _dispatch(self) -> None:
+        """Hand out slots to queued requests in priority order"""
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            delay = self.delay_for(priority)
+            if delay <= 0:
+                heapq.heappop(self._waiters)
+                self.tokens -= 1
+                if self.remaining is not None:
+                    self.remaining -= 1
+                self.granted += 1
+                future.set_result(None)
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        self._refill()
+        return {
+            'limit': self.limit,
+            'tokens': round(self.tokens, 2),
+            'remaining': self.remaining,
+            'resetAt': self.reset_at,
+            'queued': sum(1 for _, _, f in self._waiters if not f.done()),
+            'granted': self.granted,
+            'rejected': self.rejected,
+        }
+
+
+class GitHubScheduler:
+    """Per-resource rate-limit buckets for one GitHub token"""
+
+    def __init__(self, authenticated: bool = True):
+        self.buckets = {
+            'core': RateLimitBucket('core', 5000 if authenticated else 60, 3600),
+            'search': RateLimitBucket('search', 30 if authenticated else 10, 60),
+        }
+
+    @staticmethod
+    def resource_for(path: str) -> str:
+        return 'search' if path.startswith('/search/') else 'core'
+
+    async def acquire(self, path: str, priority: int = INTERACTIVE, max_wait: Optional[float] = None) -> None:
+        await self.buckets[self.resource_for(path)].acquire(priority, max_wait)
+
+    def observe(self, path: str, headers: Dict[str, str]) -> None:
+        resource = headers.get('x-ratelimit-resource') or self.resource_for(path)
+        bucket = self.buckets.get(resource)
+        if bucket is not None:
+            bucket.observe(headers)
+
+    def refund(self, path: str) -> None:
+        self.buckets[self.resource_for(path)].refund()
+
+    def pause(self, path: str, seconds: float) -> None:
+        self.buckets[self.resource_for(path)].pause(seconds)
+
+    def stats(self) -> dict:
+        return {name: bucket.stats() for name, bucket in self.buckets.items()}
+
+
+# Longest a request may queue for a slot before failing, per priority
+MAX_QUEUE_WAIT = {
+    INTERACTIVE: float(os.getenv('GITHUB_MAX_WAIT_INTERACTIVE', '30')),
+    BATCH: float(os.getenv('GITHUB_MAX_WAIT_BATCH', '900')),
+}
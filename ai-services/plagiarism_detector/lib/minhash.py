@@ -0,0 +1,112 @@
+"""
+MinHash signatures and a banded LSH index for near-duplicate description lookup
+"""
+import hashlib
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+# Signature length and banding. 42 bands x 3 rows puts the LSH threshold
+# around a Jaccard similarity of ~0.29: short descriptions that differ in
+# a couple of words already drop to ~0.45 Jaccard on word shingles, and
+# SequenceMatcher confirmation (> 80%) weeds out the extra candidates.
+NUM_PERM = 128
+LSH_BANDS = 42
+LSH_ROWS = 3
+SHINGLE_SIZE = 3  # words per shingle
+
+# Prime just above 2^32 so (a * x + b) stays exact in uint64 arithmetic
+_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+# Fixed seed: signatures must be comparable across restarts once persisted
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 2 ** 32 - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 2 ** 32 - 1, size=NUM_PERM, dtype=np.uint64)
+
+
+def _hash_token(token: str) -> int:
+    """Stable 32-bit hash (Python's hash() is salted per process)"""
+    return int.from_bytes(
+        hashlib.blake2b(token.encode('utf-8'), digest_size=4).digest(), 'little'
+    )
+
+
+def shingles(normalized_text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """Word k-gram shingles of an already normalized text"""
+    words = normalized_text.split()
+    if not words:
+        return set()
+    if len(words) <= size:
+        return {' '.join(words)}
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(normalized_text: str) -> np.ndarray:
+    """Compute the MinHash signature (uint32[NUM_PERM]) of a normalized text"""
+    tokens = shingles(normalized_text)
+    if not tokens:
+        return np.full(NUM_PERM, _MAX_HASH, dtype=np.uint32)
+
+    hashes = np.fromiter((_hash_token(t) for t in tokens), dtype=np.uint64, count=len(tokens))
+    # One row per permutation, one column per shingle
+    permuted = (np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _PRIME
+    return np.bitwise_and(permuted, _MAX_HASH).min(axis=1).astype(np.uint32)
+
+
+def estimate_jaccard(sig1: np.ndarray, sig2: np.ndarray) -> float:
+    """Estimated Jaccard similarity between two signatures (0-1)"""
+    return float(np.count_nonzero(sig1 == sig2)) / NUM_PERM
+
+
+class MinHashLSH:
+    """Banded LSH index mapping signature bands to project IDs"""
+
+    def __init__(self, bands: int = LSH_BANDS, rows: int = LSH_ROWS):
+        if bands * rows > NUM_PERM:
+            raise ValueError(f"bands * rows must not exceed {NUM_PERM}")
+        self.bands = bands
+        self.rows = rows
+        self._buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(bands)]
+        self._keys: Dict[str, List[bytes]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        sig = np.ascontiguousarray(signature, dtype=np.uint32)
+        return [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def insert(self, key: str, signature: np.ndarray) -> None:
+        """Add (or replace) a signature under the given key"""
+        if key in self._keys:
+            self.remove(key)
+        band_keys = self._band_keys(signature)
+        for bucket, band_key in zip(self._buckets, band_keys):
+            bucket.setdefault(band_key, set()).add(key)
+        self._keys[key] = band_keys
+
+    def remove(self, key: str) -> None:
+        band_keys = self._keys.pop(key, None)
+        if band_keys is None:
+            return
+        for bucket, band_key in zip(self._buckets, band_keys):
+            members = bucket.get(band_key)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del bucket[band_key]
+
+    def query(self, signature: np.ndarray, exclude: Optional[Iterable[str]] = None) -> Set[str]:
+        """Return keys sharing at least one band with the signature"""
+        candidates: Set[str] = set()
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            members = bucket.get(band_key)
+            if members:
+                candidates.update(members)
+        if exclude:
+            candidates.difference_update(exclude)
+        return candidates
@@ -0,0 +1,80 @@
+"""
+LRU + TTL cache for finished plagiarism checks
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional
+
+
+class CachedResult(NamedTuple):
+    value: Any
+    lastPush: Optional[str]
+    storedAt: float
+    state: Optional[str] = None  # Digest of the stored data the value was computed from
+
+
+class ResultCache:
+    """Bounded in-memory cache with per-entry expiry and hit/miss counters"""
+
+    def __init__(self, maxsize: Optional[int] = None, ttl: Optional[float] = None):
+        self.maxsize = maxsize or int(os.getenv('RESULT_CACHE_SIZE', '2048'))
+        self.ttl = ttl if ttl is not None else float(os.getenv('RESULT_CACHE_TTL', '900'))
+        self._entries: 'OrderedDict[str, CachedResult]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidated = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if time.time() - entry.storedAt > self.ttl:
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, value: Any, last_push: Optional[str] = None, state: Optional[str] = None) -> None:
+        with self._lock:
+            self._entries[key] = CachedResult(value, last_push, time.time(), state)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        """Drop an entry found to be stale; counted as a miss, not a hit"""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidated += 1
+                self.hits -= 1
+                self.misses += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'expired': self.expired,
+                'invalidated': self.invalidated,
+                'evictions': self.evictions,
+            }
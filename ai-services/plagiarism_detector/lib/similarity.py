@@ -0,0 +1,53 @@
+"""
+CPU-bound description scoring
+
+Kept free of module-level state so it can run in a process pool: workers
+receive already normalized texts and return plain tuples.
+"""
+import difflib
+from typing import List, Tuple
+
+
+def similarities_above(norm: str, others: List[tuple], threshold: float) -> List[tuple]:
+    """
+    Score one normalized text against many, keeping only scores above threshold
+
+    SequenceMatcher caches its analysis of the second sequence, so the query
+    is set once; the cheap upper bounds (real_quick_ratio, quick_ratio) skip
+    the full ratio() for texts that cannot reach the threshold.
+    """
+    matcher = difflib.SequenceMatcher(None)
+    matcher.set_seq2(norm)
+    cutoff = threshold / 100
+    found = []
+    for key, other in others:
+        matcher.set_seq1(other)
+        if matcher.real_quick_ratio() <= cutoff or matcher.quick_ratio() <= cutoff:
+            continue
+        similarity = matcher.ratio() * 100
+        if similarity > threshold:
+            found.append((key, similarity))
+    return found
+
+
+def score_descriptions(
+    normalized: str,
+    stored: List[Tuple[str, str]],
+    public: List[Tuple[int, str]],
+    stored_threshold: float,
+    public_threshold: float
+) -> Tuple[List[tuple], List[tuple]]:
+    """
+    Score a description against stored submissions and public repos
+
+    Args:
+        normalized: Normalized description being checked
+        stored: (projectId, normalized description) of past submissions
+        public: (index, normalized description) of public search results
+
+    Returns:
+        (stored hits, public hits) as (key, similarity) tuples
+    """
+    stored_hits = similarities_above(normalized, stored, stored_threshold) if normalized else []
+    public_hits = similarities_above(normalized, public, public_threshold)
+    return stored_hits, public_hits
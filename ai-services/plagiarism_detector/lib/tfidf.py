@@ -0,0 +1,88 @@
+"""
+TF-IDF cosine similarity across a whole hackathon cohort
+
+Catches paraphrased descriptions that MinHash (exact shingle overlap) misses.
+Descriptions are hashed into a sparse TF-IDF matrix with L2-normalized rows,
+so the cosine similarity of every pair is one sparse matrix product. The
+product is computed in row blocks to bound memory on large cohorts.
+"""
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, HashingVectorizer, TfidfTransformer
+
+N_FEATURES = 2 ** 20
+BLOCK_SIZE = 1024
+
+_SUFFIXES = ('ing', 'ies', 'es', 'ed', 's')
+
+
+def _stem(word: str) -> str:
+    """Crude suffix stripping so "credit"/"credits" or "tokenize"/"tokenized" match"""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3 and not word.endswith('ss'):
+            return word[:-len(suffix)]
+    return word
+
+
+def _stem_text(normalized_text: str) -> str:
+    return ' '.join(_stem(word) for word in normalized_text.split())
+
+
+# Input is already normalize_text output: lowercase, alphanumeric words.
+# Word features keep rows sparse (~100 non-zeros), which is what makes the
+# all-pairs product fast; character n-grams would be ~10x denser.
+_vectorizer = HashingVectorizer(
+    n_features=N_FEATURES,
+    preprocessor=_stem_text,
+    ngram_range=(1, 2),
+    stop_words=list(ENGLISH_STOP_WORDS | {_stem(word) for word in ENGLISH_STOP_WORDS}),
+    lowercase=False,
+    alternate_sign=False,
+    norm=None,
+)
+
+
+def tfidf_matrix(normalized_texts: Sequence[str]) -> sparse.csr_matrix:
+    """L2-normalized TF-IDF rows for a list of normalized descriptions"""
+    counts = _vectorizer.transform(normalized_texts)
+    return TfidfTransformer(sublinear_tf=True).fit_transform(counts).tocsr()
+
+
+def similar_pairs(
+    matrix: sparse.csr_matrix,
+    threshold: float,
+    block_size: int = BLOCK_SIZE
+) -> List[Tuple[int, int, float]]:
+    """
+    All row pairs (i < j) whose cosine similarity is at least threshold
+
+    Args:
+        matrix: Row-normalized TF-IDF matrix
+        threshold: Minimum cosine similarity (0-1)
+        block_size: Rows multiplied at a time
+
+    Returns:
+        (i, j, similarity) tuples, most similar first
+    """
+    n_rows = matrix.shape[0]
+    transposed = matrix.T.tocsr()
+    rows, cols, values = [], [], []
+    for start in range(0, n_rows, block_size):
+        block = (matrix[start:start + block_size] @ transposed).tocoo()
+        global_rows = block.row + start
+        keep = (block.data >= threshold) & (block.col > global_rows)
+        rows.append(global_rows[keep])
+        cols.append(block.col[keep])
+        values.append(block.data[keep])
+    if not rows:
+        return []
+    rows_all = np.concatenate(rows)
+    cols_all = np.concatenate(cols)
+    values_all = np.concatenate(values)
+    order = np.argsort(-values_all, kind='stable')
+    return [
+        (int(rows_all[k]), int(cols_all[k]), float(min(values_all[k], 1.0)))
+        for k in order
+    ]
@@ -0,0 +1,386 @@
+"""
+Winnowing-based source code fingerprinting (MOSS style)
+
+Source files are tokenized with identifiers, numbers and string literals
+abstracted away, hashed as token k-grams and winnowed: the minimum hash of
+every window of W consecutive k-grams is kept. Any copied run of at least
+W + K - 1 tokens is guaranteed to share a fingerprint with the original.
+
+Snapshots (a local clone or a tarball) are streamed file by file, so only
+one file's tokens are held in memory at a time. They must live under
+CODE_SNAPSHOT_ROOT: the path comes from the request, so anything that
+resolves outside it (absolute paths, "..", symlinks) is rejected.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import tarfile
+import threading
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+KGRAM_SIZE = 12     # tokens per k-gram
+WINDOW_SIZE = 8     # k-grams per winnowing window
+MAX_FILE_BYTES = 1024 * 1024
+
+# Directory holding the clones and tarballs that checks may fingerprint
+CODE_SNAPSHOT_ROOT = os.getenv('CODE_SNAPSHOT_ROOT', os.path.join('data', 'snapshots'))
+
+# Fingerprints shared by more projects than this are boilerplate (licenses,
+# generated code, framework scaffolding) rather than evidence of copying
+COMMON_FINGERPRINT_LIMIT = 10
+
+SOURCE_EXTENSIONS = {
+    '.sol', '.vy', '.js', '.jsx', '.ts', '.tsx', '.py', '.rs', '.go', '.java',
+    '.kt', '.swift', '.c', '.h', '.cpp', '.hpp', '.cs', '.rb', '.php', '.move', '.cairo',
+}
+SKIPPED_DIRS = {
+    '.git', 'node_modules', 'vendor', 'dist', 'build', 'out', 'target', '.next',
+    '__pycache__', 'cache', 'artifacts', 'typechain-types', 'coverage',
+}
+
+_HASH_MOD = (1 << 61) - 1
+_HASH_BASE = 1_000_003
+
+# Comments come first so "//" is never split into operators, and string
+# literals win over comments that start inside them ("https://...")
+_TOKEN_RE = re.compile(
+    r'//[^\n]*|/\*.*?\*/|#[^\n]*'                           # comments
+    r'|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`[^`]*`'  # string literals
+    r'|[A-Za-z_$][\w$]*'                                    # identifiers / keywords
+    r'|\d[\w.]*'                                            # numbers
+    r'|[^\s\w]',                                            # operators / punctuation
+    re.DOTALL
+)
+
+# Keywords are kept verbatim; every other identifier becomes "V" so renaming
+# variables does not hide copied code
+_KEYWORDS = frozenset('''
+    abstract address as assert async await bool break bytes case catch class const constructor
+    continue contract def default del delete do elif else emit enum event except export extends
+    external false fn for from func function if impl import in interface internal is lambda let
+    library mapping match memory mod modifier new nil none null override package payable pragma
+    private pub public pure raise require return returns revert self static storage string struct
+    super switch this throw true try type uint uint256 int int256 use using var view virtual void
+    while with yield
+'''.split())
+
+
+def _token_id(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little') % _HASH_MOD
+
+
+_ABSTRACT_IDS = {kind: _token_id(kind) for kind in ('V', 'N', 'S')}
+
+
+def tokenize(source: str) -> List[Tuple[int, int]]:
+    """
+    Tokenize source code into (token hash, line number) pairs
+
+    Comments are dropped; identifiers, numbers and strings are abstracted.
+    """
+    tokens = []
+    line = 1
+    last_end = 0
+    for match in _TOKEN_RE.finditer(source):
+        line += source.count('\n', last_end, match.start())
+        last_end = match.start()
+        text = match.group(0)
+        first = text[0]
+        if first == '#' or text.startswith('//') or text.startswith('/*'):
+            continue
+        if first in '"\'`':
+            token_hash = _ABSTRACT_IDS['S']
+        elif first.isdigit():
+            token_hash = _ABSTRACT_IDS['N']
+        elif first.isalpha() or first in '_$':
+            token_hash = _token_id(text) if text in _KEYWORDS else _ABSTRACT_IDS['V']
+        else:
+            token_hash = _token_id(text)
+        tokens.append((token_hash, line))
+    return tokens
+
+
+def kgram_hashes(tokens: List[Tuple[int, int]], k: int = KGRAM_SIZE) -> List[Tuple[int, int]]:
+    """Rolling polynomial hashes of token k-grams as (hash, starting line)"""
+    if len(tokens) < k:
+        return []
+    top = pow(_HASH_BASE, k - 1, _HASH_MOD)
+    h = 0
+    for token_hash, _ in tokens[:k]:
+        h = (h * _HASH_BASE + token_hash) % _HASH_MOD
+    hashes = [(h, tokens[0][1])]
+    for i in range(k, len(tokens)):
+        h = ((h - tokens[i - k][0] * top) * _HASH_BASE + tokens[i][0]) % _HASH_MOD
+        hashes.append((h, tokens[i - k + 1][1]))
+    return hashes
+
+
+def winnow(hashes: List[Tuple[int, int]], w: int = WINDOW_SIZE) -> List[Tuple[int, int]]:
+    """
+    Robust winnowing: keep the rightmost minimal hash of each window,
+    recording it only when the selected position changes
+    """
+    if not hashes:
+        return []
+    if len(hashes) <= w:
+        return [min(hashes, key=lambda item: item[0])]
+
+    fingerprints = []
+    window: deque = deque()  # positions with increasing hash values
+    last_selected = -1
+    for i, (h, _) in enumerate(hashes):
+        while window and hashes[window[-1]][0] >= h:
+            window.pop()
+        window.append(i)
+        if window[0] <= i - w:
+            window.popleft()
+        if i >= w - 1 and window[0] != last_selected:
+            last_selected = window[0]
+            fingerprints.append(hashes[last_selected])
+    return fingerprints
+
+
+def fingerprint_source(source: str) -> List[Tuple[int, int]]:
+    """Winnowed fingerprints (hash, line) of one source file"""
+    return winnow(kgram_hashes(tokenize(source)))
+
+
+def _is_source_path(path: str) -> bool:
+    parts = path.replace('\\', '/').split('/')
+    if any(part in SKIPPED_DIRS for part in parts[:-1]):
+        return False
+    return os.path.splitext(parts[-1])[1].lower() in SOURCE_EXTENSIONS
+
+
+def _is_within(path: str, root: str) -> bool:
+    return os.path.commonpath([path, root]) == root
+
+
+def resolve_snapshot(snapshot: str, root: Optional[str] = None) -> str:
+    """
+    Real path of a snapshot, which must be inside the snapshot root
+
+    Args:
+        snapshot: Path relative to the root (or absolute, but still under it)
+        root: Allowed directory, CODE_SNAPSHOT_ROOT by default
+
+    Raises:
+        ValueError: If the path resolves outside the root
+    """
+    root = os.path.realpath(root or CODE_SNAPSHOT_ROOT)
+    path = os.path.realpath(os.path.join(root, snapshot))
+    if path == root or not _is_within(path, root):
+        raise ValueError(f"Repository snapshot must be inside the snapshot directory: {snapshot}")
+    return path
+
+
+def _safe_member_name(name: str) -> bool:
+    """Tar member names must stay relative: no leading "/" and no ".." parts"""
+    name = name.replace('\\', '/')
+    return not name.startswith('/') and '..' not in name.split('/')
+
+
+def iter_snapshot_sources(snapshot: str) -> Iterator[Tuple[str, str]]:
+    """
+    Stream (relative path, source text) pairs from a repo snapshot
+
+    Files reached through symlinks that point outside the checkout are
+    skipped, and a tarball with absolute or ".." member names is rejected.
+
+    Args:
+        snapshot: Path to a local checkout or a (optionally compressed) tarball,
+            already checked with resolve_snapshot
+    """
+    if os.path.isdir(snapshot):
+        snapshot = os.path.realpath(snapshot)
+        for root, dirs, files in os.walk(snapshot):
+            dirs[:] = [d for d in dirs if d not in SKIPPED_DIRS]
+            for name in sorted(files):
+                full_path = os.path.join(root, name)
+                rel_path = os.path.relpath(full_path, snapshot)
+                if not _is_source_path(rel_path) or not _is_within(os.path.realpath(full_path), snapshot):
+                    continue
+                try:
+                    if os.path.getsize(full_path) > MAX_FILE_BYTES:
+                        continue
+                    with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
+                        yield rel_path, f.read()
+                except OSError:
+                    continue
+    elif tarfile.is_tarfile(snapshot):
+        # Stream mode reads members sequentially without seeking
+        with tarfile.open(snapshot, mode='r|*') as archive:
+            for member in archive:
+                if not _safe_member_name(member.name):
+                    raise ValueError(f"Unsafe path in repository snapshot: {member.name}")
+                if not member.isfile() or member.size > MAX_FILE_BYTES:
+                    continue
+                # Tarballs from GitHub wrap everything in a "<repo>-<sha>/" folder
+                rel_path = member.name.split('/', 1)[-1]
+                if not _is_source_path(rel_path):
+                    continue
+                f = archive.extractfile(member)
+                if f is not None:
+                    yield rel_path, f.read().decode('utf-8', errors='ignore')
+    else:
+        raise ValueError(f"Repository snapshot not found or unsupported: {snapshot}")
+
+
+class CodeFingerprintIndex:
+    """SQLite index of winnowed fingerprints for every submission of a hackathon"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('CODE_INDEX_DB_PATH', os.path.join('data', 'code_fingerprints.db'))
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                hackathon_id TEXT NOT NULL,
+                project_id TEXT NOT NULL,
+                hash INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                line INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_fp_hash ON fingerprints (hackathon_id, hash);
+            CREATE INDEX IF NOT EXISTS idx_fp_project ON fingerprints (hackathon_id, project_id);
+            CREATE TABLE IF NOT EXISTS snapshot_digests (
+                hackathon_id TEXT NOT NULL,
+                project_id TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                PRIMARY KEY (hackathon_id, project_id)
+            );
+        """)
+        self._conn.commit()
+        # Bumped when a hackathon's fingerprints change, so results computed
+        # from them can tell when they are stale (in memory, like those results)
+        self._versions: Dict[str, int] = {}
+
+    def version(self, hackathon_id: str) -> int:
+        with self._lock:
+            return self._versions.get(hackathon_id, 0)
+
+    def index_snapshot(self, hackathon_id: str, project_id: str, snapshot: str) -> Dict[str, int]:
+        """
+        Replace a project's fingerprints with those of a snapshot
+
+        Re-indexing an unchanged snapshot leaves the hackathon's version untouched.
+
+        Returns:
+            Dict with files and fingerprints counts
+        """
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    'DELETE FROM fingerprints WHERE hackathon_id = ? AND project_id = ?',
+                    (hackathon_id, project_id)
+                )
+        files = 0
+        total = 0
+        digest = hashlib.sha256()
+        try:
+            for rel_path, source in iter_snapshot_sources(snapshot):
+                fingerprints = fingerprint_source(source)
+                if not fingerprints:
+                    continue
+                files += 1
+                total += len(fingerprints)
+                digest.update(f'{rel_path}\0{fingerprints}\0'.encode('utf-8'))
+                with self._lock:
+                    with self._conn:
+                        self._conn.executemany(
+                            'INSERT INTO fingerprints (hackathon_id, project_id, hash, path, line) '
+                            'VALUES (?, ?, ?, ?, ?)',
+                            [(hackathon_id, project_id, h, rel_path, line) for h, line in fingerprints]
+                        )
+        except Exception:
+            # Partially indexed: whatever was there before is gone
+            self._record_digest(hackathon_id, project_id, None)
+            raise
+        self._record_digest(hackathon_id, project_id, digest.hexdigest())
+        return {'files': files, 'fingerprints': total}
+
+    def _record_digest(self, hackathon_id: str, project_id: str, digest: Optional[str]) -> None:
+        """Remember a project's fingerprint digest, bumping the version if it changed"""
+        with self._lock:
+            with self._conn:
+                row = self._conn.execute(
+                    'SELECT digest FROM snapshot_digests WHERE hackathon_id = ? AND project_id = ?',
+                    (hackathon_id, project_id)
+                ).fetchone()
+                if digest is None:
+                    self._conn.execute(
+                        'DELETE FROM snapshot_digests WHERE hackathon_id = ? AND project_id = ?',
+                        (hackathon_id, project_id)
+                    )
+                elif row is None or row[0] != digest:
+                    self._conn.execute(
+                        'INSERT OR REPLACE INTO snapshot_digests (hackathon_id, project_id, digest) '
+                        'VALUES (?, ?, ?)',
+                        (hackathon_id, project_id, digest)
+                    )
+                else:
+                    return
+            self._versions[hackathon_id] = self._versions.get(hackathon_id, 0) + 1
+
+    def find_matches(self, hackathon_id: str, project_id: str, max_examples: int = 5) -> List[dict]:
+        """
+        Find other submissions sharing fingerprints with a project
+
+        Returns:
+            One dict per matching project with the share of this project's
+            distinct fingerprints found in it, best matches first
+        """
+        with self._lock:
+            own_total = self._conn.execute(
+                'SELECT COUNT(DISTINCT hash) FROM fingerprints WHERE hackathon_id = ? AND project_id = ?',
+                (hackathon_id, project_id)
+            ).fetchone()[0]
+            if not own_total:
+                return []
+            rows = self._conn.execute("""
+                WITH mine AS (
+                    SELECT DISTINCT hash FROM fingerprints
+                    WHERE hackathon_id = ? AND project_id = ?
+                ),
+                shared AS (
+                    SELECT f.hash, f.project_id FROM fingerprints f
+                    JOIN mine ON mine.hash = f.hash
+                    WHERE f.hackathon_id = ? AND f.project_id != ?
+                    GROUP BY f.hash, f.project_id
+                ),
+                common AS (
+                    SELECT hash FROM shared GROUP BY hash HAVING COUNT(*) > ?
+                )
+                SELECT project_id, COUNT(*) FROM shared
+                WHERE hash NOT IN (SELECT hash FROM common)
+                GROUP BY project_id
+                ORDER BY COUNT(*) DESC
+            """, (hackathon_id, project_id, hackathon_id, project_id, COMMON_FINGERPRINT_LIMIT)).fetchall()
+
+            matches = []
+            for other_id, shared_count in rows:
+                examples = self._conn.execute("""
+                    SELECT a.path, a.line, b.path, b.line FROM fingerprints a
+                    JOIN fingerprints b ON b.hackathon_id = a.hackathon_id AND b.hash = a.hash
+                    WHERE a.hackathon_id = ? AND a.project_id = ? AND b.project_id = ?
+                    ORDER BY a.path, a.line
+                    LIMIT ?
+                """, (hackathon_id, project_id, other_id, max_examples)).fetchall()
+                matches.append({
+                    'projectId': other_id,
+                    'similarity': shared_count / own_total * 100,
+                    'sharedFingerprints': shared_count,
+                    'files': [{
+                        'path': path,
+                        'line': line,
+                        'matchedPath': matched_path,
+                        'matchedLine': matched_line,
+                    } for path, line, matched_path, matched_line in examples],
+                })
+        return matches
@@ -1,20 +1,60 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
+import asyncio
 import difflib
+import json
+import logging
 import re
-import requests
 import hashlib
-from concurrent.futures import ThreadPoolExecutor
+import tarfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
 import os
 
+import httpx
+
+from lib.commit_history import CommitHistory
+from lib.corpus import ProjectCorpus
+from lib.github_client import GitHubError, get_github_client
+from lib.github_scheduler import BATCH, INTERACTIVE, GitHubRateLimited
+from lib.minhash import MinHashLSH, minhash_signature
+from lib.result_cache import ResultCache
+from lib.similarity import score_descriptions
+from lib.tfidf import similar_pairs, tfidf_matrix
+from lib.winnowing import CodeFingerprintIndex, resolve_snapshot
+
+logger = logging.getLogger(__name__)
+
 app = FastAPI()
 
+github = get_github_client()
+
 class PlagiarismCheckRequest(BaseModel):
     projectId: str
     description: str
     githubUrl: str
     compareAgainst: Optional[List[str]] = []  # List of project IDs to compare
+    hackathonId: Optional[str] = None
+    repoSnapshot: Optional[str] = None  # Clone or tarball under CODE_SNAPSHOT_ROOT for code comparison
+
+class PlagiarismBatchRequest(BaseModel):
+    projects: List[PlagiarismCheckRequest]
+
+class CohortSimilarityRequest(BaseModel):
+    hackathonId: Optional[str] = None  # Compare every stored project of this hackathon
+    projectIds: Optional[List[str]] = None  # ...or an explicit list of stored projects
+    threshold: float = 50  # Minimum cosine similarity, 0-100
+    maxPairs: int = 500
+
+class CorpusProject(BaseModel):
+    projectId: str
+    description: str
+    hackathonId: Optional[str] = None
+
+class CorpusIngestRequest(BaseModel):
+    projects: List[CorpusProject]
 
 class PlagiarismResult(BaseModel):
     isPlagiarized: bool
@@ -34,56 +74,156 @@ def normalize_text(text: str) -> str:
     text = ' '.join(text.split())
     return text
 
-def calculate_text_similarity(text1: str, text2: str) -> float:
-    """Calculate similarity between two texts"""
-    norm1 = normalize_text(text1)
-    norm2 = normalize_text(text2)
-    
+def normalized_similarity(norm1: str, norm2: str) -> float:
+    """Calculate similarity between two already normalized texts"""
     # Use SequenceMatcher for similarity
     similarity = difflib.SequenceMatcher(None, norm1, norm2).ratio()
     return similarity * 100
 
-def check_github_originality(github_url: str) -> dict:
+def calculate_text_similarity(text1: str, text2: str) -> float:
+    """Calculate similarity between two texts"""
+    return normalized_similarity(normalize_text(text1), normalize_text(text2))
+
+# Past submissions live in a file-backed corpus; the MinHash/LSH index over
+# it is rebuilt at startup and narrows the corpus to a handful of candidates,
+# SequenceMatcher then confirms the score.
+corpus = ProjectCorpus()
+description_index = MinHashLSH()
+for _entry in corpus.iter_entries():
+    if _entry.normalized:
+        description_index.insert(_entry.projectId, _entry.signature)
+
+DESCRIPTION_MATCH_THRESHOLD = 80
+PUBLIC_REPO_MATCH_THRESHOLD = 70
+
+def collect_stored_candidates(
+    project_id: str,
+    normalized: str,
+    signature,
+    compare_against: Optional[List[str]]
+) -> tuple:
+    """
+    Gather the stored descriptions a submission must be scored against:
+    its LSH near-duplicate candidates plus any explicitly requested projects
+
+    Returns:
+        ([(projectId, normalized description)], missing project IDs)
+    """
+    compare_ids = [pid for pid in (compare_against or []) if pid != project_id]
+    lsh_ids = description_index.query(signature, exclude=[project_id]) if normalized else set()
+    wanted = list(dict.fromkeys([*lsh_ids, *compare_ids]))
+    entries = corpus.get_many(wanted)
+    missing = [pid for pid in dict.fromkeys(compare_ids) if pid not in entries]
+    return [(pid, entries[pid].normalized) for pid in wanted if pid in entries], missing
+
+def public_candidates(similar_projects: List[dict]) -> List[tuple]:
+    return [(i, normalize_text(proj.get('description') or '')) for i, proj in enumerate(similar_projects)]
+
+def description_matches(stored_hits: List[tuple], public_hits: List[tuple], similar_projects: List[dict]) -> List[dict]:
+    """Turn similarity hits into PlagiarismResult match entries"""
+    matches = [{
+        'projectId': project_id,
+        'similarity': similarity,
+        'type': 'description',
+    } for project_id, similarity in stored_hits]
+    for index, similarity in public_hits:
+        proj = similar_projects[index]
+        matches.append({
+            'name': proj['name'],
+            'url': proj['url'],
+            'similarity': similarity,
+            'type': 'public_repo',
+        })
+    return matches
+
+def index_projects(projects: List[CorpusProject]) -> int:
+    """Normalize, sign and store projects"""
+    records = []
+    for project in projects:
+        normalized = normalize_text(project.description)
+        signature = minhash_signature(normalized)
+        records.append((project.projectId, project.hackathonId, project.description, normalized, signature))
+    return store_projects(records)
+
+def store_projects(records: List[tuple]) -> int:
+    """Write corpus records, keeping the LSH index in sync"""
+    written = corpus.upsert_many(records)
+    for project_id, _, _, normalized, signature in records:
+        if normalized:
+            description_index.insert(project_id, signature)
+        else:
+            description_index.remove(project_id)
+    return written
+
+# Winnowed source fingerprints of every submitted repo snapshot, per hackathon
+code_index = CodeFingerprintIndex()
+CODE_MATCH_THRESHOLD = 25  # % of a project's fingerprints found in another one
+
+def index_code_snapshot(hackathon_id: Optional[str], project_id: str, snapshot: str) -> dict:
+    """Fingerprint a repo snapshot; returns counts or an error report"""
+    try:
+        return code_index.index_snapshot(hackathon_id or 'default', project_id, resolve_snapshot(snapshot))
+    except (OSError, ValueError, tarfile.TarError) as e:
+        return {'error': str(e)}
+
+def find_code_matches(hackathon_id: Optional[str], project_id: str) -> List[dict]:
+    """Compare an indexed snapshot with the hackathon's other submissions"""
+    return [
+        {**match, 'type': 'code'}
+        for match in code_index.find_matches(hackathon_id or 'default', project_id)
+        if match['similarity'] > CODE_MATCH_THRESHOLD
+    ]
+
+def check_code_similarity(hackathon_id: Optional[str], project_id: str, snapshot: str) -> tuple:
+    """
+    Fingerprint a repo snapshot and compare it with the hackathon's other submissions
+
+    Returns:
+        (matches, code check report)
+    """
+    stats = index_code_snapshot(hackathon_id, project_id, snapshot)
+    if 'error' in stats:
+        return [], stats
+    return find_code_matches(hackathon_id, project_id), stats
+
+# Per-repo commit statistics, updated incrementally from the last seen SHA
+commit_history = CommitHistory(github)
+
+async def fetch_commit_stats(owner: str, repo: str, priority: int = INTERACTIVE) -> dict:
+    """Up-to-date commit statistics, or an error report"""
+    try:
+        return await commit_history.sync(owner, repo, priority)
+    except (GitHubError, GitHubRateLimited, httpx.HTTPError) as e:
+        return {'error': str(e)}
+
+def parse_repo_url(github_url: str) -> tuple:
+    parts = github_url.replace('https://github.com/', '').split('/')
+    return parts[0], parts[1]
+
+async def check_github_originality(github_url: str, priority: int = INTERACTIVE) -> dict:
     """Check GitHub repo for copied code"""
     try:
         # Extract repo info
-        parts = github_url.replace('https://github.com/', '').split('/')
-        owner, repo = parts[0], parts[1]
+        owner, repo = parse_repo_url(github_url)
         
-        # Get repo info
-        headers = {'Authorization': f'token {os.getenv("GITHUB_TOKEN")}'}
-        
-        # Check if repo is fork
-        repo_response = requests.get(
-            f'https://api.github.com/repos/{owner}/{repo}',
-            headers=headers
+        # Repo info (fork check), commit history and languages are fetched concurrently
+        repo_response, commit_stats, languages_response = await asyncio.gather(
+            github.get(f'/repos/{owner}/{repo}', priority=priority),
+            fetch_commit_stats(owner, repo, priority),
+            github.get(f'/repos/{owner}/{repo}/languages', priority=priority),
         )
         
-        if repo_response.status_code != 200:
+        if repo_response.status != 200:
             return {'error': 'Cannot access repository'}
         
-        repo_data = repo_response.json()
-        
-        # Check commits
-        commits_response = requests.get(
-            f'https://api.github.com/repos/{owner}/{repo}/commits',
-            headers=headers
-        )
-        
-        commits = commits_response.json() if commits_response.status_code == 200 else []
-        
-        # Check languages
-        languages_response = requests.get(
-            f'https://api.github.com/repos/{owner}/{repo}/languages',
-            headers=headers
-        )
-        
-        languages = languages_response.json() if languages_response.status_code == 200 else {}
+        repo_data = repo_response.data
+        languages = languages_response.data if languages_response.status == 200 else {}
         
         return {
             'isFork': repo_data.get('fork', False),
             'parentRepo': repo_data.get('parent', {}).get('full_name') if repo_data.get('fork') else None,
-            'commitCount': len(commits),
+            'commitCount': commit_stats.get('commitCount'),
+            'commitStats': commit_stats,
             'languages': languages,
             'createdAt': repo_data.get('created_at'),
             'lastPush': repo_data.get('pushed_at'),
@@ -91,50 +231,115 @@ def check_github_originality(github_url: str) -> dict:
     except Exception as e:
         return {'error': str(e)}
 
-def search_similar_projects(description: str) -> List[dict]:
-    """Search for similar projects on GitHub"""
+def search_keywords(description: str) -> str:
+    return ' '.join(normalize_text(description).split()[:10])
+
+async def search_similar_projects(description: str, priority: int = INTERACTIVE) -> List[dict]:
+    """
+    Search for similar projects on GitHub
+    
+    Raises:
+        GitHubError: if the search could not be performed (rate limit,
+        network or API error), so callers can tell it apart from "no results"
+    """
+    # Create search query from description keywords
+    keywords = search_keywords(description)
+    
     try:
-        # Create search query from description keywords
-        keywords = ' '.join(normalize_text(description).split()[:10])
-        
-        response = requests.get(
-            'https://api.github.com/search/repositories',
+        response = await github.get(
+            '/search/repositories',
             params={
                 'q': keywords,
                 'sort': 'stars',
                 'order': 'desc',
                 'per_page': 5
             },
-            headers={'Authorization': f'token {os.getenv("GITHUB_TOKEN")}'}
+            priority=priority
         )
-        
-        if response.status_code != 200:
-            return []
-        
-        results = response.json().get('items', [])
-        
-        return [{
-            'name': r['full_name'],
-            'description': r.get('description', ''),
-            'url': r['html_url'],
-            'stars': r['stargazers_count'],
-        } for r in results]
-    except:
-        return []
+    except (GitHubRateLimited, httpx.HTTPError) as e:
+        raise GitHubError(f"GitHub search unavailable: {e}") from e
+    
+    if response.status != 200:
+        raise GitHubError(f"GitHub search failed with status {response.status}")
+    
+    results = response.data.get('items', [])
+    
+    return [{
+        'name': r['full_name'],
+        'description': r.get('description', ''),
+        'url': r['html_url'],
+        'stars': r['stargazers_count'],
+    } for r in results]
 
-@app.post("/check-plagiarism", response_model=PlagiarismResult)
-async def check_plagiarism(request: PlagiarismCheckRequest):
-    """
-    Check project for plagiarism
-    Returns confidence score and detailed report
+async def search_public_projects(description: str, priority: int = INTERACTIVE) -> tuple:
     """
+    Search for similar public projects without failing the whole check
     
-    matches = []
+    Returns:
+        (projects, error message or None)
+    """
+    try:
+        return await search_similar_projects(description, priority), None
+    except GitHubError as e:
+        logger.warning(str(e))
+        return [], str(e)
+
+# Finished checks, keyed by a hash of the request. Each entry also records
+# the stored data it was computed from (result_state), so a new submission
+# only invalidates the results it could actually change
+result_cache = ResultCache()
+
+def result_cache_key(request: PlagiarismCheckRequest) -> str:
+    """Content hash of a check request"""
+    payload = json.dumps([
+        request.projectId,
+        request.description,
+        request.githubUrl,
+        sorted(request.compareAgainst or []),
+        request.hackathonId,
+        request.repoSnapshot,
+    ])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def result_state(request: PlagiarismCheckRequest, stored: List[tuple], missing_projects: List[str]) -> str:
+    """
+    Digest of what a check's result depends on besides the request: the
+    stored descriptions it is scored against and, for a code check, the
+    version of its hackathon's fingerprint index
+    """
+    code_version = code_index.version(request.hackathonId or 'default') if request.repoSnapshot else None
+    payload = json.dumps([stored, missing_projects, code_version])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+async def current_last_push(github_url: str) -> Optional[str]:
+    """Repo's pushed_at, usually answered from the GitHub client's ETag cache"""
+    try:
+        owner, repo = parse_repo_url(github_url)
+        response = await github.get(f'/repos/{owner}/{repo}')
+    except Exception:
+        return None
+    return response.data.get('pushed_at') if response.status == 200 else None
+
+async def cached_result(key: str, github_url: str, state: str) -> Optional[PlagiarismResult]:
+    """
+    Cached result for a check, unless its candidates or the repo changed since
+    """
+    entry = result_cache.get(key)
+    if entry is None:
+        return None
+    if entry.state != state:
+        result_cache.invalidate(key)
+        return None
+    last_push = await current_last_push(github_url)
+    if last_push is not None and last_push != entry.lastPush:
+        result_cache.invalidate(key)
+        return None
+    return entry.value
+
+def github_flags(github_check: dict) -> List[dict]:
+    """Red flags derived from the repository metadata"""
     flags = []
     
-    # 1. Check GitHub originality
-    github_check = check_github_originality(request.githubUrl)
-    
     if github_check.get('isFork'):
         flags.append({
             'type': 'fork',
@@ -142,45 +347,27 @@ async def check_plagiarism(request: PlagiarismCheckRequest):
             'message': f"Repository is forked from {github_check.get('parentRepo')}",
         })
     
-    if github_check.get('commitCount', 0) < 3:
+    # Without commit data there is nothing to count; don't report "0 commits"
+    commit_count = github_check.get('commitCount')
+    if commit_count is not None and commit_count < 3:
         flags.append({
             'type': 'low_commits',
             'severity': 'medium',
-            'message': f"Only {github_check.get('commitCount', 0)} commits found",
+            'message': f"Only {commit_count} commits found",
         })
     
-    # 2. Compare description with past projects
-    if request.compareAgainst:
-        # In production, fetch from database
-        # For now, using mock comparison
-        for project_id in request.compareAgainst[:10]:  # Limit to 10
-            # Mock comparison (replace with actual DB query)
-            similarity = 0  # calculate_text_similarity(request.description, past_description)
-            
-            if similarity > 80:
-                matches.append({
-                    'projectId': project_id,
-                    'similarity': similarity,
-                    'type': 'description',
-                })
-    
-    # 3. Search for similar public projects
-    similar_projects = search_similar_projects(request.description)
-    
-    for proj in similar_projects:
-        similarity = calculate_text_similarity(
-            request.description,
-            proj.get('description', '')
-        )
-        
-        if similarity > 70:
-            matches.append({
-                'name': proj['name'],
-                'url': proj['url'],
-                'similarity': similarity,
-                'type': 'public_repo',
-            })
-    
+    return flags
+
+def build_result(
+    matches: List[dict],
+    flags: List[dict],
+    github_check: dict,
+    similar_projects: List[dict],
+    missing_projects: List[str],
+    code_check: Optional[dict],
+    search_error: Optional[str] = None
+) -> PlagiarismResult:
+    """Combine matches and flags into the final verdict"""
     # Calculate final confidence score
     max_similarity = max([m['similarity'] for m in matches], default=0)
     flag_penalty = len([f for f in flags if f['severity'] == 'high']) * 20
@@ -198,10 +385,250 @@ async def check_plagiarism(request: PlagiarismCheckRequest):
             'flags': flags,
             'githubCheck': github_check,
             'similarProjects': len(similar_projects),
+            'similarProjectsError': search_error,
+            'missingProjects': missing_projects,
+            'codeCheck': code_check,
             'recommendation': 'Manual review required' if confidence > 50 else 'Appears original',
         }
     )
 
+@app.post("/check-plagiarism", response_model=PlagiarismResult)
+async def check_plagiarism(request: PlagiarismCheckRequest):
+    """
+    Check project for plagiarism
+    Returns confidence score and detailed report
+    """
+    
+    # Register the submission first (it is never its own candidate, so this
+    # does not change the state its cached result depends on)
+    normalized_description = normalize_text(request.description)
+    description_signature = minhash_signature(normalized_description)
+    store_projects([(
+        request.projectId,
+        request.hackathonId,
+        request.description,
+        normalized_description,
+        description_signature,
+    )])
+    
+    # Stored descriptions to compare with (LSH near-duplicates and explicitly
+    # requested projects); a cached result is only valid for the same ones
+    stored, missing_projects = collect_stored_candidates(
+        request.projectId, normalized_description, description_signature, request.compareAgainst
+    )
+    cache_key = result_cache_key(request)
+    cached = await cached_result(cache_key, request.githubUrl, result_state(request, stored, missing_projects))
+    if cached is not None:
+        return cached
+    
+    # 1. Check GitHub originality (public repo search runs alongside it)
+    github_check, (similar_projects, search_error) = await asyncio.gather(
+        check_github_originality(request.githubUrl),
+        search_public_projects(request.description),
+    )
+    flags = github_flags(github_check)
+    
+    # 2. Compare description with past submissions and 3. with similar public projects
+    stored_hits, public_hits = score_descriptions(
+        normalized_description,
+        stored,
+        public_candidates(similar_projects),
+        DESCRIPTION_MATCH_THRESHOLD,
+        PUBLIC_REPO_MATCH_THRESHOLD,
+    )
+    matches = description_matches(stored_hits, public_hits, similar_projects)
+    
+    # 4. Compare source code with other submissions of the hackathon
+    code_check = None
+    if request.repoSnapshot:
+        code_matches, code_check = await asyncio.to_thread(
+            check_code_similarity, request.hackathonId, request.projectId, request.repoSnapshot
+        )
+        matches.extend(code_matches)
+    
+    result = build_result(
+        matches, flags, github_check, similar_projects, missing_projects, code_check, search_error
+    )
+    if 'error' not in github_check:
+        # Indexing the snapshot may have bumped the code index version
+        result_cache.put(
+            cache_key, result, github_check.get('lastPush'), result_state(request, stored, missing_projects)
+        )
+    return result
+
+# Process pool for batch similarity work, created on first batch request.
+# Workers are spawned, not forked: by then the server runs threads (to_thread,
+# SQLite locks) and a forked child could inherit a lock held by one of them
+_similarity_pool: Optional[ProcessPoolExecutor] = None
+
+def get_similarity_pool() -> ProcessPoolExecutor:
+    global _similarity_pool
+    if _similarity_pool is None:
+        workers = int(os.getenv('SIMILARITY_WORKERS', '0')) or os.cpu_count() or 1
+        _similarity_pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'))
+    return _similarity_pool
+
+async def stream_batch_results(checks: List[PlagiarismCheckRequest]):
+    """
+    Run many checks at once, yielding one NDJSON line per project as it finishes
+
+    GitHub lookups are deduplicated across the batch (same repo or same
+    search keywords) and description scoring is fanned out over a process
+    pool. Every description and code snapshot is stored before scoring so
+    the batch's projects are also compared with each other.
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_similarity_pool()
+    
+    # 1. Start deduplicated GitHub lookups
+    repo_lookups = {
+        url: asyncio.ensure_future(check_github_originality(url, BATCH))
+        for url in dict.fromkeys(check.githubUrl for check in checks)
+    }
+    searches = {}
+    for check in checks:
+        keywords = search_keywords(check.description)
+        if keywords not in searches:
+            searches[keywords] = asyncio.ensure_future(search_public_projects(check.description, BATCH))
+    
+    # 2. Register the whole batch in the corpus and the code index
+    prepared = []
+    for check in checks:
+        normalized = normalize_text(check.description)
+        prepared.append((check, normalized, minhash_signature(normalized)))
+    store_projects([
+        (check.projectId, check.hackathonId, check.description, normalized, signature)
+        for check, normalized, signature in prepared
+    ])
+    code_checks = {}
+    for check in checks:
+        if check.repoSnapshot:
+            code_checks[check.projectId] = await asyncio.to_thread(
+                index_code_snapshot, check.hackathonId, check.projectId, check.repoSnapshot
+            )
+    
+    async def run_check(check: PlagiarismCheckRequest, normalized: str, signature) -> dict:
+        try:
+            stored, missing_projects = collect_stored_candidates(
+                check.projectId, normalized, signature, check.compareAgainst
+            )
+            cache_key = result_cache_key(check)
+            state = result_state(check, stored, missing_projects)
+            cached = await cached_result(cache_key, check.githubUrl, state)
+            if cached is not None:
+                return {'projectId': check.projectId, 'result': cached.model_dump()}
+            
+            github_check = await repo_lookups[check.githubUrl]
+            similar_projects, search_error = await searches[search_keywords(check.description)]
+            stored_hits, public_hits = await loop.run_in_executor(
+                pool,
+                score_descriptions,
+                normalized,
+                stored,
+                public_candidates(similar_projects),
+                DESCRIPTION_MATCH_THRESHOLD,
+                PUBLIC_REPO_MATCH_THRESHOLD,
+            )
+            matches = description_matches(stored_hits, public_hits, similar_projects)
+            
+            code_check = code_checks.get(check.projectId)
+            if code_check is not None and 'error' not in code_check:
+                matches.extend(await asyncio.to_thread(find_code_matches, check.hackathonId, check.projectId))
+            
+            result = build_result(
+                matches, github_flags(github_check), github_check, similar_projects,
+                missing_projects, code_check, search_error
+            )
+            if 'error' not in github_check:
+                result_cache.put(cache_key, result, github_check.get('lastPush'), state)
+            return {'projectId': check.projectId, 'result': result.model_dump()}
+        except Exception as e:
+            return {'projectId': check.projectId, 'error': str(e)}
+    
+    tasks = [asyncio.ensure_future(run_check(*item)) for item in prepared]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield json.dumps(await finished) + '\n'
+    finally:
+        # Client went away: don't keep working for nobody
+        for task in [*tasks, *repo_lookups.values(), *searches.values()]:
+            task.cancel()
+
+@app.post("/check-plagiarism/batch")
+async def check_plagiarism_batch(request: PlagiarismBatchRequest):
+    """
+    Check many projects at once
+    Streams one JSON object per line ({projectId, result} or {projectId, error})
+    in completion order
+    """
+    return StreamingResponse(
+        stream_batch_results(request.projects),
+        media_type='application/x-ndjson'
+    )
+
+def cohort_similarity(project_ids: List[str], texts: List[str], threshold: float, max_pairs: int) -> List[dict]:
+    """Paraphrase-tolerant all-pairs comparison of a cohort's descriptions"""
+    pairs = similar_pairs(tfidf_matrix(texts), threshold / 100)
+    return [{
+        'projectA': project_ids[i],
+        'projectB': project_ids[j],
+        'similarity': round(similarity * 100, 2),
+        'type': 'paraphrase',
+    } for i, j, similarity in pairs[:max_pairs]]
+
+@app.post("/cohort-similarity")
+async def check_cohort_similarity(request: CohortSimilarityRequest):
+    """
+    Compare every stored description of a cohort with every other one
+    Returns the most similar pairs by TF-IDF cosine similarity
+    """
+    if request.projectIds:
+        entries = list(corpus.get_many(request.projectIds).values())
+    elif request.hackathonId:
+        entries = list(corpus.iter_entries(request.hackathonId))
+    else:
+        raise HTTPException(status_code=400, detail="Provide hackathonId or projectIds")
+    
+    entries = [e for e in entries if e.normalized]
+    pairs = await asyncio.to_thread(
+        cohort_similarity,
+        [e.projectId for e in entries],
+        [e.normalized for e in entries],
+        request.threshold,
+        request.maxPairs,
+    ) if len(entries) > 1 else []
+    
+    return {'projects': len(entries), 'pairs': pairs}
+
+@app.post("/corpus/projects")
+async def ingest_projects(request: CorpusIngestRequest):
+    """
+    Bulk-load past submissions into the corpus
+    Existing projects with the same projectId are replaced
+    """
+    ingested = index_projects(request.projects)
+    return {"ingested": ingested, "corpus": corpus.stats()}
+
+@app.get("/corpus/stats")
+async def corpus_stats():
+    return corpus.stats()
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters of the check result cache"""
+    return {**result_cache.stats(), 'corpusVersion': corpus.version}
+
+@app.get("/github/rate-limits")
+async def github_rate_limits():
+    """Current state of the GitHub rate-limit scheduler"""
+    return github.scheduler.stats()
+
+@app.on_event("shutdown")
+async def close_clients():
+    await github.aclose()
+    if _similarity_pool is not None:
+        _similarity_pool.shutdown(wait=False, cancel_futures=True)
+
 @app.get("/health")
 async def health():
     return {"status": "healthy", "service": "plagiarism-detector"}
@@ -0,0 +1 @@
+"""Offline benchmark suite for the team matcher (see run_benchmark.py)"""
@@ -0,0 +1,283 @@
+"""
+Latency and throughput benchmark for the team matcher
+
+Grows a synthetic builder population (bench.synthetic) through several pool
+sizes and, at each size, measures:
+    scoring     score_pool + top_k over an encoded pool (no HTTP, no models)
+    validate    TeamMatchRequest validation of inline-pool request bodies
+    rank        the /match-team handler on the validated requests
+    serialize   encoding the handler's responses as FastAPI does
+    inline      POST /match-team with candidatePool, end to end
+    registry    POST /match-team by userId against registered builders,
+                --concurrency requests in flight
+
+validate + rank + serialize is the split of an inline request, measured
+in-process. GitHub activity is stubbed: every builder's score is seeded into
+the activity cache and GITHUB_API_URL points at a closed port, so runs are
+offline and repeatable. --matcher-url sends the inline and registry
+scenarios to a running deployment instead (its activity cache is not seeded,
+so it will try to reach its configured GitHub).
+
+Usage, from the team_matcher directory:
+    python -m bench.run_benchmark --pool-sizes 100,1000,10000,100000 --output results.json
+    python -m bench.run_benchmark --baseline results.json   # exit 1 on regression
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from .synthetic import generate_builders
+
+HACKATHON_ID = 'bench'
+REGISTER_CHUNK = 1000
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p99 of latencies given in seconds, reported in milliseconds"""
+    if not samples:
+        return {'p50Ms': 0.0, 'p99Ms': 0.0}
+    values = np.asarray(samples) * 1000
+    return {
+        'p50Ms': round(float(np.percentile(values, 50)), 3),
+        'p99Ms': round(float(np.percentile(values, 99)), 3),
+    }
+
+
+def row(scenario: str, pool_size: int, samples: List[float], elapsed: float,
+        units: int, unit: str, errors: int = 0) -> dict:
+    return {
+        'scenario': scenario,
+        'poolSize': pool_size,
+        'count': len(samples),
+        **percentiles(samples),
+        'throughput': round(units / elapsed, 2) if elapsed > 0 else 0.0,
+        'unit': unit,
+        'errors': errors,
+    }
+
+
+def seed_github_activity(builders: List[dict], seed: int) -> None:
+    """Give every builder with a GitHub URL a fresh cached activity score"""
+    from lib.github_activity import ActivityEntry, ActivityStore, github_username
+
+    rng = random.Random(seed)
+    now = time.time()
+    ActivityStore().put_many(
+        (github_username(builder['githubUrl']), ActivityEntry(rng.random(), None, now))
+        for builder in builders if builder['githubUrl']
+    )
+
+
+def bench_scoring(population: List[dict], pool_size: int, queries: List[int], max_results: int) -> dict:
+    """score_pool + top_k for each query builder over the encoded pool"""
+    import main
+    from lib.scoring import encode_pool, filter_rows, score_pool, top_k
+
+    builders = [main.Builder(**payload) for payload in population[:pool_size]]
+    pool = encode_pool(builders)
+    samples = []
+    started = time.perf_counter()
+    for query in queries:
+        t0 = time.perf_counter()
+        rows = filter_rows(pool, builders[query].userId)
+        top_k(score_pool(builders[query], pool, rows), max_results)
+        samples.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    return row('scoring', pool_size, samples, elapsed, pool_size * len(queries), 'candidates/s')
+
+
+def inline_bodies(population: List[dict], pool_size: int, queries: List[int], max_results: int) -> List[str]:
+    pool_json = json.dumps(population[:pool_size])
+    return [
+        f'{{"builder": {json.dumps(population[query])}, "candidatePool": {pool_json}, '
+        f'"maxResults": {max_results}}}'
+        for query in queries
+    ]
+
+
+async def bench_phases(bodies: List[str], pool_size: int) -> List[dict]:
+    """Validation, ranking and serialization of inline requests, timed separately"""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    import main
+
+    validate, rank, serialize = [], [], []
+    for body in bodies:
+        # Same steps as FastAPI: parse the body, validate it, call the
+        # handler, validate the response against response_model and encode it
+        t0 = time.perf_counter()
+        request = main.TeamMatchRequest.model_validate(json.loads(body))
+        t1 = time.perf_counter()
+        response = await main.match_team(request)
+        t2 = time.perf_counter()
+        content = main.TeamMatchResponse.model_validate(response.model_dump())
+        JSONResponse(jsonable_encoder(content))
+        t3 = time.perf_counter()
+        validate.append(t1 - t0)
+        rank.append(t2 - t1)
+        serialize.append(t3 - t2)
+    return [
+        row('validate', pool_size, validate, sum(validate), pool_size * len(bodies), 'builders/s'),
+        row('rank', pool_size, rank, sum(rank), len(bodies), 'requests/s'),
+        row('serialize', pool_size, serialize, sum(serialize), len(bodies), 'requests/s'),
+    ]
+
+
+async def register(client: httpx.AsyncClient, builders: List[dict]) -> float:
+    """Register builders through /builders; returns elapsed seconds"""
+    started = time.perf_counter()
+    for start in range(0, len(builders), REGISTER_CHUNK):
+        response = await client.post('/builders', json={'builders': builders[start:start + REGISTER_CHUNK]})
+        response.raise_for_status()
+    return time.perf_counter() - started
+
+
+async def bench_inline(client: httpx.AsyncClient, bodies: List[str], pool_size: int) -> dict:
+    samples: List[float] = []
+    errors = 0
+    started = time.perf_counter()
+    for body in bodies:
+        t0 = time.perf_counter()
+        response = await client.post('/match-team', content=body, headers={'Content-Type': 'application/json'})
+        samples.append(time.perf_counter() - t0)
+        if response.status_code != 200:
+            errors += 1
+    return row('inline', pool_size, samples, time.perf_counter() - started, len(bodies), 'requests/s', errors)
+
+
+async def bench_registry(client: httpx.AsyncClient, population: List[dict], pool_size: int,
+                         queries: List[int], max_results: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[float] = []
+    errors = 0
+
+    async def one(query: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            t0 = time.perf_counter()
+            response = await client.post('/match-team', json={
+                'userId': population[query]['userId'], 'hackathonId': HACKATHON_ID, 'maxResults': max_results,
+            })
+            samples.append(time.perf_counter() - t0)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(query) for query in queries))
+    return row('registry', pool_size, samples, time.perf_counter() - started, len(queries), 'requests/s', errors)
+
+
+def compare(results: List[dict], baseline: List[dict], tolerance: float) -> List[str]:
+    """Regressions of p50 latency or throughput beyond tolerance, as messages"""
+    previous = {(r['scenario'], r['poolSize']): r for r in baseline}
+    regressions = []
+    for result in results:
+        base = previous.get((result['scenario'], result['poolSize']))
+        if base is None:
+            continue
+        label = f"{result['scenario']} @ {result['poolSize']}"
+        if base['p50Ms'] and result['p50Ms'] > base['p50Ms'] * (1 + tolerance):
+            regressions.append(f"{label}: p50 {base['p50Ms']}ms -> {result['p50Ms']}ms")
+        if base['throughput'] and result['throughput'] < base['throughput'] * (1 - tolerance):
+            regressions.append(f"{label}: throughput {base['throughput']} -> {result['throughput']} {result['unit']}")
+    return regressions
+
+
+def print_table(results: List[dict]) -> None:
+    header = f"{'scenario':<12}{'pool':>9}{'count':>8}{'p50 ms':>12}{'p99 ms':>12}{'throughput':>16}  unit          errors"
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(f"{r['scenario']:<12}{r['poolSize']:>9}{r['count']:>8}{r['p50Ms']:>12.3f}{r['p99Ms']:>12.3f}"
+              f"{r['throughput']:>16.2f}  {r['unit']:<14}{r['errors']}")
+
+
+async def run(args: argparse.Namespace) -> List[dict]:
+    sizes = sorted(int(size) for size in args.pool_sizes.split(','))
+    population = generate_builders(sizes[-1], seed=args.seed, hackathon_id=HACKATHON_ID)
+    seed_github_activity(population, args.seed)
+
+    import main
+    if args.matcher_url:
+        client = httpx.AsyncClient(base_url=args.matcher_url, timeout=None)
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url='http://matcher', timeout=None)
+
+    rng = random.Random(args.seed)
+    results = []
+    registered = 0
+    try:
+        for size in sizes:
+            # The registry only grows, so each size registers the next slice
+            elapsed = await register(client, population[registered:size])
+            print(f"Registry at {size} builders (+{size - registered} in {elapsed:.2f}s)", file=sys.stderr)
+            registered = size
+
+            results.append(bench_scoring(
+                population, size, [rng.randrange(size) for _ in range(args.queries)], args.max_results
+            ))
+            bodies = inline_bodies(
+                population, size, [rng.randrange(size) for _ in range(args.inline_requests)], args.max_results
+            )
+            results.extend(await bench_phases(bodies, size))
+            results.append(await bench_inline(client, bodies, size))
+            results.append(await bench_registry(
+                client, population, size, [rng.randrange(size) for _ in range(args.registry_requests)],
+                args.max_results, args.concurrency
+            ))
+    finally:
+        await client.aclose()
+        await main.close_github_client()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Team matcher benchmark')
+    parser.add_argument('--pool-sizes', default='100,1000,10000', help='Comma-separated pool sizes (up to 100000)')
+    parser.add_argument('--queries', type=int, default=200, help='Query builders for the scoring scenario')
+    parser.add_argument('--inline-requests', type=int, default=20, help='Requests carrying the whole pool')
+    parser.add_argument('--registry-requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8, help='Registry requests in flight at once')
+    parser.add_argument('--max-results', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--matcher-url', help='Send HTTP scenarios to a running matcher instead of an in-process one')
+    parser.add_argument('--output', help='Write results as JSON')
+    parser.add_argument('--baseline', help='Earlier --output file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative regression')
+    args = parser.parse_args(argv)
+
+    # The matcher reads its configuration at import time
+    workdir = tempfile.mkdtemp(prefix='team-matcher-bench-')
+    os.environ['GITHUB_API_URL'] = 'http://127.0.0.1:9'
+    os.environ['GITHUB_ACTIVITY_DB_PATH'] = os.path.join(workdir, 'github_activity.db')
+    os.environ['BUILDER_REGISTRY_DB_PATH'] = os.path.join(workdir, 'builders.db')
+    os.environ['SUGGESTIONS_DB_PATH'] = os.path.join(workdir, 'suggestions.db')
+
+    results = asyncio.run(run(args))
+
+    print_table(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f)['results'], args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Synthetic builder populations
+
+Builders are generated deterministically from a seed with roughly the shape
+of a SafariLink hackathon: mostly developers, skills clustered in one or two
+categories (with the odd alternative spelling), timezones concentrated on
+African offsets plus some diaspora, and a mix of languages and availability.
+"""
+import random
+from typing import Dict, List, Optional
+
+from lib.skills import SKILL_CATEGORIES
+
+ROLES = ['developer', 'designer', 'pm']
+ROLE_WEIGHTS = [0.6, 0.2, 0.2]
+
+# Categories a builder of each role usually draws skills from
+ROLE_CATEGORIES = {
+    'developer': ['frontend', 'backend', 'blockchain', 'ai', 'mobile', 'data', 'devops', 'security'],
+    'designer': ['design', 'frontend', 'product'],
+    'pm': ['product', 'design', 'data'],
+}
+
+# Spellings users actually type, resolved by the skill aliases
+SKILL_VARIANTS = {
+    'nextjs': 'Next.js', 'nodejs': 'Node.js', 'react': 'React', 'solidity': 'Solidity ',
+    'typescript': 'TS', 'go': 'golang', 'ml': 'Machine Learning', 'react-native': 'React Native',
+    'postgresql': 'Postgres', 'kubernetes': 'k8s',
+}
+
+TIMEZONES = ['UTC+0', 'UTC+1', 'UTC+2', 'UTC+3', 'UTC+4', 'UTC-5', 'UTC-4', 'UTC+5', 'UTC+8', 'UTC-8']
+TIMEZONE_WEIGHTS = [0.15, 0.25, 0.15, 0.25, 0.04, 0.06, 0.03, 0.03, 0.02, 0.02]
+
+LANGUAGES = ['en', 'sw', 'fr']
+LANGUAGE_WEIGHTS = [0.6, 0.25, 0.15]
+
+AVAILABILITY = ['full-time', 'part-time', 'weekend']
+AVAILABILITY_WEIGHTS = [0.4, 0.35, 0.25]
+
+
+def make_skills(role: str, rng: random.Random) -> List[str]:
+    categories = ROLE_CATEGORIES[role]
+    focus = rng.sample(categories, rng.choice([1, 1, 2]))
+    pool = [skill for category in focus for skill in SKILL_CATEGORIES[category]]
+    skills = rng.sample(pool, min(len(pool), rng.randint(1, 5)))
+    # An occasional skill from outside the focus
+    if rng.random() < 0.3:
+        skills.append(rng.choice(SKILL_CATEGORIES[rng.choice(list(SKILL_CATEGORIES))]))
+    return [SKILL_VARIANTS.get(skill, skill) if rng.random() < 0.2 else skill for skill in skills]
+
+
+def make_builder(index: int, rng: random.Random, hackathon_id: Optional[str] = None) -> Dict:
+    """One Builder payload (as sent to /builders and /match-team)"""
+    role = rng.choices(ROLES, ROLE_WEIGHTS)[0]
+    others = [r for r in ROLES if r != role]
+    return {
+        'userId': f'builder-{index}',
+        'walletAddress': f'0x{rng.getrandbits(160):040x}',
+        'builderScore': min(1000, int(rng.gammavariate(2.0, 120))),
+        'skills': make_skills(role, rng),
+        'githubUrl': f'https://github.com/builder{index}' if rng.random() < 0.85 else None,
+        'timezone': rng.choices(TIMEZONES, TIMEZONE_WEIGHTS)[0],
+        'preferredRole': role,
+        'lookingForRoles': rng.sample(others, rng.randint(1, 2)),
+        'language': rng.choices(LANGUAGES, LANGUAGE_WEIGHTS)[0],
+        'hackathonId': hackathon_id,
+        'availability': rng.choices(AVAILABILITY, AVAILABILITY_WEIGHTS)[0],
+    }
+
+
+def generate_builders(count: int, seed: int = 0, hackathon_id: Optional[str] = None,
+                      start: int = 0) -> List[Dict]:
+    """
+    Builder payloads builder-{start} .. builder-{start + count - 1}
+
+    The same seed and start always give the same builders.
+    """
+    rng = random.Random(f'{seed}:{start}')
+    return [make_builder(start + i, rng, hackathon_id) for i in range(count)]
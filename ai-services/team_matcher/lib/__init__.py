@@ -0,0 +1,87 @@
+"""Helpers for the team matcher service"""
+from .github_activity import ActivityStore, GitHubActivity, activity_score, github_username
+from .github_scheduler import (
+    BATCH,
+    INTERACTIVE,
+    MAX_QUEUE_WAIT,
+    GitHubRateLimited,
+    GitHubScheduler,
+)
+from .registry import BuilderRegistry, BuilderStore, HackathonPool
+from .scoring import (
+    CompatibilityTables,
+    EncodedPool,
+    Vocabulary,
+    availability_match,
+    compatibility_tables,
+    encode_pool,
+    exclude_user,
+    filter_rows,
+    language_match,
+    score_encoded,
+    score_matrix,
+    score_pool,
+    timezone_day,
+    timezone_offset,
+    timezone_slots,
+    top_k,
+    top_k_with_bonus,
+)
+from .skill_index import SkillIndex, measure_recall, recall_at_k
+from .skills import (
+    CATEGORY_NAMES,
+    SKILL_ALIASES,
+    SKILL_CATEGORIES,
+    SKILL_DIM,
+    get_skill_vector,
+    normalize_skill,
+)
+from .suggestions import SuggestionStore, Suggestions, compute_suggestions
+from .team_formation import TeamFormation, form_teams, team_score
+
+__all__ = [
+    "ActivityStore",
+    "GitHubActivity",
+    "activity_score",
+    "github_username",
+    "BATCH",
+    "INTERACTIVE",
+    "MAX_QUEUE_WAIT",
+    "GitHubRateLimited",
+    "GitHubScheduler",
+    "BuilderRegistry",
+    "BuilderStore",
+    "HackathonPool",
+    "CompatibilityTables",
+    "EncodedPool",
+    "Vocabulary",
+    "availability_match",
+    "compatibility_tables",
+    "encode_pool",
+    "exclude_user",
+    "filter_rows",
+    "language_match",
+    "score_encoded",
+    "score_matrix",
+    "score_pool",
+    "timezone_day",
+    "timezone_offset",
+    "timezone_slots",
+    "top_k",
+    "top_k_with_bonus",
+    "SkillIndex",
+    "measure_recall",
+    "recall_at_k",
+    "CATEGORY_NAMES",
+    "SKILL_ALIASES",
+    "SKILL_CATEGORIES",
+    "SKILL_DIM",
+    "get_skill_vector",
+    "normalize_skill",
+    "SuggestionStore",
+    "Suggestions",
+    "compute_suggestions",
+    "TeamFormation",
+    "form_teams",
+    "team_score",
+]
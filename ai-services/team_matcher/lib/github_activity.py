@@ -0,0 +1,300 @@
+"""
+Cached GitHub activity scores
+
+Matching never waits on GitHub: scores are read from an in-memory cache
+backed by SQLite, and missing or stale ones are fetched in the background
+(concurrently, through the shared pooled client and the rate-limit
+scheduler). A candidate without a cached score counts as 0 until the first
+fetch lands; registering builders through the registry prefetches them.
+
+Stale scores are still served while they are refreshed, and revalidation
+uses ETags so unchanged profiles cost a 304 that GitHub does not count.
+The in-memory cache is an LRU of GITHUB_ACTIVITY_CACHE_SIZE usernames (the
+store keeps all of them), each refresh batch is written to SQLite in one
+transaction off the event loop, and a rate-limited response (403/429)
+pauses the scheduler so the rest of the batch waits instead of retrying.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import httpx
+
+from .github_scheduler import BATCH, MAX_QUEUE_WAIT, GitHubRateLimited, GitHubScheduler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ACTIVITY_PATH = os.path.join('data', 'github_activity.db')
+
+# SQLite's default limit on bound parameters is 999
+_QUERY_CHUNK = 500
+
+# Seconds to pause after a secondary rate limit that sent no Retry-After
+SECONDARY_LIMIT_PAUSE = float(os.getenv('GITHUB_SECONDARY_LIMIT_PAUSE', '60'))
+
+
+class ActivityEntry(NamedTuple):
+    score: float
+    etag: Optional[str]
+    fetchedAt: float
+
+
+@lru_cache(maxsize=65536)
+def github_username(github_url: Optional[str]) -> Optional[str]:
+    """Username of a github.com profile URL, lowercased for cache keys"""
+    if not github_url:
+        return None
+    username = github_url.split('github.com/')[-1].strip('/')
+    return username.lower() or None
+
+
+def activity_score(profile: dict) -> float:
+    """Simple scoring: repos + followers"""
+    return min((profile.get('public_repos', 0) + profile.get('followers', 0) * 2) / 100, 1.0)
+
+
+class ActivityStore:
+    """SQLite store of activity scores per GitHub username"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('GITHUB_ACTIVITY_DB_PATH', DEFAULT_ACTIVITY_PATH)
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS github_activity (
+                username TEXT PRIMARY KEY,
+                score REAL NOT NULL,
+                etag TEXT,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get_many(self, usernames: List[str]) -> Dict[str, ActivityEntry]:
+        found = {}
+        with self._lock:
+            for start in range(0, len(usernames), _QUERY_CHUNK):
+                chunk = usernames[start:start + _QUERY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                for username, score, etag, fetched_at in self._conn.execute(
+                    f'SELECT username, score, etag, fetched_at FROM github_activity '
+                    f'WHERE username IN ({placeholders})',
+                    chunk
+                ):
+                    found[username] = ActivityEntry(score, etag, fetched_at)
+        return found
+
+    def put(self, username: str, entry: ActivityEntry) -> None:
+        self.put_many([(username, entry)])
+
+    def put_many(self, entries: Iterable[Tuple[str, ActivityEntry]]) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO github_activity (username, score, etag, fetched_at) '
+                    'VALUES (?, ?, ?, ?)',
+                    ((username, entry.score, entry.etag, entry.fetchedAt) for username, entry in entries)
+                )
+
+
+class GitHubActivity:
+    """Activity scores served from cache, refreshed in the background"""
+
+    def __init__(
+        self,
+        http: httpx.AsyncClient,
+        scheduler: GitHubScheduler,
+        store: Optional[ActivityStore] = None,
+        ttl: Optional[float] = None,
+        concurrency: Optional[int] = None,
+        max_entries: Optional[int] = None
+    ):
+        self.http = http
+        self.scheduler = scheduler
+        self.store = store or ActivityStore()
+        # Seconds before a score is refreshed (it is still served meanwhile)
+        self.ttl = ttl if ttl is not None else float(os.getenv('GITHUB_ACTIVITY_TTL', '21600'))
+        self._semaphore = asyncio.Semaphore(concurrency or int(os.getenv('GITHUB_ACTIVITY_CONCURRENCY', '10')))
+        # Usernames kept in memory (scores and known-absent names each)
+        self.max_entries = max_entries or int(os.getenv('GITHUB_ACTIVITY_CACHE_SIZE', '50000'))
+        self._entries: 'OrderedDict[str, ActivityEntry]' = OrderedDict()
+        # Usernames known to be absent from the store (until first fetched)
+        self._absent: 'OrderedDict[str, None]' = OrderedDict()
+        self._pending: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.fetched = 0
+        self.failed = 0
+        self.evictions = 0
+
+    def _remember(self, username: str, entry: ActivityEntry) -> None:
+        self._entries[username] = entry
+        self._entries.move_to_end(username)
+        self._absent.pop(username, None)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _load(self, usernames: Iterable[str]) -> Dict[str, ActivityEntry]:
+        """
+        Entries of the given usernames, pulling those missing from memory
+        out of the on-disk store (returned even if evicted again meanwhile)
+        """
+        usernames = list(dict.fromkeys(usernames))
+        known = {u: self._entries[u] for u in usernames if u in self._entries}
+        missing = [u for u in usernames if u not in known and u not in self._absent]
+        if missing:
+            found = self.store.get_many(missing)
+            for username in missing:
+                if username in found:
+                    self._remember(username, found[username])
+                else:
+                    self._absent[username] = None
+            while len(self._absent) > self.max_entries:
+                self._absent.popitem(last=False)
+            known.update(found)
+        return known
+
+    def scores(self, github_urls: List[Optional[str]]) -> List[float]:
+        """
+        Cached scores for a list of profile URLs, without waiting on GitHub
+
+        Unknown or stale profiles are queued for a background refresh.
+        """
+        usernames = [github_username(url) for url in github_urls]
+        known = self._load(u for u in usernames if u)
+        now = time.time()
+        result = []
+        refresh = []
+        for username in usernames:
+            if username is None:
+                result.append(0.0)
+                continue
+            entry = known.get(username)
+            if entry is None:
+                self.misses += 1
+                refresh.append(username)
+                result.append(0.0)
+                continue
+            self.hits += 1
+            if username in self._entries:
+                self._entries.move_to_end(username)
+            if now - entry.fetchedAt > self.ttl:
+                self.stale += 1
+                refresh.append(username)
+            result.append(entry.score)
+        if refresh:
+            self.refresh_in_background(refresh)
+        return result
+
+    def prefetch(self, github_urls: Iterable[Optional[str]]) -> None:
+        """Queue fetches for profiles that have no fresh score yet"""
+        usernames = [u for u in (github_username(url) for url in github_urls) if u]
+        known = self._load(usernames)
+        now = time.time()
+        self.refresh_in_background([
+            u for u in usernames
+            if u not in known or now - known[u].fetchedAt > self.ttl
+        ])
+
+    def refresh_in_background(self, usernames: Iterable[str]) -> None:
+        wanted = [u for u in dict.fromkeys(usernames) if u not in self._pending]
+        if not wanted:
+            return
+        self._pending.update(wanted)
+        task = asyncio.get_running_loop().create_task(self.refresh(wanted))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def refresh(self, usernames: List[str]) -> None:
+        """Fetch scores concurrently; failures keep the previous score"""
+        try:
+            results = await asyncio.gather(
+                *(self._fetch(username) for username in usernames), return_exceptions=True
+            )
+            fetched = []
+            for username, result in zip(usernames, results):
+                if isinstance(result, Exception):
+                    self.failed += 1
+                    logger.warning(f"GitHub activity fetch failed for {username}: {result!r}")
+                elif result is not None:
+                    fetched.append((username, result))
+            if fetched:
+                await asyncio.to_thread(self.store.put_many, fetched)
+        finally:
+            self._pending.difference_update(usernames)
+
+    async def _fetch(self, username: str) -> Optional[ActivityEntry]:
+        """New entry for a username (also cached in memory), None if the fetch failed"""
+        path = f'/users/{username}'
+        previous = self._entries.get(username)
+        headers = {'If-None-Match': previous.etag} if previous and previous.etag else {}
+        async with self._semaphore:
+            try:
+                await self.scheduler.acquire(path, BATCH, MAX_QUEUE_WAIT[BATCH])
+                response = await self.http.get(path, headers=headers)
+            except (GitHubRateLimited, httpx.HTTPError) as e:
+                self.failed += 1
+                logger.warning(f"GitHub activity fetch failed for {username}: {e}")
+                return None
+        self.scheduler.observe(path, response.headers)
+
+        if response.status_code == 304 and previous is not None:
+            self.scheduler.refund(path)
+            entry = previous._replace(fetchedAt=time.time())
+        elif response.status_code == 200:
+            entry = ActivityEntry(activity_score(response.json()), response.headers.get('etag'), time.time())
+        elif response.status_code == 404:
+            entry = ActivityEntry(0.0, None, time.time())
+        else:
+            if response.status_code in (403, 429):
+                self._back_off(path, response)
+            self.failed += 1
+            return None
+        self.fetched += 1
+        self._remember(username, entry)
+        return entry
+
+    def _back_off(self, path: str, response: httpx.Response) -> None:
+        """Pause the scheduler after a rate-limited response"""
+        retry_after = response.headers.get('retry-after')
+        if retry_after is None and response.headers.get('x-ratelimit-remaining') == '0':
+            # Primary limit: observe() already holds requests until the reset
+            return
+        try:
+            seconds = float(retry_after) if retry_after is not None else SECONDARY_LIMIT_PAUSE
+        except ValueError:
+            seconds = SECONDARY_LIMIT_PAUSE
+        self.scheduler.pause(path, seconds)
+
+    async def aclose(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'cached': len(self._entries),
+            'maxEntries': self.max_entries,
+            'evictions': self.evictions,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'stale': self.stale,
+            'refreshing': len(self._pending),
+            'fetched': self.fetched,
+            'failed': self.failed,
+        }
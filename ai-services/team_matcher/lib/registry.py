@@ -0,0 +1,303 @@
+"""
+Server-side registry of builders per hackathon
+
+Clients register profiles once (and again when they change) instead of
+POSTing the whole candidate pool with every match request. Each hackathon's
+builders are kept pre-encoded in growable column arrays (see scoring.py):
+an upsert re-encodes only the changed rows and a delete moves the last row
+into the freed slot, so the arrays never need a full rebuild. Each pool also
+keeps a SkillIndex over its rows for shortlisting large pools.
+
+Timezone offsets are encoded as of the day they were computed. IANA names
+("Europe/Paris") change offset with DST, so the first snapshot of a new day
+re-resolves every row and re-labels the ones whose offset moved.
+
+Profiles are persisted in SQLite and re-encoded at startup.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .scoring import EncodedPool, encode_pool, timezone_day, timezone_offset
+from .skill_index import SkillIndex
+
+DEFAULT_REGISTRY_PATH = os.path.join('data', 'builders.db')
+DEFAULT_HACKATHON = 'default'
+
+_INITIAL_CAPACITY = 64
+_TZ_COLUMN = EncodedPool._fields.index('tzOffsets')
+
+
+def hackathon_key(hackathon_id: Optional[str]) -> str:
+    return hackathon_id or DEFAULT_HACKATHON
+
+
+class HackathonPool:
+    """Encoded builders of one hackathon, updated in place"""
+
+    def __init__(self):
+        self.builders: List = []
+        self._rows: Dict[str, int] = {}
+        self._columns: Optional[List[np.ndarray]] = None
+        self._timezone_day = timezone_day()
+        self.index = SkillIndex()
+
+    def __len__(self) -> int:
+        return len(self.builders)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._rows
+
+    def get(self, user_id: str):
+        row = self._rows.get(user_id)
+        return self.builders[row] if row is not None else None
+
+    def _reserve(self, size: int, template: EncodedPool) -> None:
+        """Make room for size rows, doubling capacity as needed"""
+        if self._columns is None:
+            capacity = max(_INITIAL_CAPACITY, size)
+            self._columns = [
+                np.empty((capacity,) + column.shape[1:], dtype=column.dtype) for column in template
+            ]
+            return
+        capacity = len(self._columns[0])
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        grown = []
+        for column in self._columns:
+            new_column = np.empty((capacity,) + column.shape[1:], dtype=column.dtype)
+            new_column[:len(self.builders)] = column[:len(self.builders)]
+            grown.append(new_column)
+        self._columns = grown
+
+    @staticmethod
+    def encode(builders: Sequence) -> Tuple[List, EncodedPool]:
+        """Deduplicate a batch by userId (last profile wins) and encode it"""
+        batch = list({builder.userId: builder for builder in builders}.values())
+        return batch, encode_pool(batch)
+
+    def upsert(self, builders: Sequence, encoded: Optional[Tuple[List, EncodedPool]] = None) -> None:
+        """Add new builders and overwrite the rows of changed ones"""
+        if not builders:
+            return
+        batch, encoded = encoded or self.encode(builders)
+        new_count = sum(1 for builder in batch if builder.userId not in self._rows)
+        self._reserve(len(self.builders) + new_count, encoded)
+
+        rows = []
+        for builder in batch:
+            row = self._rows.get(builder.userId)
+            if row is None:
+                row = len(self.builders)
+                self._rows[builder.userId] = row
+                self.builders.append(builder)
+            else:
+                self.builders[row] = builder
+            rows.append(row)
+        rows = np.asarray(rows, dtype=np.int64)
+        for column, values in zip(self._columns, encoded):
+            column[rows] = values
+        self.index.update(rows, encoded)
+
+    def remove(self, user_id: str) -> bool:
+        """Delete a builder by moving the last row into its slot"""
+        row = self._rows.pop(user_id, None)
+        if row is None:
+            return False
+        last = len(self.builders) - 1
+        if row != last:
+            moved = self.builders[last]
+            self.builders[row] = moved
+            self._rows[moved.userId] = row
+            for column in self._columns:
+                column[row] = column[last]
+            self.index.move(last, row)
+        self.builders.pop()
+        self.index.invalidate()
+        return True
+
+    def refresh_timezones(self, day: int) -> None:
+        """Re-resolve timezone offsets when the day changes (IANA names follow DST)"""
+        if day == self._timezone_day:
+            return
+        self._timezone_day = day
+        if self._columns is None:
+            return
+        size = len(self.builders)
+        offsets = np.array([timezone_offset(b.timezone) for b in self.builders], dtype=np.float64)
+        rows = np.flatnonzero(offsets != self._columns[_TZ_COLUMN][:size])
+        if not len(rows):
+            return
+        # A new array rather than an in-place write: earlier snapshots keep their views
+        column = self._columns[_TZ_COLUMN].copy()
+        column[rows] = offsets[rows]
+        self._columns[_TZ_COLUMN] = column
+        self.index.update(rows, EncodedPool(*(values[rows] for values in self._columns)))
+
+    def snapshot(self) -> Tuple[List, EncodedPool]:
+        """
+        Builders and their encoded columns, aligned by row
+
+        The columns are views; score them before yielding to the event loop.
+        """
+        self.refresh_timezones(timezone_day())
+        size = len(self.builders)
+        if self._columns is None:
+            return [], encode_pool([])
+        return list(self.builders), EncodedPool(*(column[:size] for column in self._columns))
+
+
+class BuilderStore:
+    """SQLite persistence for registered builder profiles"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('BUILDER_REGISTRY_DB_PATH', DEFAULT_REGISTRY_PATH)
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS builders (
+                hackathon_id TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                profile TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (hackathon_id, user_id)
+            )
+        """)
+        self._conn.commit()
+
+    def upsert_many(self, records: Iterable[Tuple[str, str, str]]) -> None:
+        """Write (hackathonId, userId, profile JSON) records in one transaction"""
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO builders (hackathon_id, user_id, profile, updated_at) '
+                    'VALUES (?, ?, ?, ?)',
+                    [(hackathon, user_id, profile, now) for hackathon, user_id, profile in records]
+                )
+
+    def delete(self, hackathon_id: str, user_id: str) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    'DELETE FROM builders WHERE hackathon_id = ? AND user_id = ?', (hackathon_id, user_id)
+                )
+
+    def iter_profiles(self) -> List[Tuple[str, str]]:
+        """All (hackathonId, profile JSON) rows"""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT hackathon_id, profile FROM builders ORDER BY hackathon_id, rowid'
+            ).fetchall()
+
+
+class BuilderRegistry:
+    """Registered builders of every hackathon, persisted and kept encoded"""
+
+    def __init__(self, parse: Callable[[str], object], store: Optional[BuilderStore] = None):
+        """
+        Args:
+            parse: Builds a builder object from its stored JSON profile
+            store: Persistence backend (defaults to BUILDER_REGISTRY_DB_PATH)
+        """
+        self.store = store or BuilderStore()
+        self._pools: Dict[str, HackathonPool] = {}
+        self._lock = threading.Lock()
+
+        loaded: Dict[str, list] = {}
+        for hackathon, profile in self.store.iter_profiles():
+            loaded.setdefault(hackathon, []).append(parse(profile))
+        for hackathon, builders in loaded.items():
+            self._pool(hackathon).upsert(builders)
+
+    def _pool(self, hackathon: str) -> HackathonPool:
+        pool = self._pools.get(hackathon)
+        if pool is None:
+            pool = self._pools[hackathon] = HackathonPool()
+        return pool
+
+    def upsert(self, builders: Sequence) -> int:
+        """
+        Register or update builders under their own hackathonId
+
+        Returns:
+            Number of profiles written
+        """
+        by_hackathon: Dict[str, list] = {}
+        for builder in builders:
+            by_hackathon.setdefault(hackathon_key(builder.hackathonId), []).append(builder)
+        # Encode everything first: an invalid profile (ValueError) leaves
+        # both the arrays and the store untouched
+        encoded = {hackathon: HackathonPool.encode(members) for hackathon, members in by_hackathon.items()}
+        with self._lock:
+            for hackathon, members in by_hackathon.items():
+                self._pool(hackathon).upsert(members, encoded[hackathon])
+            self.store.upsert_many(
+                (hackathon_key(builder.hackathonId), builder.userId, builder.model_dump_json())
+                for builder in builders
+            )
+        return len(builders)
+
+    def remove(self, hackathon_id: Optional[str], user_id: str) -> bool:
+        hackathon = hackathon_key(hackathon_id)
+        with self._lock:
+            pool = self._pools.get(hackathon)
+            if pool is None or not pool.remove(user_id):
+                return False
+            self.store.delete(hackathon, user_id)
+            if not len(pool):
+                del self._pools[hackathon]
+        return True
+
+    def get(self, hackathon_id: Optional[str], user_id: str):
+        pool = self._pools.get(hackathon_key(hackathon_id))
+        return pool.get(user_id) if pool is not None else None
+
+    def snapshot(self, hackathon_id: Optional[str]) -> Tuple[List, EncodedPool]:
+        """Builders of a hackathon with their encoded columns (empty if unknown)"""
+        with self._lock:
+            pool = self._pools.get(hackathon_key(hackathon_id))
+            if pool is None:
+                return [], encode_pool([])
+            return pool.snapshot()
+
+    def shortlist(
+        self,
+        hackathon_id: Optional[str],
+        builder,
+        size: int,
+        roles: Optional[Sequence[str]] = None
+    ) -> np.ndarray:
+        """
+        Rows of snapshot(hackathon_id) worth scoring exactly for builder
+
+        Only valid for the current snapshot: call both before yielding to the event loop.
+        """
+        with self._lock:
+            pool = self._pools.get(hackathon_key(hackathon_id))
+            if pool is None:
+                return np.empty(0, dtype=np.int64)
+            return pool.index.shortlist(builder, pool.snapshot()[1], size, roles)
+
+    def size(self, hackathon_id: Optional[str]) -> int:
+        pool = self._pools.get(hackathon_key(hackathon_id))
+        return len(pool) if pool is not None else 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hackathons': len(self._pools),
+                'builders': sum(len(pool) for pool in self._pools.values()),
+                'byHackathon': {hackathon: len(pool) for hackathon, pool in self._pools.items()},
+                'indexBuckets': {hackathon: pool.index.stats()['buckets'] for hackathon, pool in self._pools.items()},
+            }
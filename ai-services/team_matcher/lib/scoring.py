@@ -0,0 +1,427 @@
+"""
+Vectorized compatibility scoring
+
+A candidate pool is encoded once into column arrays (unit skill vectors,
+builder scores, timezone offsets, role / language / availability codes);
+scoring a builder against the whole pool is then a handful of NumPy
+operations instead of a Python loop over calculate_compatibility.
+
+Timezones are normalized once, at encoding, to minute-precision UTC offsets
+(IANA names resolved through zoneinfo, DST included). Timezone, language and
+availability compatibility then come from small precomputed tables, indexed
+by quarter-hour offset slots and vocabulary codes.
+
+score_pool must stay in step with calculate_compatibility in main.py, which
+remains the readable reference implementation.
+"""
+import re
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+
+from .skills import SKILL_DIM, get_skill_vector
+
+# Component weights, same order and values as calculate_compatibility
+WEIGHT_SKILLS = 0.35
+WEIGHT_ROLE = 0.25
+WEIGHT_SCORE = 0.15
+WEIGHT_TIMEZONE = 0.15
+WEIGHT_LANGUAGE = 0.05
+WEIGHT_AVAILABILITY = 0.05
+
+
+class Vocabulary:
+    """
+    Stable integer codes for categorical values (roles, languages, ...)
+
+    With a capacity, the first capacity - 1 distinct values get their own
+    code and any later one shares the last code, so tables indexed by code
+    keep a fixed size however many free-form values clients send.
+    """
+
+    def __init__(self, values: Iterable[Any] = (), capacity: Optional[int] = None):
+        self.capacity = capacity
+        self._codes: Dict[Any, int] = {}
+        for value in values:
+            self.code(value)
+
+    def _full(self) -> bool:
+        return self.capacity is not None and len(self._codes) >= self.capacity - 1
+
+    def code(self, value: Any) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            if self._full():
+                return self.capacity - 1
+            code = self._codes.setdefault(value, len(self._codes))
+        return code
+
+    def codes(self, values: Iterable[Any]) -> np.ndarray:
+        return np.fromiter((self.code(v) for v in values), dtype=np.int32)
+
+    def lookup(self, value: Any) -> int:
+        """Code of a known value, -1 otherwise (never adds: for query filters)"""
+        return self._codes.get(value, self.capacity - 1 if self._full() else -1)
+
+    def values(self) -> list:
+        """Values in code order"""
+        return list(self._codes)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+
+# Shared by every pool so codes are comparable between a builder and any pool
+ROLES = Vocabulary(['developer', 'designer', 'pm'])
+# Language and availability index the pair tables below, so they are bounded.
+# Every value the match functions special-case must be listed here
+LANGUAGES = Vocabulary(['en', 'sw', 'fr'], capacity=64)
+AVAILABILITY = Vocabulary(['full-time', 'part-time', 'weekend'], capacity=16)
+HACKATHONS = Vocabulary([None])
+
+
+_FIXED_OFFSET = re.compile(r'^(?:UTC|GMT)?\s*(?:([+-])\s*(\d{1,2})(?::?(\d{2}))?)?$', re.IGNORECASE)
+
+# Offsets are compared in quarter hours, from UTC-12:00 to UTC+14:00
+TZ_SLOT_MINUTES = 15
+TZ_MIN_SLOT = -12 * 60 // TZ_SLOT_MINUTES
+TZ_MAX_SLOT = 14 * 60 // TZ_SLOT_MINUTES
+
+
+@lru_cache(maxsize=4096)
+def _timezone_minutes(timezone: str, day: int) -> int:
+    """UTC offset in minutes; IANA names are resolved as of day (cached per day for DST)"""
+    name = timezone.strip()
+    fixed = _FIXED_OFFSET.match(name)
+    if fixed:
+        sign, hours, minutes = fixed.groups()
+        if sign is None:
+            return 0
+        offset = int(hours) * 60 + int(minutes or 0)
+        return -offset if sign == '-' else offset
+    try:
+        zone = ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return 0
+    return int(datetime.now(dt_timezone.utc).astimezone(zone).utcoffset().total_seconds() // 60)
+
+
+def timezone_offset(timezone: Optional[str]) -> float:
+    """
+    UTC offset in hours, to the minute
+
+    Accepts "UTC+3", "UTC-5:00", "UTC+5:30", "GMT+1", "+0545", "UTC" and IANA
+    names such as "Africa/Nairobi" (current offset, DST included). Anything
+    else counts as UTC.
+    """
+    if not timezone:
+        return 0.0
+    return _timezone_minutes(timezone, timezone_day()) / 60
+
+
+def timezone_day() -> int:
+    """Day (UTC ordinal) that IANA offsets are resolved for; offsets can change with it"""
+    return datetime.now(dt_timezone.utc).toordinal()
+
+
+def timezone_slots(offsets: np.ndarray) -> np.ndarray:
+    """Row indices into the timezone table for offsets in hours"""
+    slots = np.rint(np.asarray(offsets) * 60 / TZ_SLOT_MINUTES).astype(np.int64)
+    return np.clip(slots, TZ_MIN_SLOT, TZ_MAX_SLOT) - TZ_MIN_SLOT
+
+
+def language_match(language1: Any, language2: Any) -> float:
+    """Same language, with a bonus for Swahili speakers (often underrepresented)"""
+    if language1 != language2:
+        return 0.5
+    return 1.2 if language1 == 'sw' else 1.0
+
+
+def availability_match(availability1: Any, availability2: Any) -> float:
+    """Part-time + weekend is OK, but full-time + part-time/weekend is less ideal"""
+    if availability1 == availability2:
+        return 1.0
+    flexible = ('part-time', 'weekend')
+    if (availability1 == 'full-time' and availability2 in flexible) or \
+            (availability1 in flexible and availability2 == 'full-time'):
+        return 0.7
+    return 0.9
+
+
+class CompatibilityTables(NamedTuple):
+    timezone: np.ndarray  # [slot, slot] -> timezone compatibility
+    language: np.ndarray  # [code, code] -> language_match
+    availability: np.ndarray  # [code, code] -> availability_match
+
+
+def _pair_table(vocabulary: Vocabulary, match: Callable[[Any, Any], float]) -> np.ndarray:
+    # Codes not taken yet get placeholders equal only to themselves. The match
+    # functions special-case seeded values only, so any value that later takes
+    # a code scores exactly like its placeholder and the table never changes
+    values = vocabulary.values()
+    values += [object() for _ in range(vocabulary.capacity - len(values))]
+    return np.array([[match(a, b) for b in values] for a in values], dtype=np.float64)
+
+
+@lru_cache(maxsize=1)
+def compatibility_tables() -> CompatibilityTables:
+    """Lookup tables over every code of the bounded vocabularies (built once)"""
+    slots = np.arange(TZ_MAX_SLOT - TZ_MIN_SLOT + 1)
+    hours_apart = np.abs(slots[:, None] - slots) * TZ_SLOT_MINUTES / 60
+    return CompatibilityTables(
+        timezone=np.maximum(0.0, 1.0 - hours_apart / 12),
+        language=_pair_table(LANGUAGES, language_match),
+        availability=_pair_table(AVAILABILITY, availability_match),
+    )
+
+
+def unit_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows; all-zero rows stay zero (cosine similarity 0)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+class EncodedPool(NamedTuple):
+    userIds: np.ndarray  # object array of userId strings
+    skills: np.ndarray  # (n, SKILL_DIM) unit skill vectors
+    builderScores: np.ndarray
+    tzOffsets: np.ndarray
+    roles: np.ndarray
+    languages: np.ndarray
+    availability: np.ndarray
+    hackathons: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.userIds)
+
+
+def encode_pool(builders: Sequence) -> EncodedPool:
+    """Encode Builder-like objects into column arrays"""
+    n = len(builders)
+    skills = np.array([get_skill_vector(b.skills) for b in builders], dtype=np.float64).reshape(n, SKILL_DIM)
+    return EncodedPool(
+        userIds=np.array([b.userId for b in builders], dtype=object),
+        skills=unit_rows(skills),
+        builderScores=np.array([b.builderScore for b in builders], dtype=np.float64),
+        tzOffsets=np.array([timezone_offset(b.timezone) for b in builders], dtype=np.float64),
+        roles=ROLES.codes(b.preferredRole for b in builders),
+        languages=LANGUAGES.codes(b.language for b in builders),
+        availability=AVAILABILITY.codes(b.availability for b in builders),
+        hackathons=HACKATHONS.codes(b.hackathonId for b in builders),
+    )
+
+
+def wanted_roles(builders: Sequence) -> np.ndarray:
+    """(len(builders), len(ROLES)) mask of the roles each builder is looking for"""
+    mask = np.zeros((len(builders), len(ROLES)), dtype=bool)
+    for i, builder in enumerate(builders):
+        # A role nobody has registered with cannot match anyone
+        codes = [ROLES.lookup(role) for role in builder.lookingForRoles]
+        mask[i, [code for code in codes if code >= 0]] = True
+    return mask
+
+
+def score_matrix(builders: Sequence, queries: EncodedPool, pool: EncodedPool) -> np.ndarray:
+    """
+    Compatibility of every query builder with every pool member
+
+    Args:
+        builders: The query builders (for lookingForRoles), aligned with queries
+        queries: encode_pool(builders)
+        pool: Encoded candidate pool
+
+    Returns:
+        (len(queries), len(pool)) scores in [0, 1]; entry [i, j] equals
+        calculate_compatibility(builders[i], candidate j)
+    """
+    return score_encoded(wanted_roles(builders), queries, pool)
+
+
+# Largest role x language x availability table built per query; pools with
+# more distinct code combinations are scored over their unique combinations
+_MAX_CATEGORICAL_CELLS = 1024
+
+
+def _categorical_columns(pool: EncodedPool) -> Tuple[Tuple[np.ndarray, np.ndarray, np.ndarray], np.ndarray]:
+    """
+    The (role, language, availability) combinations to score and each pool row's combination
+
+    Sized from the codes present in the pool, never from the process-wide
+    vocabularies, which grow with every free-form value clients send.
+    """
+    codes = np.stack((pool.roles, pool.languages, pool.availability)).astype(np.int64)
+    shape = tuple(int(column.max()) + 1 for column in codes) if len(pool) else (1, 1, 1)
+    if shape[0] * shape[1] * shape[2] <= _MAX_CATEGORICAL_CELLS:
+        return np.unravel_index(np.arange(shape[0] * shape[1] * shape[2]), shape), np.ravel_multi_index(codes, shape)
+    unique, inverse = np.unique(codes, axis=1, return_inverse=True)
+    return (unique[0], unique[1], unique[2]), inverse.reshape(-1)
+
+
+def score_encoded(
+    wanted: np.ndarray,
+    queries: EncodedPool,
+    pool: EncodedPool,
+    tables: Optional[CompatibilityTables] = None
+) -> np.ndarray:
+    """
+    score_matrix with the queries' wanted roles given as a wanted_roles mask
+
+    tables must cover every language and availability code of queries and
+    pool (default: compatibility_tables() of this process).
+    """
+    if tables is None:
+        tables = compatibility_tables()
+
+    # Role, language and availability only take a few values: combine their
+    # weighted scores per (role, language, availability) of the candidates
+    # once per query, then look each candidate's combination up
+    (roles, languages, availability), combinations = _categorical_columns(pool)
+    if len(roles) and roles.max() >= wanted.shape[1]:
+        # Roles newer than the mask are not ones the builder is looking for
+        wanted = np.pad(wanted, ((0, 0), (0, int(roles.max()) + 1 - wanted.shape[1])))
+    categorical = (
+        wanted[:, roles] * WEIGHT_ROLE +  # 2. role is one the builder is looking for
+        tables.language[queries.languages][:, languages] * WEIGHT_LANGUAGE +  # 5. language
+        tables.availability[queries.availability][:, availability] * WEIGHT_AVAILABILITY  # 6. availability
+    )
+
+    # 1. Complementary skills: 1 - cosine similarity
+    total = queries.skills @ pool.skills.T
+    np.subtract(1.0, total, out=total)
+    total *= WEIGHT_SKILLS
+
+    # 3. Builder score difference (in place: the batch job scores very large blocks)
+    difference = np.subtract.outer(queries.builderScores, pool.builderScores)
+    np.abs(difference, out=difference)
+    difference /= 500
+    np.subtract(1.0, difference, out=difference)
+    np.maximum(difference, 0.0, out=difference)
+    difference *= WEIGHT_SCORE
+    total += difference
+
+    # 4. Timezone difference, looked up by quarter-hour slot
+    timezone_rows = tables.timezone[timezone_slots(queries.tzOffsets)] * WEIGHT_TIMEZONE
+    total += np.take(timezone_rows, timezone_slots(pool.tzOffsets), axis=1)
+
+    total += np.take(categorical, combinations, axis=1)
+    return np.minimum(total, 1.0, out=total)
+
+
+def score_pool(builder, pool: EncodedPool, rows: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Compatibility of a builder with every pool member (or only the given rows)
+
+    Args:
+        builder: Builder the matches are for
+        pool: Encoded candidate pool
+        rows: Optional indices into the pool to score
+
+    Returns:
+        Scores in [0, 1], same as calculate_compatibility(builder, candidate)
+    """
+    if rows is not None:
+        pool = EncodedPool(*(column[rows] for column in pool))
+    return score_matrix([builder], encode_pool([builder]), pool)[0]
+
+
+def exclude_user(pool: EncodedPool, user_id: str) -> np.ndarray:
+    """Row indices of everyone in the pool except user_id"""
+    return np.flatnonzero(pool.userIds != user_id)
+
+
+def filter_rows(
+    pool: EncodedPool,
+    user_id: str,
+    roles: Optional[Sequence[str]] = None,
+    availability: Optional[Sequence[str]] = None,
+    hackathon_id: Optional[str] = None,
+    rows: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Row indices passing the hard filters, user_id excluded
+
+    Args:
+        roles: Keep only these preferred roles
+        availability: Keep only these availabilities
+        hackathon_id: Keep only builders of this hackathon
+        rows: Only consider these rows (e.g. an index shortlist)
+    """
+    if rows is not None:
+        pool = EncodedPool(*(column[rows] for column in pool))
+    keep = pool.userIds != user_id
+    if roles is not None:
+        keep &= np.isin(pool.roles, [ROLES.lookup(role) for role in roles])
+    if availability is not None:
+        keep &= np.isin(pool.availability, [AVAILABILITY.lookup(value) for value in availability])
+    if hackathon_id is not None:
+        keep &= pool.hackathons == HACKATHONS.lookup(hackathon_id)
+    return rows[keep] if rows is not None else np.flatnonzero(keep)
+
+
+def top_k(values: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest values, best first (ties keep index order)"""
+    if k <= 0 or not len(values):
+        return np.empty(0, dtype=np.int64)
+    if k < len(values):
+        candidates = np.argpartition(-values, k - 1)[:k]
+    else:
+        candidates = np.arange(len(values))
+    return candidates[np.lexsort((candidates, -values[candidates]))]
+
+
+def top_k_with_bonus(
+    base: np.ndarray,
+    k: int,
+    bonus_weight: float,
+    bonus_for: Callable[[np.ndarray], Sequence[float]],
+    chunk: int = 256
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top k of base + bonus_weight * bonus, for a bonus in [0, 1] that is costly to look up
+
+    Candidates are visited by descending base score in growing chunks;
+    the scan stops once no remaining candidate can reach the current k-th
+    best total, so bonuses are looked up for a shortlist only. Each chunk is
+    cut from the unvisited rows with argpartition and only the chunk is
+    sorted, so the usual single-chunk scan never sorts the whole pool.
+
+    Returns:
+        (indices into base best first, their bonuses)
+    """
+    if k <= 0 or not len(base):
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    remaining = np.arange(len(base))
+    size = k + chunk
+    visited = []
+    bonuses = []
+    kth_best = -np.inf
+    while len(remaining):
+        if size < len(remaining):
+            split = np.argpartition(-base[remaining], size - 1)
+            indices, remaining = remaining[split[:size]], remaining[split[size:]]
+        else:
+            indices, remaining = remaining, remaining[:0]
+        indices = indices[np.lexsort((indices, -base[indices]))]
+        # Sorted by base, so the candidates that can still make the top k are a prefix
+        indices = indices[base[indices] + bonus_weight >= kth_best]
+        if not len(indices):
+            break
+        visited.append(indices)
+        bonuses.append(np.asarray(bonus_for(indices), dtype=np.float64))
+        chunk *= 2
+        size = chunk
+        totals = base[np.concatenate(visited)] + np.concatenate(bonuses) * bonus_weight
+        if len(totals) >= k:
+            kth_best = np.partition(totals, -k)[-k]
+            # Rows that cannot reach the k-th best are never partitioned again
+            remaining = remaining[base[remaining] + bonus_weight >= kth_best]
+    indices = np.concatenate(visited)
+    bonuses = np.concatenate(bonuses)
+    # Back in index order so ties are broken by index, as with a stable sort
+    order = np.argsort(indices)
+    indices, bonuses = indices[order], bonuses[order]
+    best = top_k(base[indices] + bonuses * bonus_weight, k)
+    return indices[best], bonuses[best]
@@ -0,0 +1,229 @@
+"""
+Bucketed candidate index for complementary-skill matching
+
+Exact scoring is linear in the pool size. For large pools the index returns
+a shortlist instead, which is then scored exactly with score_pool (same
+result as calculate_compatibility for every shortlisted candidate).
+
+Builders are bucketed by preferred role, whole-hour timezone offset and the
+set of skill categories they cover. A query estimates its compatibility with
+each bucket from the bucket's summary (mean skill direction, builder score
+range) and takes buckets best first until the shortlist is full. Language
+and availability (10% of the weight) are not part of the estimate, so the
+shortlist is approximate: measure_recall compares it with brute force.
+
+Rows are HackathonPool rows. Inserts, updates and deletes only relabel the
+affected rows; the bucket summaries are rebuilt on the next query after a
+change, with a few vectorized passes over the pool.
+"""
+import os
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .scoring import (
+    ROLES, WEIGHT_ROLE, WEIGHT_SCORE, WEIGHT_SKILLS, WEIGHT_TIMEZONE,
+    EncodedPool, encode_pool, filter_rows, score_pool, top_k, unit_rows, wanted_roles,
+)
+
+# Registry pools at least this large are matched through the index by default
+INDEX_MIN_POOL = int(os.getenv('MATCH_INDEX_MIN_POOL', '20000'))
+# Candidates scored exactly per indexed match request
+SHORTLIST_SIZE = int(os.getenv('MATCH_SHORTLIST_SIZE', '2000'))
+
+_INITIAL_CAPACITY = 64
+
+
+def bucket_keys(pool: EncodedPool) -> List[Tuple[int, int, int]]:
+    """(role code, whole-hour timezone offset, skill category bitmask) per row"""
+    masks = (pool.skills > 0) @ (1 << np.arange(pool.skills.shape[1], dtype=np.int64))
+    offsets = np.rint(pool.tzOffsets).astype(np.int64)
+    return list(zip(pool.roles.tolist(), offsets.tolist(), masks.tolist()))
+
+
+class _Summary(NamedTuple):
+    order: np.ndarray  # pool rows grouped by bucket
+    starts: np.ndarray  # offset of each bucket's rows in order
+    counts: np.ndarray
+    skills: np.ndarray  # unit mean skill vector per bucket
+    scoreMin: np.ndarray
+    scoreMax: np.ndarray
+    roles: np.ndarray
+    tzOffsets: np.ndarray
+
+
+class SkillIndex:
+    """Bucket label per pool row, with per-bucket summaries for shortlisting"""
+
+    def __init__(self):
+        self._ids: Dict[Tuple[int, int, int], int] = {}
+        self._keys: List[Tuple[int, int, int]] = []
+        self._buckets = np.empty(_INITIAL_CAPACITY, dtype=np.int32)
+        self._summary: Optional[_Summary] = None
+
+    def _bucket_id(self, key: Tuple[int, int, int]) -> int:
+        bucket = self._ids.get(key)
+        if bucket is None:
+            bucket = self._ids[key] = len(self._keys)
+            self._keys.append(key)
+        return bucket
+
+    def update(self, rows: np.ndarray, encoded: EncodedPool) -> None:
+        """Label rows (new or changed) from their encoded columns, aligned with rows"""
+        if not len(rows):
+            return
+        needed = int(rows.max()) + 1
+        if needed > len(self._buckets):
+            capacity = len(self._buckets)
+            while capacity < needed:
+                capacity *= 2
+            grown = np.empty(capacity, dtype=np.int32)
+            grown[:len(self._buckets)] = self._buckets
+            self._buckets = grown
+        self._buckets[rows] = [self._bucket_id(key) for key in bucket_keys(encoded)]
+        self._summary = None
+
+    def move(self, source: int, target: int) -> None:
+        """Follow HackathonPool.remove moving the last row into a freed slot"""
+        self._buckets[target] = self._buckets[source]
+        self._summary = None
+
+    def invalidate(self) -> None:
+        self._summary = None
+
+    def _summarize(self, pool: EncodedPool) -> _Summary:
+        if self._summary is not None:
+            return self._summary
+        n = len(pool)
+        labels = self._buckets[:n]
+        buckets = len(self._keys)
+        counts = np.bincount(labels, minlength=buckets)
+        order = np.argsort(labels, kind='stable')
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+        sums = np.stack([
+            np.bincount(labels, weights=pool.skills[:, d], minlength=buckets)
+            for d in range(pool.skills.shape[1])
+        ], axis=1)
+        score_min = np.full(buckets, np.inf)
+        score_max = np.full(buckets, -np.inf)
+        occupied = np.flatnonzero(counts)
+        if n:
+            sorted_scores = pool.builderScores[order]
+            score_min[occupied] = np.minimum.reduceat(sorted_scores, starts[occupied])
+            score_max[occupied] = np.maximum.reduceat(sorted_scores, starts[occupied])
+
+        keys = np.array(self._keys, dtype=np.int64).reshape(buckets, 3)
+        self._summary = _Summary(
+            order=order,
+            starts=starts,
+            counts=counts,
+            skills=unit_rows(sums),
+            scoreMin=score_min,
+            scoreMax=score_max,
+            roles=keys[:, 0],
+            tzOffsets=keys[:, 1].astype(np.float64),
+        )
+        return self._summary
+
+    def shortlist(
+        self,
+        builder,
+        pool: EncodedPool,
+        size: int,
+        roles: Optional[Sequence[str]] = None
+    ) -> np.ndarray:
+        """
+        Pool rows most likely to score best for builder, ascending
+
+        Args:
+            builder: Builder the matches are for
+            pool: The pool these rows index (HackathonPool.snapshot)
+            size: Minimum number of rows to return (whole buckets are taken)
+            roles: Skip buckets whose preferred role is not listed
+        """
+        summary = self._summarize(pool)
+        query = encode_pool([builder])
+        wanted = wanted_roles([builder])[0]
+
+        # Same weights as score_matrix, with each bucket standing in for its members
+        score_gap = np.maximum(0.0, np.maximum(
+            summary.scoreMin - query.builderScores[0], query.builderScores[0] - summary.scoreMax
+        ))
+        estimate = (
+            (1.0 - summary.skills @ query.skills[0]) * WEIGHT_SKILLS +
+            wanted[summary.roles] * WEIGHT_ROLE +
+            np.maximum(0.0, 1.0 - score_gap / 500) * WEIGHT_SCORE +
+            np.maximum(0.0, 1.0 - np.abs(query.tzOffsets[0] - summary.tzOffsets) / 12) * WEIGHT_TIMEZONE
+        )
+        eligible = summary.counts > 0
+        if roles is not None:
+            eligible &= np.isin(summary.roles, [ROLES.lookup(role) for role in roles])
+        ranked = np.flatnonzero(eligible)
+        ranked = ranked[np.argsort(-estimate[ranked], kind='stable')]
+
+        taken = np.searchsorted(np.cumsum(summary.counts[ranked]), size) + 1
+        chosen = ranked[:taken]
+        if not len(chosen):
+            return np.empty(0, dtype=np.int64)
+        rows = np.concatenate([
+            summary.order[start:start + count]
+            for start, count in zip(summary.starts[chosen].tolist(), summary.counts[chosen].tolist())
+        ])
+        return np.sort(rows)
+
+    def stats(self) -> dict:
+        return {'buckets': len(self._keys)}
+
+
+def recall_at_k(exact: np.ndarray, approximate: np.ndarray) -> float:
+    """Share of the exact top-k rows also found by the approximate search"""
+    if not len(exact):
+        return 1.0
+    return len(np.intersect1d(exact, approximate)) / len(exact)
+
+
+def measure_recall(
+    builders: Sequence,
+    pool: EncodedPool,
+    shortlist: Callable[[object], np.ndarray],
+    samples: int = 20,
+    k: int = 5,
+    seed: int = 0
+) -> dict:
+    """
+    Compatibility top-k through the shortlist versus brute force
+
+    Args:
+        builders: Pool members, aligned with pool; queries are sampled from them
+        pool: Encoded pool
+        shortlist: Returns the candidate rows for a query builder
+
+    Returns:
+        Mean recall@k and mean latency (ms) of both searches
+    """
+    rng = np.random.default_rng(seed)
+    queries = rng.choice(len(builders), size=min(samples, len(builders)), replace=False)
+    recalls, exact_ms, indexed_ms = [], [], []
+    for query in queries.tolist():
+        builder = builders[query]
+
+        started = time.perf_counter()
+        rows = filter_rows(pool, builder.userId)
+        exact = rows[top_k(score_pool(builder, pool, rows), k)]
+        exact_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        rows = filter_rows(pool, builder.userId, rows=shortlist(builder))
+        approximate = rows[top_k(score_pool(builder, pool, rows), k)]
+        indexed_ms.append((time.perf_counter() - started) * 1000)
+
+        recalls.append(recall_at_k(exact, approximate))
+    return {
+        'samples': len(recalls),
+        'k': k,
+        'recall': round(float(np.mean(recalls)), 4) if recalls else 1.0,
+        'exactMs': round(float(np.mean(exact_ms)), 3) if exact_ms else 0.0,
+        'indexedMs': round(float(np.mean(indexed_ms)), 3) if indexed_ms else 0.0,
+    }
@@ -0,0 +1,115 @@
+"""
+Skill categories and skill vectors
+
+A skill vector has one dimension per category. Skills are looked up in an
+inverted index (normalized skill -> category weights) built once at import,
+so "Next.js", "nextjs " and "NEXT.JS" all land in frontend, and aliases such
+as "golang" or "node" map to their canonical skill. Vectors are cached per
+distinct skill list.
+
+The taxonomy can be replaced (e.g. with more categories for a wider vector)
+by pointing SKILL_TAXONOMY_PATH at a JSON file:
+    {"categories": {"frontend": ["react", ...], ...},
+     "aliases": {"golang": "go", "fullstack": {"frontend": 0.5, "backend": 0.5}, ...}}
+"""
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+# Skill embeddings (simplified - use sentence transformers in production)
+SKILL_CATEGORIES = {
+    'frontend': ['react', 'nextjs', 'vue', 'angular', 'typescript', 'css', 'tailwind'],
+    'backend': ['nodejs', 'python', 'go', 'rust', 'express', 'fastapi'],
+    'blockchain': ['solidity', 'hardhat', 'foundry', 'web3js', 'ethersjs', 'wagmi'],
+    'design': ['figma', 'photoshop', 'illustrator', 'ui', 'ux'],
+    'ai': ['pytorch', 'tensorflow', 'langchain', 'openai', 'ml'],
+    'mobile': ['react-native', 'flutter', 'swift', 'kotlin'],
+    'data': ['sql', 'postgresql', 'mongodb', 'pandas', 'spark', 'the-graph'],
+    'devops': ['docker', 'kubernetes', 'aws', 'gcp', 'terraform', 'ci-cd'],
+    'security': ['auditing', 'slither', 'echidna', 'formal-verification', 'pentesting'],
+    'product': ['product-management', 'roadmapping', 'agile', 'scrum', 'user-research'],
+}
+
+# Other spellings of a skill, or weights over several categories
+SKILL_ALIASES: Dict[str, Union[str, Dict[str, float]]] = {
+    'react.js': 'react', 'reactjs': 'react', 'next': 'nextjs', 'vuejs': 'vue', 'ts': 'typescript',
+    'tailwindcss': 'tailwind', 'node': 'nodejs', 'golang': 'go', 'py': 'python', 'expressjs': 'express',
+    'ethers': 'ethersjs', 'web3': 'web3js', 'ui/ux': {'design': 2.0},
+    'machine-learning': 'ml', 'tf': 'tensorflow', 'llm': 'openai',
+    'postgres': 'postgresql', 'k8s': 'kubernetes', 'smart-contract-auditing': 'auditing',
+    'pm': 'product-management', 'product': 'product-management',
+    'fullstack': {'frontend': 0.5, 'backend': 0.5}, 'full-stack': {'frontend': 0.5, 'backend': 0.5},
+    'dapp': {'frontend': 0.5, 'blockchain': 0.5},
+}
+
+_NON_SKILL_CHARS = re.compile(r'[^a-z0-9+#/]+')
+
+
+def normalize_skill(skill: str) -> str:
+    """Lowercase, drop separators and stray punctuation ("Next.js " -> "nextjs")"""
+    return _NON_SKILL_CHARS.sub('', skill.lower())
+
+
+def build_skill_index(
+    categories: Dict[str, List[str]],
+    aliases: Dict[str, Union[str, Dict[str, float]]]
+) -> Dict[str, Tuple[Tuple[int, float], ...]]:
+    """Inverted index: normalized skill -> ((category dimension, weight), ...)"""
+    dims = {category: i for i, category in enumerate(categories)}
+    index: Dict[str, Dict[int, float]] = {}
+    for category, skills in categories.items():
+        for skill in skills:
+            index.setdefault(normalize_skill(skill), {})[dims[category]] = 1.0
+    for alias, target in aliases.items():
+        if isinstance(target, str):
+            weights = index.get(normalize_skill(target))
+            if weights is None:
+                raise ValueError(f"Skill alias {alias!r} points to unknown skill {target!r}")
+        else:
+            unknown = set(target) - set(dims)
+            if unknown:
+                raise ValueError(f"Skill alias {alias!r} uses unknown categories {sorted(unknown)}")
+            weights = {dims[category]: float(weight) for category, weight in target.items()}
+        index.setdefault(normalize_skill(alias), dict(weights))
+    return {skill: tuple(weights.items()) for skill, weights in index.items()}
+
+
+def load_taxonomy() -> Tuple[Dict[str, List[str]], Dict[str, Union[str, Dict[str, float]]]]:
+    """Categories and aliases from SKILL_TAXONOMY_PATH, or the built-in ones"""
+    path = os.getenv('SKILL_TAXONOMY_PATH')
+    if not path:
+        return SKILL_CATEGORIES, SKILL_ALIASES
+    with open(path) as f:
+        taxonomy = json.load(f)
+    return taxonomy['categories'], taxonomy.get('aliases', {})
+
+
+_categories, _aliases = load_taxonomy()
+CATEGORY_NAMES = list(_categories)
+SKILL_DIM = len(CATEGORY_NAMES)
+SKILL_INDEX = build_skill_index(_categories, _aliases)
+
+
+@lru_cache(maxsize=65536)
+def skill_weights(skill: str) -> Tuple[Tuple[int, float], ...]:
+    """(category dimension, weight) pairs of a raw skill string (empty if unknown)"""
+    return SKILL_INDEX.get(normalize_skill(skill), ())
+
+
+@lru_cache(maxsize=65536)
+def _cached_vector(skills: Tuple[str, ...]) -> np.ndarray:
+    vector = np.zeros(SKILL_DIM)
+    for skill in skills:
+        for dim, weight in skill_weights(skill):
+            vector[dim] += weight
+    vector.setflags(write=False)
+    return vector
+
+
+def get_skill_vector(skills: List[str]) -> np.ndarray:
+    """Convert skills list to vector (read-only, shared between equal skill lists)"""
+    return _cached_vector(tuple(skills))
@@ -0,0 +1,267 @@
+"""
+Suggested teammates for every builder of a hackathon
+
+A batch job (nightly, or POST /suggestions/refresh) scores the whole
+hackathon against itself and keeps each builder's top k. The pool's encoded
+columns go into shared memory once. Worker processes then score row blocks
+(score_encoded) against the full pool and send back only each row's top k,
+so the n x n matrix never exists in full and the work spreads over all cores.
+
+Results are stored in SQLite: one row per builder holding k neighbour
+indices (int32) and scores (float32), plus the run's userId list, roughly
+8 bytes per suggestion. The API serves them straight from the store.
+
+Nightly, from the service directory:
+    python refresh_suggestions.py [--hackathon <id>] [--k 10] [--workers 4]
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .scoring import CompatibilityTables, EncodedPool, compatibility_tables, score_encoded, wanted_roles
+
+DEFAULT_SUGGESTIONS_PATH = os.path.join('data', 'suggestions.db')
+DEFAULT_K = int(os.getenv('SUGGESTIONS_K', '10'))
+DEFAULT_WORKERS = int(os.getenv('SUGGESTIONS_WORKERS', '0')) or os.cpu_count() or 1
+
+# Scores per block (rows x pool size): bounds each worker's temporaries
+_BLOCK_CELLS = 4_000_000
+_MAX_BLOCK_ROWS = 1024
+
+# Columns shared with the workers (userIds and hackathons are not needed to score)
+_SHARED_COLUMNS = ('skills', 'builderScores', 'tzOffsets', 'roles', 'languages', 'availability')
+
+
+class Suggestions(NamedTuple):
+    neighbors: np.ndarray  # (n, k) int32 rows, best first (-1 when fewer than k others)
+    scores: np.ndarray  # (n, k) float32 compatibility
+
+
+def block_rows(n: int) -> int:
+    return max(1, min(_MAX_BLOCK_ROWS, _BLOCK_CELLS // max(n, 1)))
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-row top k of a score block, best first (ties keep column order)"""
+    k = min(k, scores.shape[1])
+    if k < scores.shape[1]:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    values = np.take_along_axis(scores, candidates, axis=1)
+    order = np.lexsort((candidates, -values), axis=1)
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(values, order, axis=1)
+
+
+def _score_block(wanted: np.ndarray, pool: EncodedPool, start: int, stop: int,
+                 k: int, tables: CompatibilityTables) -> Tuple[np.ndarray, np.ndarray]:
+    queries = EncodedPool(*(column[start:stop] for column in pool))
+    scores = score_encoded(wanted[start:stop], queries, pool, tables)
+    # A builder is not their own teammate
+    scores[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+    return top_k_rows(scores, k)
+
+
+# Per worker process: shared memory blocks attached so far, by name
+_attached: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def _attach(spec: Tuple[str, tuple, str]) -> np.ndarray:
+    name, shape, dtype = spec
+    block = _attached.get(name)
+    if block is None:
+        block = _attached[name] = shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+
+def _worker_block(specs: Dict[str, Tuple[str, tuple, str]], tables: CompatibilityTables,
+                  start: int, stop: int, k: int) -> Tuple[int, np.ndarray, np.ndarray]:
+    # A spawned worker re-imports lib.scoring with the default vocabularies, so
+    # the codes in shared memory are scored with the parent's tables
+    columns = {name: _attach(spec) for name, spec in specs.items()}
+    n = len(columns['builderScores'])
+    empty = np.zeros(n, dtype=np.int32)
+    pool = EncodedPool(userIds=empty, hackathons=empty, **{name: columns[name] for name in _SHARED_COLUMNS})
+    neighbors, scores = _score_block(columns['wanted'], pool, start, stop, k, tables)
+    return start, neighbors, scores
+
+
+def compute_suggestions(
+    builders: Sequence,
+    pool: EncodedPool,
+    k: int = DEFAULT_K,
+    workers: Optional[int] = None
+) -> Suggestions:
+    """
+    Top k teammates of every builder within the pool
+
+    Args:
+        builders: Pool members (for lookingForRoles), aligned with pool
+        pool: encode_pool(builders)
+        k: Suggestions per builder
+        workers: Worker processes (1 scores in this process)
+
+    Returns:
+        Suggestions with rows into builders
+    """
+    n = len(builders)
+    workers = workers or DEFAULT_WORKERS
+    neighbors = np.full((n, k), -1, dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float32)
+    wanted = wanted_roles(builders)
+    # Built after encoding, so they cover every code in the pool
+    tables = compatibility_tables()
+    step = block_rows(n)
+    blocks = [(start, min(start + step, n)) for start in range(0, n, step)]
+
+    def store(start: int, block_neighbors: np.ndarray, block_scores: np.ndarray) -> None:
+        width = block_neighbors.shape[1]
+        neighbors[start:start + len(block_neighbors), :width] = block_neighbors
+        scores[start:start + len(block_scores), :width] = block_scores
+
+    if workers <= 1 or len(blocks) <= 1:
+        for start, stop in blocks:
+            store(start, *_score_block(wanted, pool, start, stop, k, tables))
+    else:
+        arrays = {name: getattr(pool, name) for name in _SHARED_COLUMNS}
+        arrays['wanted'] = wanted
+        blocks_shm = []
+        try:
+            specs = {}
+            for name, array in arrays.items():
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                blocks_shm.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                specs[name] = (block.name, array.shape, array.dtype.str)
+            # spawn: the caller may be a threaded server, which fork does not mix with
+            with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as executor:
+                futures = [executor.submit(_worker_block, specs, tables, start, stop, k) for start, stop in blocks]
+                for future in futures:
+                    store(*future.result())
+        finally:
+            for block in blocks_shm:
+                block.close()
+                block.unlink()
+
+    # Fewer than k other builders: mark the unused slots
+    if n <= k:
+        neighbors[:, max(n - 1, 0):] = -1
+        scores[:, max(n - 1, 0):] = 0.0
+    return Suggestions(neighbors, scores)
+
+
+class SuggestionStore:
+    """SQLite store of each builder's suggested teammates, one run per hackathon"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('SUGGESTIONS_DB_PATH', DEFAULT_SUGGESTIONS_PATH)
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS suggestion_runs (
+                hackathon_id TEXT PRIMARY KEY,
+                user_ids TEXT NOT NULL,
+                k INTEGER NOT NULL,
+                generated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS suggestions (
+                hackathon_id TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                neighbors BLOB NOT NULL,
+                scores BLOB NOT NULL,
+                PRIMARY KEY (hackathon_id, user_id)
+            );
+        """)
+        self._conn.commit()
+        # userId list of each hackathon's latest run, to resolve neighbour rows
+        self._runs: Dict[str, Tuple[List[str], float]] = {}
+
+    def replace(self, hackathon_id: str, user_ids: List[str], suggestions: Suggestions) -> float:
+        """Store a run, replacing the hackathon's previous one; returns its timestamp"""
+        generated_at = time.time()
+        neighbors = suggestions.neighbors.astype('<i4')
+        scores = suggestions.scores.astype('<f4')
+        with self._lock:
+            with self._conn:
+                self._conn.execute('DELETE FROM suggestions WHERE hackathon_id = ?', (hackathon_id,))
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO suggestion_runs (hackathon_id, user_ids, k, generated_at) '
+                    'VALUES (?, ?, ?, ?)',
+                    (hackathon_id, json.dumps(user_ids), neighbors.shape[1], generated_at)
+                )
+                self._conn.executemany(
+                    'INSERT INTO suggestions (hackathon_id, user_id, neighbors, scores) VALUES (?, ?, ?, ?)',
+                    (
+                        (hackathon_id, user_id, neighbors[row].tobytes(), scores[row].tobytes())
+                        for row, user_id in enumerate(user_ids)
+                    )
+                )
+            self._runs[hackathon_id] = (user_ids, generated_at)
+        return generated_at
+
+    def _run(self, hackathon_id: str) -> Optional[Tuple[List[str], float]]:
+        """Latest run's userId list, reloaded when another process stored a newer run"""
+        row = self._conn.execute(
+            'SELECT generated_at FROM suggestion_runs WHERE hackathon_id = ?', (hackathon_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        run = self._runs.get(hackathon_id)
+        if run is None or run[1] != row[0]:
+            user_ids, generated_at = self._conn.execute(
+                'SELECT user_ids, generated_at FROM suggestion_runs WHERE hackathon_id = ?', (hackathon_id,)
+            ).fetchone()
+            run = self._runs[hackathon_id] = (json.loads(user_ids), generated_at)
+        return run
+
+    def get(self, hackathon_id: str, user_id: str) -> Optional[dict]:
+        """A builder's suggestions as {generatedAt, matches: [(userId, score)]}, if stored"""
+        with self._lock:
+            # One read transaction, so the rows and the userId list come from the same run
+            self._conn.execute('BEGIN')
+            try:
+                run = self._run(hackathon_id)
+                row = run and self._conn.execute(
+                    'SELECT neighbors, scores FROM suggestions WHERE hackathon_id = ? AND user_id = ?',
+                    (hackathon_id, user_id)
+                ).fetchone()
+            finally:
+                self._conn.commit()
+        if row is None:
+            return None
+        user_ids, generated_at = run
+        neighbors = np.frombuffer(row[0], dtype='<i4')
+        scores = np.frombuffer(row[1], dtype='<f4')
+        matches = [
+            (user_ids[neighbor], float(score))
+            for neighbor, score in zip(neighbors.tolist(), scores.tolist()) if neighbor >= 0
+        ]
+        return {'generatedAt': generated_at, 'matches': matches}
+
+
+def refresh(hackathon_id: str, builders: Sequence, pool: EncodedPool, store: SuggestionStore,
+            k: int = DEFAULT_K, workers: Optional[int] = None) -> dict:
+    """Compute and store suggestions for one hackathon's builders"""
+    started = time.perf_counter()
+    suggestions = compute_suggestions(builders, pool, k, workers)
+    computed = time.perf_counter()
+    generated_at = store.replace(hackathon_id, [b.userId for b in builders], suggestions)
+    return {
+        'hackathonId': hackathon_id,
+        'builders': len(builders),
+        'k': k,
+        'generatedAt': generated_at,
+        'computeMs': round((computed - started) * 1000, 1),
+        'storeMs': round((time.perf_counter() - computed) * 1000, 1),
+    }
@@ -0,0 +1,171 @@
+"""
+Whole-hackathon team formation
+
+Partitions a hackathon's builders into teams that maximize the total
+pairwise compatibility (calculate_compatibility weights; a pair scores the
+mean of both directions, since role matching is one-sided).
+
+1. Greedy: each team is seeded with the unassigned builder who has the
+   least compatibility with everyone left (the hardest to place), then
+   grown with whoever adds the most compatibility to its current members.
+2. Local search: builders are swapped between teams whenever that raises
+   the total, until no improving swap is left or the time budget runs out.
+
+Both phases keep, for every builder, its summed compatibility with each
+team's members, so evaluating all swaps for one builder is a few vector
+operations. If the budget runs out during the greedy phase, the teams
+formed so far are returned along with the builders not yet placed.
+"""
+import os
+import time
+from typing import List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from .scoring import EncodedPool, score_matrix
+
+# Largest pool formed in one call: the pair matrix takes 4 * n^2 bytes
+MAX_BUILDERS = int(os.getenv('FORM_TEAMS_MAX_BUILDERS', '8000'))
+DEFAULT_TIME_BUDGET = float(os.getenv('FORM_TEAMS_TIME_BUDGET', '10'))
+
+_BLOCK_ROWS = 512
+_MIN_GAIN = 1e-9
+
+
+class TeamFormation(NamedTuple):
+    teams: List[List[int]]  # row indices into the builder list
+    unassigned: List[int]
+    pairScores: np.ndarray  # symmetric pair matrix, for reporting
+    complete: bool  # every builder is on a team
+    converged: bool  # local search found no further improving swap
+    swaps: int
+
+
+def pair_matrix(builders: Sequence, pool: EncodedPool) -> np.ndarray:
+    """Symmetric (n, n) pair compatibility with a zero diagonal, computed in row blocks"""
+    n = len(builders)
+    scores = np.empty((n, n), dtype=np.float32)
+    for start in range(0, n, _BLOCK_ROWS):
+        rows = slice(start, min(start + _BLOCK_ROWS, n))
+        queries = EncodedPool(*(column[rows] for column in pool))
+        scores[rows] = score_matrix(builders[rows], queries, pool)
+    scores += scores.T
+    scores *= 0.5
+    np.fill_diagonal(scores, 0.0)
+    return scores
+
+
+def team_sizes(n: int, team_size: int) -> List[int]:
+    """As few teams as possible, sizes differing by at most one"""
+    teams = -(-n // team_size)
+    base, extra = divmod(n, teams)
+    return [base + 1] * extra + [base] * (teams - extra)
+
+
+def _greedy(scores: np.ndarray, sizes: List[int], deadline: float) -> tuple:
+    n = len(scores)
+    unassigned = np.ones(n, dtype=bool)
+    # Compatibility with everyone still unassigned; low = hard to place
+    remaining_affinity = scores.sum(axis=1, dtype=np.float64)
+    teams = []
+    for size in sizes:
+        if time.monotonic() > deadline:
+            break
+        seed = int(np.argmin(np.where(unassigned, remaining_affinity, np.inf)))
+        members = [seed]
+        unassigned[seed] = False
+        gain = scores[seed].astype(np.float64)
+        while len(members) < size:
+            candidate = int(np.argmax(np.where(unassigned, gain, -np.inf)))
+            members.append(candidate)
+            unassigned[candidate] = False
+            gain += scores[candidate]
+        remaining_affinity -= scores[members].sum(axis=0)
+        teams.append(members)
+    return teams, [int(i) for i in np.flatnonzero(unassigned)]
+
+
+def _local_search(scores: np.ndarray, teams: List[List[int]], deadline: float,
+                  rng: np.random.Generator) -> tuple:
+    """Swap members between complete teams while that raises the total"""
+    n = len(scores)
+    team_of = np.empty(n, dtype=np.int64)
+    for t, members in enumerate(teams):
+        team_of[members] = t
+
+    # team_sum[t, x]: compatibility of x with the members of team t (rows
+    # stay contiguous, and scores is symmetric so its rows double as columns)
+    team_sum = np.zeros((len(teams), n), dtype=np.float64)
+    for t, members in enumerate(teams):
+        team_sum[t] = scores[members].sum(axis=0)
+    own = team_sum[team_of, np.arange(n)]
+
+    swaps = 0
+    improved = True
+    while improved:
+        improved = False
+        for a in rng.permutation(n):
+            if time.monotonic() > deadline:
+                return swaps, False
+            team_a = team_of[a]
+            # Gain of swapping a with every builder b of another team
+            delta = (
+                team_sum[team_a] - own - team_sum[team_a, a] +
+                team_sum[team_of, a] - 2.0 * scores[a]
+            )
+            delta[team_of == team_a] = -np.inf
+            b = int(np.argmax(delta))
+            if delta[b] <= _MIN_GAIN:
+                continue
+            team_b = team_of[b]
+            team_sum[team_a] += scores[b] - scores[a]
+            team_sum[team_b] += scores[a] - scores[b]
+            team_of[a], team_of[b] = team_b, team_a
+            teams[team_a][teams[team_a].index(a)] = b
+            teams[team_b][teams[team_b].index(b)] = a
+            for member in teams[team_a] + teams[team_b]:
+                own[member] = team_sum[team_of[member], member]
+            swaps += 1
+            improved = True
+
+    return swaps, True
+
+
+def form_teams(
+    builders: Sequence,
+    pool: EncodedPool,
+    team_size: int,
+    time_budget: Optional[float] = None,
+    seed: int = 0
+) -> TeamFormation:
+    """
+    Partition builders into teams of team_size (or one less)
+
+    Args:
+        builders: Builders to place, aligned with pool
+        pool: encode_pool(builders)
+        team_size: Target members per team
+        time_budget: Seconds allowed, pair matrix included
+        seed: Seed for the local search visiting order
+
+    Returns:
+        TeamFormation with teams as row indices into builders
+    """
+    deadline = time.monotonic() + (time_budget if time_budget is not None else DEFAULT_TIME_BUDGET)
+    scores = pair_matrix(builders, pool)
+    sizes = team_sizes(len(builders), team_size) if builders else []
+
+    teams, unassigned = _greedy(scores, sizes, deadline)
+    if unassigned:
+        return TeamFormation(teams, unassigned, scores, False, False, 0)
+
+    swaps, converged = _local_search(scores, teams, deadline, np.random.default_rng(seed))
+    return TeamFormation(teams, [], scores, True, converged, swaps)
+
+
+def team_score(scores: np.ndarray, members: List[int]) -> float:
+    """Mean pair compatibility within a team (0 for a single member)"""
+    if len(members) < 2:
+        return 0.0
+    block = scores[np.ix_(members, members)]
+    return float(block.sum() / (len(members) * (len(members) - 1)))
@@ -1,13 +1,39 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional
-import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
-import requests
+import asyncio
+import httpx
 import os
+import time
+
+from lib.github_activity import GitHubActivity
+from lib.github_scheduler import GitHubScheduler
+from lib.registry import BuilderRegistry, hackathon_key
+from lib.scoring import (
+    AVAILABILITY, LANGUAGES, compatibility_tables, encode_pool, filter_rows, score_pool,
+    timezone_offset, timezone_slots, top_k_with_bonus,
+)
+from lib.skill_index import INDEX_MIN_POOL, SHORTLIST_SIZE, measure_recall
+from lib.skills import get_skill_vector
+from lib.suggestions import DEFAULT_K, SuggestionStore, refresh as refresh_suggestion_run
+from lib.team_formation import MAX_BUILDERS, form_teams, team_score
 
 app = FastAPI()
 
+# GitHub quota is shared with the plagiarism detector (same token); the
+# scheduler keeps in sync with it through the X-RateLimit-* headers
+github_scheduler = GitHubScheduler(authenticated=bool(os.getenv("GITHUB_TOKEN")))
+github_http = httpx.AsyncClient(
+    base_url=os.getenv('GITHUB_API_URL', 'https://api.github.com'),
+    headers={'Authorization': f'token {os.getenv("GITHUB_TOKEN")}'} if os.getenv("GITHUB_TOKEN") else {},
+    timeout=10.0,
+    limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+)
+
+# Activity scores are read from cache; GitHub is only queried in the background
+github_activity = GitHubActivity(github_http, github_scheduler)
+
 class Builder(BaseModel):
     userId: str
     walletAddress: str
@@ -21,55 +47,53 @@ class Builder(BaseModel):
     hackathonId: Optional[str] = None  # For virtual hackathon matching
     availability: Optional[str] = "full-time"  # "full-time", "part-time", "weekend"
 
+class MatchFilters(BaseModel):
+    roles: Optional[List[str]] = None  # Only candidates whose preferredRole is listed
+    availability: Optional[List[str]] = None  # Only these availabilities
+    hackathonId: Optional[str] = None  # Only candidates of this hackathon
+
 class TeamMatchRequest(BaseModel):
-    builder: Builder
-    candidatePool: List[Builder]
+    builder: Optional[Builder] = None  # Full profile, or...
+    userId: Optional[str] = None  # ...a builder registered for hackathonId
+    hackathonId: Optional[str] = None  # Defaults to builder.hackathonId
+    candidatePool: Optional[List[Builder]] = None  # Omit to match against the registry
+    filters: Optional[MatchFilters] = None  # Hard filters, applied before scoring
+    approximate: Optional[bool] = None  # Score an index shortlist only (default: large registry pools)
     maxResults: int = 5
 
+class BuilderUpsertRequest(BaseModel):
+    builders: List[Builder]
+
 class TeamMatchResponse(BaseModel):
     matches: List[dict]
 
-# Skill embeddings (simplified - use sentence transformers in production)
-SKILL_CATEGORIES = {
-    'frontend': ['react', 'nextjs', 'vue', 'angular', 'typescript', 'css', 'tailwind'],
-    'backend': ['nodejs', 'python', 'go', 'rust', 'express', 'fastapi'],
-    'blockchain': ['solidity', 'hardhat', 'foundry', 'web3js', 'ethersjs', 'wagmi'],
-    'design': ['figma', 'photoshop', 'illustrator', 'ui', 'ux'],
-    'ai': ['pytorch', 'tensorflow', 'langchain', 'openai', 'ml'],
-    'mobile': ['react-native', 'flutter', 'swift', 'kotlin'],
-}
+class TeamFormationRequest(BaseModel):
+    hackathonId: Optional[str] = None  # Form teams from this hackathon's registered builders...
+    builders: Optional[List[Builder]] = None  # ...or from an explicit list
+    teamSize: int = 4
+    timeBudgetMs: Optional[int] = None  # Defaults to FORM_TEAMS_TIME_BUDGET
 
-def get_skill_vector(skills: List[str]) -> np.ndarray:
-    """Convert skills list to vector"""
-    vector = np.zeros(len(SKILL_CATEGORIES))
-    
-    for i, (category, category_skills) in enumerate(SKILL_CATEGORIES.items()):
-        for skill in skills:
-            if skill.lower() in category_skills:
-                vector[i] += 1
-    
-    return vector
+class TeamFormationResponse(BaseModel):
+    teams: List[dict]
+    unassigned: List[str]
+    complete: bool  # False when the time budget ran out before everyone was placed
+    converged: bool  # True when no member swap could improve the result further
+    averageScore: float
+    elapsedMs: float
 
-def calculate_github_activity(github_url: Optional[str]) -> float:
-    """Fetch GitHub activity score"""
-    if not github_url:
-        return 0.0
-    
-    try:
-        username = github_url.split('github.com/')[-1].strip('/')
-        response = requests.get(
-            f'https://api.github.com/users/{username}',
-            headers={'Authorization': f'token {os.getenv("GITHUB_TOKEN")}'}
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            # Simple scoring: repos + followers + contributions
-            return min((data.get('public_repos', 0) + 
-                       data.get('followers', 0) * 2) / 100, 1.0)
-        return 0.0
-    except:
-        return 0.0
+class SuggestionRefreshRequest(BaseModel):
+    hackathonId: Optional[str] = None
+    k: int = DEFAULT_K  # Suggestions kept per builder
+
+# Final score = compatibility * 0.8 + GitHub activity * 0.2
+COMPATIBILITY_WEIGHT = 0.8
+GITHUB_WEIGHT = 0.2
+
+# Builders registered per hackathon, kept encoded for scoring
+registry = BuilderRegistry(Builder.model_validate_json)
+
+# Precomputed "suggested teammates" per builder (see /suggestions/refresh)
+suggestion_store = SuggestionStore()
 
 def calculate_compatibility(builder1: Builder, builder2: Builder) -> float:
     """Calculate compatibility score between two builders"""
@@ -91,28 +115,21 @@ def calculate_compatibility(builder1: Builder, builder2: Builder) -> float:
     score_diff = abs(builder1.builderScore - builder2.builderScore)
     score_compat = max(0, 1 - (score_diff / 500))  # Normalize
     
+    # Timezone, language and availability come from precomputed tables
+    tables = compatibility_tables()
+    
     # 4. Timezone compatibility (10% weight) - CRITICAL for virtual hackathons
-    # Parse timezone offset
-    tz1_offset = int(builder1.timezone.split('UTC')[1].split(':')[0] if 'UTC' in builder1.timezone else 0)
-    tz2_offset = int(builder2.timezone.split('UTC')[1].split(':')[0] if 'UTC' in builder2.timezone else 0)
-    tz_diff = abs(tz1_offset - tz2_offset)
-    tz_compat = max(0, 1 - (tz_diff / 12))
+    # Offsets to the minute ("UTC+5:30", "Africa/Nairobi"), compared by quarter-hour slot
+    tz1_slot, tz2_slot = timezone_slots([timezone_offset(builder1.timezone), timezone_offset(builder2.timezone)])
+    tz_compat = tables.timezone[tz1_slot, tz2_slot]
     
     # 5. Language compatibility (5% weight) - Important for African participants
-    lang_match = 1.0 if builder1.language == builder2.language else 0.5
-    if builder1.language == "sw" and builder2.language == "sw":
-        lang_match = 1.2  # Bonus for Swahili speakers (often underrepresented)
+    # Bonus for Swahili speakers (often underrepresented), see language_match
+    lang_match = tables.language[LANGUAGES.code(builder1.language), LANGUAGES.code(builder2.language)]
     
     # 6. Availability compatibility (5% weight) - Critical for virtual hackathons
-    avail_match = 1.0
-    if builder1.availability != builder2.availability:
-        # Part-time + weekend is OK, but full-time + part-time is less ideal
-        if builder1.availability == "full-time" and builder2.availability in ["part-time", "weekend"]:
-            avail_match = 0.7
-        elif builder1.availability in ["part-time", "weekend"] and builder2.availability == "full-time":
-            avail_match = 0.7
-        else:
-            avail_match = 0.9
+    # Part-time + weekend is OK, but full-time + part-time is less ideal, see availability_match
+    avail_match = tables.availability[AVAILABILITY.code(builder1.availability), AVAILABILITY.code(builder2.availability)]
     
     # Weighted sum (adjusted for virtual hackathons)
     total_score = (
@@ -126,26 +143,73 @@ def calculate_compatibility(builder1: Builder, builder2: Builder) -> float:
     
     return min(total_score, 1.0)  # Cap at 1.0
 
+def match_hackathon_id(request: TeamMatchRequest) -> Optional[str]:
+    return request.hackathonId or (request.builder.hackathonId if request.builder else None)
+
+def resolve_match_inputs(request: TeamMatchRequest) -> tuple:
+    """
+    Builder to match and the candidate pool to match against
+    
+    Returns:
+        (builder, candidates, encoded pool aligned with candidates)
+    """
+    hackathon_id = match_hackathon_id(request)
+    
+    builder = request.builder
+    if builder is None:
+        if not request.userId:
+            raise HTTPException(status_code=400, detail="Provide builder or userId")
+        builder = registry.get(hackathon_id, request.userId)
+        if builder is None:
+            raise HTTPException(status_code=404, detail=f"Builder {request.userId} is not registered")
+    
+    if request.candidatePool is not None:
+        return builder, request.candidatePool, encode_pool(request.candidatePool)
+    candidates, pool = registry.snapshot(hackathon_id)
+    return builder, candidates, pool
+
 @app.post("/match-team", response_model=TeamMatchResponse)
 async def match_team(request: TeamMatchRequest):
     """
     Find best team matches for a builder
     Returns ranked list of compatible builders
     """
-    matches = []
+    builder, candidates, pool = resolve_match_inputs(request)
+    filters = request.filters or MatchFilters()
     
-    for candidate in request.candidatePool:
-        if candidate.userId == request.builder.userId:
-            continue
-        
-        # Calculate compatibility
-        compat_score = calculate_compatibility(request.builder, candidate)
-        
-        # Get GitHub activity
-        github_score = calculate_github_activity(candidate.githubUrl)
+    # Large registry pools: exactly score only the skill index shortlist
+    shortlist = None
+    if request.candidatePool is None:
+        hackathon_id = match_hackathon_id(request)
+        approximate = request.approximate
+        if approximate is None:
+            approximate = registry.size(hackathon_id) >= INDEX_MIN_POOL
+        if approximate:
+            size = max(SHORTLIST_SIZE, request.maxResults * 20)
+            shortlist = registry.shortlist(hackathon_id, builder, size, filters.roles)
+    
+    # Compatibility with the filtered pool at once (see calculate_compatibility)
+    rows = filter_rows(pool, builder.userId, filters.roles, filters.availability, filters.hackathonId, shortlist)
+    compat_scores = score_pool(builder, pool, rows)
+    
+    # GitHub activity adds at most GITHUB_WEIGHT to the final score, so it is
+    # only looked up (cached, missing scores fetched in the background) for
+    # candidates that can still make the top results
+    base_scores = compat_scores * COMPATIBILITY_WEIGHT
+    winners, github_scores = top_k_with_bonus(
+        base_scores,
+        request.maxResults,
+        GITHUB_WEIGHT,
+        lambda indices: github_activity.scores([candidates[rows[i]].githubUrl for i in indices]),
+    )
+    
+    matches = []
+    for i, github_score in zip(winners.tolist(), github_scores.tolist()):
+        candidate = candidates[rows[i]]
+        compat_score = float(compat_scores[i])
         
         # Final score (weighted)
-        final_score = compat_score * 0.8 + github_score * 0.2
+        final_score = compat_score * COMPATIBILITY_WEIGHT + github_score * GITHUB_WEIGHT
         
         matches.append({
             'userId': candidate.userId,
@@ -159,10 +223,125 @@ async def match_team(request: TeamMatchRequest):
             'reason': f"Strong {candidate.preferredRole} match with complementary {', '.join(candidate.skills[:3])} skills"
         })
     
-    # Sort by final score
-    matches.sort(key=lambda x: x['finalScore'], reverse=True)
+    return TeamMatchResponse(matches=matches)
+
+@app.post("/form-teams", response_model=TeamFormationResponse)
+async def form_hackathon_teams(request: TeamFormationRequest):
+    """
+    Split a whole hackathon into teams maximizing total compatibility
+    Returns partial results if the time budget runs out
+    """
+    if request.teamSize < 2:
+        raise HTTPException(status_code=400, detail="teamSize must be at least 2")
+    if request.builders is not None:
+        builders = list({b.userId: b for b in request.builders}.values())
+        pool = encode_pool(builders)
+    else:
+        builders, pool = registry.snapshot(request.hackathonId)
+        # Snapshot columns are views of the live arrays; copy before leaving the event loop
+        pool = type(pool)(*(column.copy() for column in pool))
+    if len(builders) > MAX_BUILDERS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BUILDERS} builders per call")
+    
+    started = time.perf_counter()
+    budget = request.timeBudgetMs / 1000 if request.timeBudgetMs is not None else None
+    formation = await asyncio.to_thread(form_teams, builders, pool, request.teamSize, budget)
     
-    return TeamMatchResponse(matches=matches[:request.maxResults])
+    teams = []
+    for members in formation.teams:
+        teams.append({
+            'members': [builders[i].userId for i in members],
+            'roles': [builders[i].preferredRole for i in members],
+            'score': round(team_score(formation.pairScores, members) * 100, 2),
+        })
+    teams.sort(key=lambda team: team['score'], reverse=True)
+    
+    return TeamFormationResponse(
+        teams=teams,
+        unassigned=[builders[i].userId for i in formation.unassigned],
+        complete=formation.complete,
+        converged=formation.converged,
+        averageScore=round(sum(t['score'] for t in teams) / len(teams), 2) if teams else 0.0,
+        elapsedMs=round((time.perf_counter() - started) * 1000, 1),
+    )
+
+@app.post("/builders")
+async def upsert_builders(request: BuilderUpsertRequest):
+    """
+    Register builders (or update their profiles) under their hackathonId
+    Match requests can then omit candidatePool
+    """
+    try:
+        upserted = registry.upsert(request.builders)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid builder profile: {e}")
+    github_activity.prefetch(builder.githubUrl for builder in request.builders)
+    return {"upserted": upserted, "registry": registry.stats()}
+
+@app.delete("/builders/{hackathon_id}/{user_id}")
+async def delete_builder(hackathon_id: str, user_id: str):
+    if not registry.remove(hackathon_id, user_id):
+        raise HTTPException(status_code=404, detail="Builder not registered")
+    return {"deleted": user_id}
+
+@app.get("/builders/stats")
+async def builder_stats():
+    return registry.stats()
+
+@app.post("/suggestions/refresh")
+async def refresh_suggestions(request: SuggestionRefreshRequest):
+    """
+    Recompute every registered builder's top-k teammates for a hackathon
+    Also runnable as a nightly job: python refresh_suggestions.py
+    """
+    if request.k < 1:
+        raise HTTPException(status_code=400, detail="k must be at least 1")
+    builders, pool = registry.snapshot(request.hackathonId)
+    # Snapshot columns are views of the live arrays; copy before leaving the event loop
+    pool = type(pool)(*(column.copy() for column in pool))
+    return await asyncio.to_thread(
+        refresh_suggestion_run, hackathon_key(request.hackathonId), builders, pool, suggestion_store, request.k
+    )
+
+@app.get("/suggestions/{hackathon_id}/{user_id}")
+async def get_suggestions(hackathon_id: str, user_id: str):
+    """Stored suggestions from the latest refresh"""
+    stored = suggestion_store.get(hackathon_id, user_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="No suggestions for this builder")
+    return {
+        'userId': user_id,
+        'generatedAt': stored['generatedAt'],
+        'matches': [
+            {'userId': match, 'compatibilityScore': round(score * 100, 2)}
+            for match, score in stored['matches']
+        ],
+    }
+
+@app.get("/builders/index/recall")
+async def skill_index_recall(hackathonId: Optional[str] = None, samples: int = 20, k: int = 5,
+                             shortlistSize: int = SHORTLIST_SIZE):
+    """
+    Recall@k of indexed matching versus brute force, on sampled registered builders
+    Ranks by compatibility only (GitHub activity left out)
+    """
+    builders, pool = registry.snapshot(hackathonId)
+    report = measure_recall(
+        builders, pool,
+        lambda builder: registry.shortlist(hackathonId, builder, shortlistSize),
+        samples=samples, k=k,
+    )
+    return {**report, 'shortlistSize': shortlistSize, 'poolSize': len(builders)}
+
+@app.get("/github/activity/stats")
+async def github_activity_stats():
+    """Hit/miss counters of the GitHub activity cache"""
+    return {**github_activity.stats(), 'rateLimits': github_scheduler.stats()}
+
+@app.on_event("shutdown")
+async def close_github_client():
+    await github_activity.aclose()
+    await github_http.aclose()
 
 @app.get("/health")
 async def health():
@@ -0,0 +1,34 @@
+"""
+Recompute suggested teammates for registered builders (nightly job)
+
+Reads the builder registry and writes the suggestion store, the same
+databases the API uses (BUILDER_REGISTRY_DB_PATH, SUGGESTIONS_DB_PATH):
+
+    python refresh_suggestions.py [--hackathon <id>] [--k 10] [--workers 4]
+"""
+import argparse
+import json
+from types import SimpleNamespace
+
+from lib.registry import BuilderRegistry, hackathon_key
+from lib.suggestions import DEFAULT_K, SuggestionStore, refresh
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Recompute suggested teammates for registered builders')
+    parser.add_argument('--hackathon', action='append', help='Hackathon id (repeatable; default: all)')
+    parser.add_argument('--k', type=int, default=DEFAULT_K)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    # Stored profiles are complete Builder dumps; attribute access is all scoring needs
+    registry = BuilderRegistry(lambda profile: SimpleNamespace(**json.loads(profile)))
+    store = SuggestionStore()
+    hackathons = args.hackathon or list(registry.stats()['byHackathon'])
+    for hackathon in hackathons:
+        builders, pool = registry.snapshot(hackathon)
+        print(json.dumps(refresh(hackathon_key(hackathon), builders, pool, store, args.k, args.workers)))
+
+
+if __name__ == '__main__':
+    main()